@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Estatísticas de mouse_settings por game: distribuições, percentis e
+histogramas de DPI, sensibilidade, polling rate (hz) e eDPI (dpi × sensibilidade).
+
+Os valores numéricos são extraídos uma única vez para colunas NumPy
+(uma posição por player); as estatísticas são calculadas com operações
+vetorizadas sobre essas colunas. Unidades, "%" e separadores de milhar
+são descartados ("6.0%" vira 0.06, "1,600" vira 1600); valores como
+"Unknown" viram NaN e ficam fora das contas.
+
+Requer NumPy (`pip install numpy`), usado só por este script.
+"""
+
+import math
+import re
+from typing import Any, Dict, List
+
+import numpy as np
+
+import dict_encoding
+
+
+# Chaves de sensibilidade em ordem de preferência (o nome muda por game)
+SENSITIVITY_KEYS = ('sensitivity', 'ow_sensitivity', 'x-axis_sensitivity',
+                    'general_sensitivity', 'horizontal_sensitivity', 'mouse_speed')
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+FIELDS = ('dpi', 'sensitivity', 'hz', 'edpi')
+
+# Largura máxima (em caracteres) de um número convertido em bloco
+_PLAIN_WIDTH = 24
+
+# Número com separador de milhar opcional, seguido de % ou de uma unidade
+_NUMBER_WITH_UNIT = re.compile(r'([-+]?(?=\.?\d)(?:\d{1,3}(?:,\d{3})+|\d*)(?:\.\d+)?)\s*(%|[A-Za-z]+)?')
+
+
+def _to_float(value: Any) -> float:
+    # Valores vêm como string ("800", "0.35", "1,600", "6.0%", "1000 Hz")
+    # ou placeholder ("Unknown")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    if not isinstance(value, str):
+        return math.nan
+
+    match = _NUMBER_WITH_UNIT.fullmatch(value.strip())
+    if match is None:
+        return math.nan
+    number = float(match.group(1).replace(',', ''))
+    # "6.0%" é a fração 0.06 (é o que entra no eDPI do Fortnite)
+    return number / 100 if match.group(2) == '%' else number
+
+
+class SettingsColumns:
+    """
+    Colunas numéricas alinhadas por player: `game` guarda o índice do game
+    em `game_names`, e `dpi`, `sensitivity`, `hz` e `edpi` são float64.
+    """
+
+    def __init__(self, game_names: List[str], game: np.ndarray, dpi: np.ndarray,
+                 sensitivity: np.ndarray, hz: np.ndarray):
+        self.game_names = game_names
+        self.game = game
+        self.dpi = dpi
+        self.sensitivity = sensitivity
+        self.hz = hz
+        # eDPI derivado; NaN se qualquer um dos dois for desconhecido
+        self.edpi = dpi * sensitivity
+
+    def __len__(self) -> int:
+        return len(self.game)
+
+    def column(self, field: str) -> np.ndarray:
+        return getattr(self, field)
+
+
+def _parse_distinct(distinct: List[Any]) -> np.ndarray:
+    # Números simples ("800", "0.35", "-1") são reconhecidos olhando os
+    # caracteres como uma matriz de códigos e convertidos em bloco com
+    # astype; só o resto ("6.0%", "1,600", "Unknown") passa pelo _to_float.
+    # Strings maiores que _PLAIN_WIDTH ficam truncadas aqui (o último
+    # caractere não é zero) e vão para o _to_float com o valor original.
+    strings = np.array(distinct, dtype=f'U{_PLAIN_WIDTH}')
+    codes = strings.view(np.uint32).reshape(len(distinct), _PLAIN_WIDTH)
+    digit = (codes >= 48) & (codes <= 57)
+    dot = codes == 46
+    minus = codes == 45
+    plain = ((digit | dot | minus | (codes == 0)).all(axis=1)
+             & digit.any(axis=1)
+             & (dot.sum(axis=1) <= 1)
+             & ~minus[:, 1:].any(axis=1)
+             & (codes[:, -1] == 0))
+
+    values = np.empty(len(distinct))
+    values[plain] = strings[plain].astype(np.float64)
+    for position in np.flatnonzero(~plain).tolist():
+        values[position] = _to_float(distinct[position])
+    return values
+
+
+def _parse_column(raw: List[Any]) -> np.ndarray:
+    """
+    Converte uma coluna de valores crus (strings, números ou None) para
+    float64 em bloco.
+
+    Coluna só com números vira array direto. Senão, cada valor distinto é
+    convertido uma vez (as colunas repetem muito: "800", "1000", "Unknown")
+    e o resultado é espalhado de volta pelo índice do valor.
+    """
+    if not raw:
+        return np.zeros(0)
+
+    try:
+        return np.array(raw, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        index = dict.fromkeys(raw)
+    except TypeError:
+        # Valor que não é hashável (lista, objeto): um por um
+        return np.array([_to_float(value) for value in raw], dtype=np.float64)
+    for position, value in enumerate(index):
+        index[value] = position
+    positions = np.fromiter(map(index.__getitem__, raw), dtype=np.intp, count=len(raw))
+    return _parse_distinct(list(index))[positions]
+
+
+def extract_columns(document: Dict[str, Any]) -> SettingsColumns:
+    """
+    Percorre o documento uma vez juntando os valores crus e converte cada
+    coluna em bloco (ver _parse_column).
+    """
+    game_names = []
+    players_per_game = []
+    mice = []
+    dpi = []
+    hz = []
+    sensitivity_raw = []
+
+    for game_data in document['games']:
+        game_names.append(game_data['name'])
+        count = len(mice)
+        for player in game_data['players']:
+            settings = player.get('settings')
+            mouse = settings.get('mouse_settings') if settings else None
+            if not isinstance(mouse, dict):
+                continue
+
+            mice.append(mouse)
+            dpi.append(mouse.get('dpi'))
+            hz.append(mouse.get('hz'))
+            for key in SENSITIVITY_KEYS:
+                if key in mouse:
+                    sensitivity_raw.append(mouse[key])
+                    break
+            else:
+                sensitivity_raw.append(None)
+        players_per_game.append(len(mice) - count)
+
+    # Se a primeira chave presente não tiver número ("Unknown"), vale a
+    # próxima. São poucos players, então a busca é feita um a um.
+    sensitivity = _parse_column(sensitivity_raw)
+    for position in np.flatnonzero(np.isnan(sensitivity)).tolist():
+        mouse = mice[position]
+        for key in SENSITIVITY_KEYS:
+            value = _to_float(mouse[key]) if key in mouse else math.nan
+            if not math.isnan(value):
+                sensitivity[position] = value
+                break
+
+    return SettingsColumns(
+        game_names,
+        np.repeat(np.arange(len(game_names), dtype=np.int32), players_per_game),
+        _parse_column(dpi),
+        sensitivity,
+        _parse_column(hz),
+    )
+
+
+def describe(values: np.ndarray, bins: int = 10) -> Dict[str, Any]:
+    """
+    Estatísticas de uma coluna (NaN são ignorados).
+    """
+    valid = values[~np.isnan(values)]
+    if valid.size == 0:
+        return {'count': 0}
+
+    counts, edges = np.histogram(valid, bins=bins)
+    unique, unique_counts = np.unique(valid, return_counts=True)
+
+    return {
+        'count': int(valid.size),
+        'mean': float(valid.mean()),
+        'std': float(valid.std()),
+        'min': float(valid.min()),
+        'max': float(valid.max()),
+        'percentiles': dict(zip(PERCENTILES, (float(p) for p in np.percentile(valid, PERCENTILES)))),
+        'mode': float(unique[unique_counts.argmax()]),
+        'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()},
+    }
+
+
+def compute_stats(columns: SettingsColumns, bins: int = 10) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Estatísticas de cada campo, por game: {game: {campo: {...}}}.
+    """
+    stats = {}
+    for game_index, game_name in enumerate(columns.game_names):
+        mask = columns.game == game_index
+        if not mask.any():
+            continue
+        stats[game_name] = {field: describe(columns.column(field)[mask], bins) for field in FIELDS}
+    return stats
+
+
+def report_from_json(json_file: str, bins: int = 10):
+    """
+    Lê o JSON do conversor e mostra as distribuições por game.
+    """
+    print(f"Lendo arquivo JSON: {json_file}")
+    print("=" * 70)
+
+    columns = extract_columns(dict_encoding.load_document(json_file))
+    stats = compute_stats(columns, bins)
+
+    print(f"\n🖱️  MOUSE SETTINGS ({len(columns):,} players com mouse_settings)")
+
+    for game_name, fields in sorted(stats.items(), key=lambda item: item[1]['dpi']['count'], reverse=True):
+        print("\n" + "=" * 70)
+        print(f"🎮 {game_name}")
+        print("=" * 70)
+        print(f"{'Campo':<12} {'N':>5} {'Média':>9} {'P10':>8} {'P25':>8} {'Mediana':>8} {'P75':>8} {'P90':>8} {'Moda':>8}")
+        print("-" * 82)
+
+        for field in FIELDS:
+            data = fields[field]
+            if data['count'] == 0:
+                print(f"{field:<12} {0:>5}")
+                continue
+            p = data['percentiles']
+            print(f"{field:<12} {data['count']:>5} {data['mean']:>9.3f} {p[10]:>8.3g} {p[25]:>8.3g} "
+                  f"{p[50]:>8.3g} {p[75]:>8.3g} {p[90]:>8.3g} {data['mode']:>8.3g}")
+
+        edpi = fields['edpi']
+        if edpi['count']:
+            print(f"\nHistograma de eDPI ({bins} faixas)")
+            edges = edpi['histogram']['edges']
+            counts = edpi['histogram']['counts']
+            largest = max(counts)
+            for count, low, high in zip(counts, edges, edges[1:]):
+                bar = '█' * round(30 * count / largest) if largest else ''
+                print(f"  {low:>9.1f} – {high:<9.1f} {count:>5} {bar}")
+
+    print("\n" + "=" * 70)
+    print("✅ Análise concluída")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estatísticas de mouse_settings por game.")
+    parser.add_argument('json_file', nargs='?', default="prosettings.json",
+                        help="JSON gerado pelo conversor")
+    parser.add_argument('--bins', type=int, default=10,
+                        help="faixas dos histogramas (padrão: 10)")
+    args = parser.parse_args()
+
+    report_from_json(args.json_file, args.bins)
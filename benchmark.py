@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do projeto:
+- parser de VALUES: parser antigo (caractere por caractere) vs tokenizador
+  atual nos INSERTs da tabela settings
+- consultas: busca linear com next(...) vs ProSettingsIndex
+- memória (--memory): documento em dicts (JSON carregado e build_document)
+  vs modelo compacto (model.py), em bytes retidos depois da carga
+- suíte por etapa (--suite): gera dumps sintéticos em várias escalas
+  (generate_dump.py) e mede cada etapa do pipeline em MB/s, registros/s e
+  pico de memória, com comparação contra um baseline salvo
+"""
+
+import contextlib
+import gc
+import json
+import multiprocessing
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+import dict_encoding
+from compare_validation import extract_sql_data
+from conversion_stats import peak_rss_mb
+from generate_dump import generate_dump
+from model import load_dataset
+from prosettings_index import ProSettingsIndex
+from sql_to_json import (
+    _FIELD_RE, build_document, extract_insert_statements, iter_insert_rows,
+    iter_value_chunks, parse_single_value, parse_values,
+)
+from validate_sql import count_from_sql
+
+
+BASELINE_VERSION = 1
+
+
+def legacy_parse_values(values_str: str):
+    """
+    Parser de VALUES da versão anterior, mantido só para comparação.
+    Monta cada campo com `current_value += char` e separa os registros com
+    uma regex que quebra quando uma string contém ")".
+    """
+    rows = []
+    values_str = values_str.strip()
+    pattern = r"\(([^)]*(?:\{[^}]*\}[^)]*)*)\)"
+
+    for match in re.finditer(pattern, values_str, re.DOTALL):
+        row_str = match.group(1)
+        values = []
+        current_value = ""
+        in_string = False
+        in_json = False
+        json_depth = 0
+        escape_next = False
+
+        for char in row_str:
+            if escape_next:
+                current_value += char
+                escape_next = False
+                continue
+
+            if char == '\\':
+                current_value += char
+                escape_next = True
+                continue
+
+            if char == "'" and not in_json:
+                in_string = not in_string
+                current_value += char
+            elif char == '{' and in_string:
+                if json_depth == 0:
+                    in_json = True
+                json_depth += 1
+                current_value += char
+            elif char == '}' and in_json:
+                json_depth -= 1
+                if json_depth == 0:
+                    in_json = False
+                current_value += char
+            elif char == ',' and not in_string and not in_json:
+                values.append(parse_single_value(current_value.strip()))
+                current_value = ""
+            else:
+                current_value += char
+
+        if current_value.strip():
+            values.append(parse_single_value(current_value.strip()))
+
+        rows.append(tuple(values))
+
+    return rows
+
+
+def load_sections(sql_file: str, table: str):
+    """
+    Retorna o texto de VALUES de cada INSERT da tabela informada.
+    """
+    sections = {}
+    for statement, table_name, _, rows in iter_value_chunks(sql_file):
+        if table_name == table:
+            sections.setdefault(statement, []).extend(rows)
+    return [",\n".join(f"({row})" for row in rows) for rows in sections.values()]
+
+
+def measure(parser, sections, repeat: int):
+    """
+    Executa o parser `repeat` vezes e retorna (melhor tempo, registros).
+    """
+    best = None
+    row_count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        row_count = sum(len(parser(section)) for section in sections)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, row_count
+
+
+def run_parser_benchmark(sql_file: str, table: str = 'settings', repeat: int = 5):
+    """
+    Mede o throughput dos dois parsers e mostra o ganho.
+    """
+    print(f"Lendo arquivo SQL: {sql_file}")
+    print("=" * 70)
+
+    sections = load_sections(sql_file, table)
+    size_mb = sum(len(section.encode('utf-8')) for section in sections) / (1024 * 1024)
+
+    print(f"\n⏱️  PARSE DE VALUES ({table}: {len(sections)} INSERTs, {size_mb:.2f} MB)")
+    print("=" * 70)
+    print(f"{'Parser':<20} {'Tempo (s)':>10} {'MB/s':>10} {'Registros/s':>14} {'Registros':>10}")
+    print("-" * 70)
+
+    results = {}
+    for name, parser in (('antigo', legacy_parse_values), ('tokenizador', parse_values)):
+        elapsed, row_count = measure(parser, sections, repeat)
+        results[name] = elapsed
+        print(f"{name:<20} {elapsed:>10.3f} {size_mb / elapsed:>10.2f} {row_count / elapsed:>14,.0f} {row_count:>10,}")
+
+    print("-" * 70)
+    print(f"Ganho: {results['antigo'] / results['tokenizador']:.1f}x")
+
+
+def scan_player(games, game_name: str, player_name: str):
+    """
+    Consulta do jeito do README: duas buscas lineares com next(...).
+    """
+    game = next(g for g in games if g['name'] == game_name)
+    return next(p for p in game['players'] if p['name'] == player_name)
+
+
+def scan_find(games, game_name: str, setting_name: str, key: str, value: str):
+    """
+    Filtro por game e valor de setting percorrendo todos os players.
+    """
+    game = next(g for g in games if g['name'] == game_name)
+    return [p for p in game['players'] if p['settings'].get(setting_name, {}).get(key) == value]
+
+
+def time_calls(function, calls) -> float:
+    """
+    Tempo médio (em microssegundos) de cada chamada.
+    """
+    start = time.perf_counter()
+    for args in calls:
+        function(*args)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+
+def run_index_benchmark(sql_file: str, queries: int = 20000):
+    """
+    Compara a busca linear com o ProSettingsIndex para consultas de player
+    por nome e para filtros por valor de setting.
+    """
+    document = build_document(sql_file)
+    games = document['games']
+
+    start = time.perf_counter()
+    index = ProSettingsIndex(document)
+    build_time = time.perf_counter() - start
+
+    rng = random.Random(42)
+    pairs = [(game['name'], player['name']) for game in games for player in game['players']]
+    player_calls = [rng.choice(pairs) for _ in range(queries)]
+
+    filters = []
+    for game_name, player_name in pairs:
+        player = scan_player(games, game_name, player_name)
+        for key, value in player['settings'].get('mouse_settings', {}).items():
+            filters.append((game_name, 'mouse_settings', key, value))
+    filter_calls = [rng.choice(filters) for _ in range(queries // 10)]
+
+    print(f"\n🔎 CONSULTAS ({len(pairs):,} players, índice montado em {build_time * 1000:.1f} ms)")
+    print("=" * 70)
+    print(f"{'Consulta':<30} {'Busca linear (µs)':>18} {'Índice (µs)':>12} {'Ganho':>8}")
+    print("-" * 70)
+
+    scan = time_calls(partial(scan_player, games), player_calls)
+    indexed = time_calls(index.player, player_calls)
+    print(f"{'player por game e nome':<30} {scan:>18.2f} {indexed:>12.2f} {scan / indexed:>7.0f}x")
+
+    scan = time_calls(partial(scan_find, games), filter_calls)
+    indexed = time_calls(
+        lambda game_name, setting_name, key, value: index.find(game=game_name, settings=[(setting_name, key, value)]),
+        filter_calls,
+    )
+    print(f"{'game + valor de setting':<30} {scan:>18.2f} {indexed:>12.2f} {scan / indexed:>7.0f}x")
+
+
+def _retained_memory(loader: str, source: str) -> Dict[str, float]:
+    # Roda em um processo novo: só o que a carga deixa em memória é medido
+    loaders = {
+        'json': lambda: dict_encoding.load_document(source),
+        'build_document': lambda: build_document(source, quiet=True),
+        'model': lambda: load_dataset(source, quiet=True),
+    }
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = loaders[loader]()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del loaded
+    return {'seconds': elapsed, 'retained_mb': retained / (1024 * 1024)}
+
+
+def run_memory_benchmark(sql_file: str, use_cache: bool = True):
+    """
+    Memória retida pelo dataset carregado: o JSON do conversor com
+    json.load, o documento de build_document (settings iguais já
+    compartilhados) e o modelo compacto. Cada carga roda em um processo
+    separado, medida com tracemalloc (o tempo inclui o overhead dele).
+    """
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_file = os.path.join(tmp_dir, 'output.json')
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(build_document(sql_file, use_cache=use_cache, quiet=True), f, ensure_ascii=False)
+
+        # Com o cache de parse já gravado, as cargas do dump leem o cache
+        sources = {'json': json_file, 'build_document': sql_file, 'model': sql_file}
+        results = {}
+        for loader, source in sources.items():
+            with context.Pool(1) as pool:
+                results[loader] = pool.apply(_retained_memory, (loader, source))
+
+    model_mb = results['model']['retained_mb']
+    print("\n🧠 MEMÓRIA DO DATASET CARREGADO")
+    print("=" * 70)
+    print(f"{'Carga':<30} {'Retido (MB)':>12} {'Tempo (s)':>10} {'vs modelo':>10}")
+    print("-" * 70)
+    labels = {
+        'json': 'JSON (json.load)',
+        'build_document': 'build_document (dicts)',
+        'model': 'modelo compacto (model.py)',
+    }
+    for loader, result in results.items():
+        print(f"{labels[loader]:<30} {result['retained_mb']:>12.1f} {result['seconds']:>10.2f} "
+              f"{result['retained_mb'] / model_mb:>9.1f}x")
+
+
+# Etapas da suíte. Cada uma recebe o dump e retorna (segundos, bytes, registros),
+# medindo só a etapa: a preparação (ex: ler as seções antes do parse) fica fora
+# do tempo, mas dentro do pico de memória do processo.
+
+def _stage_extract(sql_file: str) -> Tuple[float, int, int]:
+    start = time.perf_counter()
+    inserts = extract_insert_statements(sql_file)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(sql_file), sum(len(data['values']) for data in inserts.values())
+
+
+def _stage_parse_values(sql_file: str) -> Tuple[float, int, int]:
+    sections = [values for data in extract_insert_statements(sql_file).values() for values in data['values']]
+    start = time.perf_counter()
+    row_count = sum(len(parse_values(section)) for section in sections)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(len(section.encode('utf-8')) for section in sections), row_count
+
+
+def _stage_parse_single_value(sql_file: str) -> Tuple[float, int, int]:
+    tokens = [match.group(0) for _, _, _, rows in iter_value_chunks(sql_file)
+              for row in rows for match in _FIELD_RE.finditer(row)]
+    start = time.perf_counter()
+    for token in tokens:
+        parse_single_value(token)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(len(token.encode('utf-8')) for token in tokens), len(tokens)
+
+
+def _stage_stream_rows(sql_file: str) -> Tuple[float, int, int]:
+    start = time.perf_counter()
+    row_count = sum(1 for _ in iter_insert_rows(sql_file))
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(sql_file), row_count
+
+
+def _stage_load_model(sql_file: str) -> Tuple[float, int, int]:
+    start = time.perf_counter()
+    dataset = load_dataset(sql_file, use_cache=False)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(sql_file), dataset.player_count
+
+
+def _stage_build_document(sql_file: str) -> Tuple[float, int, int]:
+    start = time.perf_counter()
+    document = build_document(sql_file, use_cache=False)
+    elapsed = time.perf_counter() - start
+    players = sum(len(game['players']) for game in document['games'])
+    return elapsed, os.path.getsize(sql_file), players
+
+
+def _stage_analytics(sql_file: str) -> Tuple[float, int, int]:
+    # NumPy só é exigido por esta etapa
+    import analytics
+
+    document = build_document(sql_file, use_cache=False)
+    start = time.perf_counter()
+    columns = analytics.extract_columns(document)
+    analytics.compute_stats(columns)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(sql_file), len(columns)
+
+
+def _stage_json_write(sql_file: str) -> Tuple[float, int, int]:
+    document = build_document(sql_file, use_cache=False)
+    players = sum(len(game['players']) for game in document['games'])
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, 'output.json')
+        start = time.perf_counter()
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+        elapsed = time.perf_counter() - start
+        return elapsed, os.path.getsize(output_file), players
+
+
+def _stage_validate_sql(sql_file: str) -> Tuple[float, int, int]:
+    start = time.perf_counter()
+    count_from_sql(sql_file, use_cache=False)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(sql_file), 0
+
+
+def _stage_compare_validation(sql_file: str) -> Tuple[float, int, int]:
+    start = time.perf_counter()
+    extract_sql_data(sql_file, use_cache=False)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(sql_file), 0
+
+
+# Nome → (função, unidade dos "registros")
+SUITE_STAGES = {
+    'extract_insert_statements': (_stage_extract, 'INSERTs'),
+    'parse_values': (_stage_parse_values, 'registros'),
+    'parse_single_value': (_stage_parse_single_value, 'valores'),
+    'iter_insert_rows': (_stage_stream_rows, 'registros'),
+    'build_document': (_stage_build_document, 'players'),
+    'load_model': (_stage_load_model, 'players'),
+    'json_write': (_stage_json_write, 'players'),
+    'analytics': (_stage_analytics, 'players'),
+    'validate_sql': (_stage_validate_sql, ''),
+    'compare_validation': (_stage_compare_validation, ''),
+}
+
+
+def _run_stage(stage: str, sql_file: str) -> Dict[str, float]:
+    # Roda em um processo novo: o VmHWM recomeça no exec, então o pico é
+    # desta etapa (mais o interpretador e os imports), não do processo pai
+    function, _ = SUITE_STAGES[stage]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        elapsed, size, row_count = function(sql_file)
+    return {
+        'seconds': elapsed,
+        'mb_per_s': size / (1024 * 1024) / elapsed,
+        'rows_per_s': row_count / elapsed if row_count else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def measure_stage(stage: str, sql_file: str) -> Dict[str, float]:
+    """
+    Mede uma etapa em um processo separado (spawn, sem herdar a memória
+    deste processo).
+    """
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(_run_stage, (stage, sql_file))
+
+
+def synthetic_dump_path(work_dir: str, scale: float) -> str:
+    """
+    Gera (ou reaproveita) o dump sintético da escala informada.
+    """
+    sql_file = os.path.join(work_dir, f"synthetic_x{scale:g}.sql")
+    if not os.path.exists(sql_file):
+        print(f"Gerando dump sintético (escala {scale:g}): {sql_file}")
+        generate_dump(sql_file, scale)
+    return sql_file
+
+
+def load_baseline(baseline_file: str) -> Optional[Dict[str, Any]]:
+    """
+    Resultados salvos por uma execução anterior, ou None.
+    """
+    if not os.path.exists(baseline_file):
+        return None
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('version') != BASELINE_VERSION:
+        print(f"Aviso: baseline {baseline_file} com versão diferente - ignorado")
+        return None
+    return baseline
+
+
+def save_baseline(baseline_file: str, results: Dict[str, Dict[str, Dict[str, float]]]):
+    """
+    Grava os resultados da suíte para comparar nas próximas execuções.
+    Escalas que não foram medidas agora mantêm o valor anterior.
+    """
+    baseline = load_baseline(baseline_file) or {'version': BASELINE_VERSION, 'results': {}}
+    baseline['results'].update(results)
+    with open(baseline_file, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+    print(f"\nBaseline salvo em: {baseline_file}")
+
+
+def run_suite(scales: List[float], work_dir: str, stages: Optional[List[str]] = None,
+              baseline_file: Optional[str] = None, save: bool = False) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Mede cada etapa em cada escala. Com `baseline_file`, mostra a variação de
+    MB/s e de memória em relação ao baseline; com `save`, grava os
+    resultados nele.
+    """
+    stages = stages or list(SUITE_STAGES)
+    baseline = load_baseline(baseline_file) if baseline_file else None
+    os.makedirs(work_dir, exist_ok=True)
+
+    results = {}
+    for scale in scales:
+        sql_file = synthetic_dump_path(work_dir, scale)
+        size_mb = os.path.getsize(sql_file) / (1024 * 1024)
+        previous = (baseline or {}).get('results', {}).get(f"{scale:g}", {})
+
+        print(f"\n⏱️  SUÍTE POR ETAPA (escala {scale:g}: {size_mb:.1f} MB)")
+        print("=" * 70)
+        print(f"{'Etapa':<26} {'Tempo (s)':>9} {'MB/s':>8} {'Itens/s':>20} {'Pico (MB)':>9}  vs baseline")
+        print("-" * 92)
+
+        scale_results = results[f"{scale:g}"] = {}
+        for stage in stages:
+            result = scale_results[stage] = measure_stage(stage, sql_file)
+            unit = SUITE_STAGES[stage][1]
+            rows_per_s = f"{result['rows_per_s']:,.0f} {unit}" if result['rows_per_s'] else '-'
+
+            comparison = ''
+            if stage in previous:
+                speed = result['mb_per_s'] / previous[stage]['mb_per_s'] - 1
+                memory = result['peak_rss_mb'] / previous[stage]['peak_rss_mb'] - 1
+                comparison = f"{speed:+.0%} vel {memory:+.0%} mem"
+
+            print(f"{stage:<26} {result['seconds']:>9.3f} {result['mb_per_s']:>8.2f} {rows_per_s:>20} "
+                  f"{result['peak_rss_mb']:>9.1f}  {comparison}")
+
+    if save and baseline_file:
+        save_baseline(baseline_file, results)
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks do conversor.")
+    parser.add_argument('sql_file', nargs='?', default="bdprosettingscorreto.sql",
+                        help="dump usado nos benchmarks de parser e de consultas")
+    parser.add_argument('--memory', action='store_true',
+                        help="compara a memória do documento em dicts com a do modelo compacto")
+    parser.add_argument('--suite', action='store_true',
+                        help="roda a suíte por etapa nos dumps sintéticos")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1, 10],
+                        help="escalas dos dumps sintéticos (ex: 1 10 100 1000)")
+    parser.add_argument('--stages', nargs='+', choices=list(SUITE_STAGES),
+                        help="etapas medidas (padrão: todas)")
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'prosettings_bench'),
+                        help="onde os dumps sintéticos são gerados e reaproveitados")
+    parser.add_argument('--baseline', default="benchmark_baseline.json",
+                        help="arquivo de baseline para comparação")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="grava os resultados como novo baseline")
+    args = parser.parse_args()
+
+    if args.memory:
+        run_memory_benchmark(args.sql_file)
+    elif args.suite:
+        run_suite(args.scales, args.work_dir, args.stages, args.baseline, args.save_baseline)
+    else:
+        run_parser_benchmark(args.sql_file)
+        run_index_benchmark(args.sql_file)
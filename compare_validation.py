@@ -2,94 +2,269 @@
 """
 Compara os resultados da validação SQL vs JSON.
 Mostra diferenças e verifica integridade dos dados.
+
+A comparação é registro a registro, por uma árvore de digests (estilo
+Merkle) montada dos dois lados:
+
+    raiz
+    └── game (chave: id do game, com a extensão da imagem)
+        ├── campos do game
+        └── player (chave: id do player)
+            ├── campos do player (nome, time, imagem...)
+            └── setting (chave: name) → valor
+
+Cada registro vira o digest do seu JSON canônico, e o digest de cada nó
+combina o do seu registro com os dos filhos. As árvores são comparadas de
+cima para baixo: quando o digest de um nó bate, nada abaixo dele é
+visitado; quando não bate, só os filhos diferentes são percorridos até os
+registros que mudaram.
+
+No lado SQL o join é refeito aqui (games, players, game_player e settings),
+sem usar o GamesDocumentBuilder do conversor, com as mesmas regras do
+documento: campos removidos, imagem no id, links para game ou player
+inexistente ignorados.
 """
 
-import re
+import hashlib
 import json
-from collections import defaultdict
-
-
-def extract_sql_data(sql_file: str):
-    """Extrai dados do SQL."""
-    with open(sql_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Extrai game_player
-    game_player_pattern = r"INSERT\s+INTO\s+`game_player`.*?VALUES\s+(.*?);"
-    gp_match = re.search(game_player_pattern, content, re.IGNORECASE | re.DOTALL)
-
-    game_player_counts = defaultdict(int)
-    if gp_match:
-        gp_values = gp_match.group(1)
-        row_pattern = r"\('([a-f0-9\-]+)',\s*'([a-f0-9\-]+)',\s*'([a-f0-9\-]+)'"
-        for match in re.finditer(row_pattern, gp_values):
-            game_id = match.group(2)
-            game_player_counts[game_id] += 1
-
-    # Extrai nomes dos games
-    games_pattern = r"INSERT\s+INTO\s+`games`.*?VALUES\s+(.*?);"
-    games_match = re.search(games_pattern, content, re.IGNORECASE | re.DOTALL)
-
-    game_names = {}
-    if games_match:
-        games_values = games_match.group(1)
-        game_row_pattern = r"\('([a-f0-9\-]+)',\s*'([^']+)'"
-        for match in re.finditer(game_row_pattern, games_values):
-            game_id = match.group(1)
-            game_name = match.group(2)
-            game_names[game_id] = game_name
-
-    # Conta settings
-    settings_pattern = r"INSERT\s+INTO\s+`settings`"
-    settings_count = 0
-    for match in re.finditer(settings_pattern, content, re.IGNORECASE):
-        settings_count += 1
-
-    return {
-        'games': len(game_names),
-        'players_total': sum(game_player_counts.values()),
-        'game_player_counts': {game_names.get(gid, gid): count for gid, count in game_player_counts.items()},
-        'settings_inserts': settings_count
-    }
-
-
-def extract_json_data(json_file: str):
-    """Extrai dados do JSON."""
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    games = data.get('games', [])
-
-    game_player_counts = {}
-    total_players = 0
-    total_settings = 0
-
-    for game in games:
-        game_name = game.get('name', 'Unknown')
-        player_count = len(game.get('players', []))
-        game_player_counts[game_name] = player_count
-        total_players += player_count
-
+from typing import Any, Dict, List, Optional, Tuple
+
+import dict_encoding
+from sql_to_json import compact_record, iter_table_chunks
+
+
+# Diferenças mostradas por extenso (as demais só são contadas)
+MAX_REPORTED = 50
+
+
+# Um encoder só para todos os registros (json.dumps monta um a cada chamada)
+_CANONICAL = json.JSONEncoder(sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+
+def record_digest(record: Any) -> bytes:
+    """
+    Digest do JSON canônico de um registro (chaves ordenadas, sem espaços).
+    """
+    return hashlib.blake2b(_CANONICAL.encode(record).encode('utf-8'), digest_size=16).digest()
+
+
+class DigestNode:
+    """
+    Nó da árvore: um registro (opcional), os filhos por chave e as folhas
+    (registros sem filhos, guardados como (digest, registro) em vez de nós).
+    O digest é calculado uma vez, em `seal`, depois que todos os filhos
+    foram incluídos.
+    """
+
+    __slots__ = ('label', 'record', 'record_digest', 'children', 'leaves', 'digest')
+
+    def __init__(self, label: str, record: Any = None):
+        self.label = label
+        self.record = record
+        self.record_digest = record_digest(record)
+        self.children: Dict[str, 'DigestNode'] = {}
+        self.leaves: Dict[str, Tuple[bytes, Any]] = {}
+        self.digest = b''
+
+    def add(self, key: str, child: 'DigestNode'):
+        # Chaves repetidas (ex: o mesmo player duas vezes num game) viram chaves distintas
+        unique_key = key
+        repeat = 2
+        while unique_key in self.children:
+            unique_key = f"{key}#{repeat}"
+            repeat += 1
+        self.children[unique_key] = child
+
+    def add_leaf(self, key: str, record: Any, digest: bytes):
+        self.leaves[key] = (digest, record)
+
+    def seal(self) -> bytes:
+        digest = hashlib.blake2b(self.record_digest, digest_size=16)
+        for key in sorted(self.children):
+            digest.update(key.encode('utf-8'))
+            digest.update(self.children[key].seal())
+        for key in sorted(self.leaves):
+            digest.update(b'\0' + key.encode('utf-8'))
+            digest.update(self.leaves[key][0])
+        self.digest = digest.digest()
+        return self.digest
+
+    def size(self) -> int:
+        return 1 + len(self.leaves) + sum(child.size() for child in self.children.values())
+
+
+def _game_node(game: Dict[str, Any]) -> DigestNode:
+    return DigestNode(str(game.get('name', game.get('id'))), game)
+
+
+def _player_node(player: Dict[str, Any], settings: Dict[str, Any],
+                 digests: Dict[int, Tuple[Any, bytes]]) -> DigestNode:
+    """
+    Nó de um player, com os settings como folhas. `digests` guarda o digest
+    por objeto: settings compartilhados (SettingsPool, formato pool) são
+    serializados uma vez só.
+    """
+    node = DigestNode(str(player.get('name', player.get('id'))), player)
+    for setting_name, setting_value in settings.items():
+        # O objeto fica junto do digest para o id não ser reaproveitado
+        known = digests.get(id(setting_value))
+        if known is None or known[0] is not setting_value:
+            known = digests[id(setting_value)] = (setting_value, record_digest(setting_value))
+        node.add_leaf(setting_name, setting_value, known[1])
+    return node
+
+
+def extract_sql_data(sql_file: str, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Monta a árvore esperada a partir dos registros do SQL (ou do cache de
+    registros parseados). Retorna {'tree': raiz, 'links_skipped': n}.
+    """
+    games = {}
+    players = {}
+    links = []
+    settings = {}
+
+    for _, table_name, columns, rows in iter_table_chunks(sql_file, use_cache=use_cache):
+        if table_name not in ('games', 'players', 'game_player', 'settings'):
+            continue
+        records = [dict(zip(columns, row)) for row in rows if len(row) == len(columns)]
+        if table_name == 'games':
+            for record in records:
+                games[record['id']] = record
+        elif table_name == 'players':
+            for record in records:
+                players[record['id']] = record
+        elif table_name == 'game_player':
+            links.extend((record['game_id'], record['player_id']) for record in records)
+        else:
+            for record in records:
+                key = (record['game_id'], record['player_id'])
+                settings.setdefault(key, {})[record['name']] = record['value']
+
+    root = DigestNode('raiz')
+    game_nodes = {}
+    for game_id, game in games.items():
+        compact = compact_record(game)
+        game_nodes[game_id] = node = _game_node(compact)
+        root.add(compact['id'], node)
+
+    links_skipped = 0
+    digests = {}
+    for game_id, player_id in links:
+        if game_id not in game_nodes or player_id not in players:
+            links_skipped += 1
+            continue
+        compact = compact_record(players[player_id])
+        game_nodes[game_id].add(compact['id'], _player_node(compact, settings.get((game_id, player_id), {}), digests))
+
+    root.seal()
+    return {'tree': root, 'links_skipped': links_skipped}
+
+
+def extract_json_data(json_file: str) -> Dict[str, Any]:
+    """
+    Monta a árvore a partir do JSON gerado (formato comum, dict ou pool).
+    Retorna {'tree': raiz}.
+    """
+    document = dict_encoding.load_document(json_file)
+
+    root = DigestNode('raiz')
+    digests = {}
+    for game in document.get('games', []):
+        fields = {key: value for key, value in game.items() if key != 'players'}
+        node = _game_node(fields)
         for player in game.get('players', []):
-            if 'settings' in player:
-                total_settings += len(player['settings'])
-
-    return {
-        'games': len(games),
-        'players_total': total_players,
-        'game_player_counts': game_player_counts,
-        'settings_total': total_settings
-    }
-
-
-def compare_data(sql_file: str, json_file: str):
+            player_fields = {key: value for key, value in player.items() if key != 'settings'}
+            node.add(player_fields.get('id'), _player_node(player_fields, player.get('settings', {}), digests))
+        root.add(fields.get('id'), node)
+
+    root.seal()
+    return {'tree': root}
+
+
+def diff_trees(sql_node: DigestNode, json_node: DigestNode,
+               path: Tuple[str, ...] = ()) -> Tuple[List[Tuple[Tuple[str, ...], str, Any, Any]], int]:
+    """
+    Compara as árvores de cima para baixo. Retorna as diferenças
+    (caminho, tipo, registro no SQL, registro no JSON) e quantos nós foram
+    visitados.
+    """
+    differences = []
+    visited = 1
+    if sql_node.digest == json_node.digest:
+        return differences, visited
+
+    if sql_node.record_digest != json_node.record_digest:
+        differences.append((path, 'registro diferente', sql_node.record, json_node.record))
+
+    for key in sorted(set(sql_node.children) | set(json_node.children)):
+        sql_child = sql_node.children.get(key)
+        json_child = json_node.children.get(key)
+        if json_child is None:
+            differences.append((path + (sql_child.label,), 'só no SQL', sql_child.record, None))
+        elif sql_child is None:
+            differences.append((path + (json_child.label,), 'só no JSON', None, json_child.record))
+        else:
+            child_differences, child_visited = diff_trees(sql_child, json_child, path + (sql_child.label,))
+            differences.extend(child_differences)
+            visited += child_visited
+
+    for key in sorted(set(sql_node.leaves) | set(json_node.leaves)):
+        sql_leaf = sql_node.leaves.get(key)
+        json_leaf = json_node.leaves.get(key)
+        if json_leaf is None:
+            differences.append((path + (key,), 'só no SQL', sql_leaf[1], None))
+        elif sql_leaf is None:
+            differences.append((path + (key,), 'só no JSON', None, json_leaf[1]))
+        else:
+            visited += 1
+            if sql_leaf[0] != json_leaf[0]:
+                differences.append((path + (key,), 'registro diferente', sql_leaf[1], json_leaf[1]))
+
+    return differences, visited
+
+
+def _short(value: Any, limit: int = 60) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+def _describe(kind: str, sql_record: Any, json_record: Any) -> List[str]:
+    """
+    Linhas do relatório para uma diferença; em registros diferentes, os
+    campos que mudaram.
+    """
+    if kind != 'registro diferente':
+        return [kind]
+    if not (isinstance(sql_record, dict) and isinstance(json_record, dict)):
+        return [f"SQL {_short(sql_record)} ≠ JSON {_short(json_record)}"]
+
+    lines = []
+    for key in sorted(set(sql_record) | set(json_record)):
+        if key not in json_record:
+            lines.append(f"{key}: só no SQL ({_short(sql_record[key])})")
+        elif key not in sql_record:
+            lines.append(f"{key}: só no JSON ({_short(json_record[key])})")
+        elif record_digest(sql_record[key]) != record_digest(json_record[key]):
+            lines.append(f"{key}: SQL {_short(sql_record[key])} ≠ JSON {_short(json_record[key])}")
+    return lines
+
+
+def compare_data(sql_file: str, json_file: str, use_cache: bool = True):
     """Compara dados do SQL e JSON."""
     print("=" * 70)
     print("COMPARAÇÃO: SQL vs JSON")
     print("=" * 70)
 
-    sql_data = extract_sql_data(sql_file)
+    sql_data = extract_sql_data(sql_file, use_cache)
     json_data = extract_json_data(json_file)
+    sql_tree = sql_data['tree']
+    json_tree = json_data['tree']
+
+    sql_counts = {game.label: len(game.children) for game in sql_tree.children.values()}
+    json_counts = {game.label: len(game.children) for game in json_tree.children.values()}
+    sql_players = sum(sql_counts.values())
+    json_players = sum(json_counts.values())
 
     # Comparação geral
     print("\n📊 TOTAIS")
@@ -97,11 +272,13 @@ def compare_data(sql_file: str, json_file: str):
     print(f"{'Métrica':<30} {'SQL':>15} {'JSON':>15} {'Match':>8}")
     print("-" * 70)
 
-    games_match = "✅" if sql_data['games'] == json_data['games'] else "❌"
-    players_match = "✅" if sql_data['players_total'] == json_data['players_total'] else "❌"
+    games_match = "✅" if len(sql_tree.children) == len(json_tree.children) else "❌"
+    players_match = "✅" if sql_players == json_players else "❌"
 
-    print(f"{'Games':<30} {sql_data['games']:>15,} {json_data['games']:>15,} {games_match:>8}")
-    print(f"{'Players (total)':<30} {sql_data['players_total']:>15,} {json_data['players_total']:>15,} {players_match:>8}")
+    print(f"{'Games':<30} {len(sql_tree.children):>15,} {len(json_tree.children):>15,} {games_match:>8}")
+    print(f"{'Players (total)':<30} {sql_players:>15,} {json_players:>15,} {players_match:>8}")
+    if sql_data['links_skipped']:
+        print(f"   ({sql_data['links_skipped']} game_player com game/player inexistente ignorados no SQL)")
 
     # Comparação por game
     print("\n" + "=" * 70)
@@ -110,44 +287,54 @@ def compare_data(sql_file: str, json_file: str):
     print(f"{'Game':<30} {'SQL':>15} {'JSON':>15} {'Match':>8}")
     print("-" * 70)
 
-    all_games = set(sql_data['game_player_counts'].keys()) | set(json_data['game_player_counts'].keys())
-
-    all_match = True
-    for game_name in sorted(all_games, key=lambda g: sql_data['game_player_counts'].get(g, 0), reverse=True):
-        sql_count = sql_data['game_player_counts'].get(game_name, 0)
-        json_count = json_data['game_player_counts'].get(game_name, 0)
+    for game_name in sorted(set(sql_counts) | set(json_counts), key=lambda g: sql_counts.get(g, 0), reverse=True):
+        sql_count = sql_counts.get(game_name, 0)
+        json_count = json_counts.get(game_name, 0)
         match = "✅" if sql_count == json_count else "❌"
+        print(f"{game_name:<30} {sql_count:>15,} {json_count:>15,} {match:>8}")
 
-        if sql_count != json_count:
-            all_match = False
+    # Comparação registro a registro
+    differences, visited = diff_trees(sql_tree, json_tree)
 
-        print(f"{game_name:<30} {sql_count:>15,} {json_count:>15,} {match:>8}")
+    print("\n" + "=" * 70)
+    print("🌳 REGISTROS (árvore de digests)")
+    print("-" * 70)
+    print(f"Raiz SQL:  {sql_tree.digest.hex()}")
+    print(f"Raiz JSON: {json_tree.digest.hex()}")
+    print(f"Nós visitados: {visited:,} de {sql_tree.size():,}")
+
+    for path, kind, sql_record, json_record in differences[:MAX_REPORTED]:
+        print(f"\n❌ {' › '.join(path) or 'raiz'}")
+        for line in _describe(kind, sql_record, json_record):
+            print(f"   {line}")
+    if len(differences) > MAX_REPORTED:
+        print(f"\n... e mais {len(differences) - MAX_REPORTED} diferenças")
 
     # Resultado final
     print("\n" + "=" * 70)
     print("RESULTADO DA VALIDAÇÃO")
     print("=" * 70)
 
-    if all_match and games_match == "✅" and players_match == "✅":
+    if not differences:
         print("\n✅ TODOS OS DADOS BATEM PERFEITAMENTE!")
-        print("   Nenhum dado foi perdido na conversão SQL → JSON")
+        print("   Games, players e settings idênticos, registro a registro")
     else:
-        print("\n⚠️  ATENÇÃO: Existem diferenças entre SQL e JSON")
-        print("   Verifique os dados acima para identificar discrepâncias")
+        print(f"\n⚠️  ATENÇÃO: {len(differences)} diferenças entre SQL e JSON")
+        print("   Verifique os registros acima para identificar discrepâncias")
 
     print("\n" + "=" * 70)
 
 
 if __name__ == "__main__":
-    import sys
-
-    sql_file = "bdprosettingscorreto.sql"
-    json_file = "prosettings.json"
-
-    if len(sys.argv) > 1:
-        sql_file = sys.argv[1]
-
-    if len(sys.argv) > 2:
-        json_file = sys.argv[2]
-
-    compare_data(sql_file, json_file)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compara os dados do dump SQL com o JSON gerado.")
+    parser.add_argument('sql_file', nargs='?', default="bdprosettingscorreto.sql",
+                        help="arquivo SQL de entrada (pode estar comprimido com gzip, bz2 ou xz)")
+    parser.add_argument('json_file', nargs='?', default="prosettings.json",
+                        help="arquivo JSON gerado pelo conversor (formato comum, dict ou pool)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="não lê nem grava o cache de registros parseados")
+    args = parser.parse_args()
+
+    compare_data(args.sql_file, args.json_file, use_cache=not args.no_cache)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Leitura transparente de arquivos comprimidos (gzip, bz2 e xz) e gravação
+de cópias .gz da saída, só com a biblioteca padrão.
+
+A compressão é detectada pelos primeiros bytes do arquivo, não pela
+extensão, e o conteúdo é descomprimido em streaming direto para quem lê:
+o dump `.sql.gz` nunca é descomprimido para o disco.
+
+    with open_text('bdprosettings.sql.xz') as f:
+        chunk = f.read(1 << 20)
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+from typing import BinaryIO, Optional, TextIO
+
+
+# Assinaturas no início de cada formato
+MAGIC_BYTES = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+)
+
+_OPENERS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open,
+}
+
+GZIP_SUFFIX = '.gz'
+
+# Extensão usual de cada formato
+SUFFIXES = {
+    'gzip': GZIP_SUFFIX,
+    'bz2': '.bz2',
+    'xz': '.xz',
+}
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    'gzip', 'bz2', 'xz' ou None (arquivo sem compressão).
+    """
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, name in MAGIC_BYTES:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def strip_suffix(path: str) -> str:
+    """
+    `path` sem a extensão da compressão detectada (ex: "x.json.gz" →
+    "x.json"). Arquivos sem compressão, ou com outra extensão, voltam iguais.
+    """
+    compression = detect_compression(path)
+    if compression is not None and path.lower().endswith(SUFFIXES[compression]):
+        return path[:-len(SUFFIXES[compression])]
+    return path
+
+
+def open_text(path: str, encoding: str = 'utf-8') -> TextIO:
+    """
+    Abre o arquivo para leitura de texto, descomprimindo se necessário.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path, 'r', encoding=encoding)
+    return _OPENERS[compression](path, 'rt', encoding=encoding)
+
+
+def open_binary(path: str) -> BinaryIO:
+    """
+    Abre o arquivo para leitura de bytes, descomprimindo se necessário.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path, 'rb')
+    return _OPENERS[compression](path, 'rb')
+
+
+def write_gzip_copy(path: str, compresslevel: int = 9) -> str:
+    """
+    Grava `path` + '.gz' ao lado do arquivo e retorna o caminho.
+
+    O cabeçalho gzip não leva data de modificação, então a mesma entrada
+    gera sempre os mesmos bytes (bom para cache em CDN).
+    """
+    gz_path = path + GZIP_SUFFIX
+    tmp_path = gz_path + '.tmp'
+    with open(path, 'rb') as src, open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(filename=os.path.basename(path), mode='wb',
+                           fileobj=raw, compresslevel=compresslevel, mtime=0) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+    os.replace(tmp_path, gz_path)
+    return gz_path
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Métricas da conversão: tempo por etapa, contadores de bytes e registros,
+pico de memória e profiling opcional de uma etapa.
+
+Etapas medidas pelo conversor:
+- read: leitura do arquivo em blocos
+- tokenize: separação dos registros "(...)" de cada INSERT
+- row-parse: separação dos campos de cada registro
+- value-decode: conversão dos campos (escapes, JSON, NULL, números)
+- join: montagem dos registros e do documento games → players → settings
+- hash: hashes por registro do modo --incremental
+- serialize: gravação do JSON (e do snapshot)
+- sqlite: carga do banco do --sqlite
+
+Uso:
+
+    stats = ConversionStats(profile_stage='value-decode')
+    convert_to_json('dump.sql', 'saida.json', stats=stats)
+    stats.write_json('stats.json')
+
+Com `workers` > 1, row-parse e value-decode somam o tempo de todos os
+processos do pool. Com `--pipeline` as etapas rodam ao mesmo tempo em
+threads diferentes, então a soma dos tempos pode passar do tempo total.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+STAGES = ('read', 'tokenize', 'row-parse', 'value-decode', 'join', 'hash', 'serialize', 'sqlite')
+
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    """
+    Pico de memória (RSS) deste processo, ou, com `children=True`, um limite
+    superior do pico do maior processo filho já encerrado.
+
+    No Linux o pico deste processo vem do VmHWM de /proc/self/status, que
+    recomeça no exec. O ru_maxrss do getrusage não recomeça: um processo
+    criado com fork/exec (ex: o spawn do multiprocessing) já nasce com o
+    pico do pai. Em outros sistemas, e para os filhos, fica o ru_maxrss.
+    """
+    if not children:
+        try:
+            with open('/proc/self/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError, IndexError):
+            pass
+
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class ConversionStats:
+    """
+    Acumula tempo e número de chamadas por etapa e contadores livres
+    (inteiros ou dicionários por tabela).
+
+    Com `profile_stage`, a etapa escolhida roda sob cProfile ou tracemalloc
+    (`profile_mode`) em todas as vezes que é executada neste processo.
+    """
+
+    def __init__(self, profile_stage: Optional[str] = None, profile_mode: str = 'cprofile'):
+        if profile_mode not in PROFILE_MODES:
+            raise ValueError(f"Modo de profiling desconhecido: {profile_mode!r}")
+
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, Any] = {}
+        self.info: Dict[str, Any] = {}
+        self.started = time.perf_counter()
+        self.finished = None
+        # Etapas do modo --pipeline rodam em threads diferentes
+        self._lock = threading.Lock()
+
+        self.profile_stage = profile_stage
+        self.profile_mode = profile_mode
+        self._profiler = cProfile.Profile() if profile_stage and profile_mode == 'cprofile' else None
+        self._traced_peak = 0
+        self._traced_snapshot = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mede o bloco como uma execução da etapa `name`.
+        """
+        profiling = name == self.profile_stage
+        if profiling:
+            self._start_profile()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+            if profiling:
+                self._stop_profile()
+
+    def add_time(self, name: str, seconds: float, calls: int = 1):
+        """
+        Soma um tempo já medido (ex: devolvido por um processo do pool).
+        """
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {'seconds': 0.0, 'calls': 0}
+            stage['seconds'] += seconds
+            stage['calls'] += calls
+
+    def count(self, name: str, amount: int = 1, table: Optional[str] = None):
+        """
+        Incrementa um contador; com `table`, o contador é um dicionário por tabela.
+        """
+        with self._lock:
+            if table is None:
+                self.counters[name] = self.counters.get(name, 0) + amount
+            else:
+                per_table = self.counters.setdefault(name, {})
+                per_table[table] = per_table.get(table, 0) + amount
+
+    def finish(self):
+        """
+        Marca o fim da conversão (usado no tempo total).
+        """
+        self.finished = time.perf_counter()
+
+    def _start_profile(self):
+        if self._profiler is not None:
+            self._profiler.enable()
+        else:
+            tracemalloc.start()
+
+    def _stop_profile(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            return
+
+        _, peak = tracemalloc.get_traced_memory()
+        if peak >= self._traced_peak:
+            self._traced_peak = peak
+            self._traced_snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Métricas em formato serializável (o conteúdo de --stats-json).
+        """
+        total = (self.finished or time.perf_counter()) - self.started
+        input_mb = self.counters.get('input_bytes', 0) / (1024 * 1024)
+        rows = sum(self.counters.get('rows', {}).values())
+
+        result = dict(self.info)
+        result.update({
+            'total_seconds': total,
+            'peak_rss_mb': peak_rss_mb(),
+            # Só um limite superior: o filho criado por fork já nasce com o
+            # pico do pai, então o valor nunca fica abaixo de peak_rss_mb
+            'peak_rss_children_bound_mb': peak_rss_mb(children=True),
+            'stages': {name: dict(values) for name, values in self.stages.items()},
+            'counters': self.counters,
+            'throughput': {
+                'mb_per_s': input_mb / total if total else None,
+                'rows_per_s': rows / total if total else None,
+            },
+        })
+        if self.profile_stage:
+            result['profile'] = {'stage': self.profile_stage, 'mode': self.profile_mode}
+            if self.profile_mode == 'tracemalloc':
+                result['profile']['traced_peak_mb'] = self._traced_peak / (1024 * 1024)
+        return result
+
+    def write_json(self, path: str):
+        """
+        Grava as métricas em JSON.
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report(self):
+        """
+        Mostra o tempo de cada etapa e os contadores principais.
+        """
+        data = self.to_dict()
+        total = data['total_seconds']
+
+        print("\n=== MÉTRICAS ===")
+        print(f"{'Etapa':<14} {'Tempo (s)':>10} {'%':>6} {'Chamadas':>10}")
+        for name in sorted(self.stages, key=lambda stage: STAGES.index(stage) if stage in STAGES else len(STAGES)):
+            stage = self.stages[name]
+            share = 100 * stage['seconds'] / total if total else 0
+            print(f"{name:<14} {stage['seconds']:>10.3f} {share:>5.1f}% {stage['calls']:>10,}")
+
+        print(f"{'total':<14} {total:>10.3f}")
+        throughput = data['throughput']
+        if throughput['mb_per_s'] is not None:
+            print(f"Throughput: {throughput['mb_per_s']:.2f} MB/s, {throughput['rows_per_s']:,.0f} registros/s")
+        skipped = sum(self.counters.get('rows_skipped', {}).values())
+        print(f"Registros ignorados (colunas erradas): {skipped}")
+        print(f"Pico de memória (RSS): {data['peak_rss_mb']:.1f} MB")
+
+    def profile_report(self, limit: int = 25) -> str:
+        """
+        Texto com o resultado do profiling da etapa escolhida.
+        """
+        if self._profiler is not None:
+            output = io.StringIO()
+            pstats.Stats(self._profiler, stream=output).sort_stats('cumulative').print_stats(limit)
+            return output.getvalue()
+
+        if self._traced_snapshot is None:
+            return f"Etapa {self.profile_stage} não foi executada neste processo"
+
+        # O tracemalloc é reiniciado a cada execução da etapa: o pico é o da
+        # maior execução, sem contar o que execuções anteriores deixaram vivo
+        lines = [f"Pico alocado em uma execução da etapa {self.profile_stage}: "
+                 f"{self._traced_peak / (1024 * 1024):.1f} MB",
+                 "Maiores alocações ainda vivas no fim dessa execução:"]
+        for stat in self._traced_snapshot.statistics('lineno')[:limit]:
+            lines.append(f"  {stat}")
+        return "\n".join(lines)
+
+    def save_profile(self, path: str):
+        """
+        Grava o profile do cProfile (abre com pstats ou snakeviz).
+        """
+        if self._profiler is None:
+            raise ValueError("Só o modo cprofile gera arquivo de profile")
+        self._profiler.dump_stats(path)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Formato compacto do documento games → players → settings com dicionários.
+
+Em vez de repetir os nomes das chaves e os valores em cada player, o
+documento guarda:
+- `values`: todos os valores distintos de settings, do mais usado para o
+  menos usado (índices menores para os valores mais comuns)
+- `schemas`: para cada game e tipo de setting, a lista ordenada de chaves
+- em cada player, `settings` mapeia o tipo de setting para um array de
+  índices em `values`, na ordem do schema (null = chave ausente)
+
+Exemplo:
+
+    {
+      "format": "prosettings-dict-v1",
+      "values": ["Unknown", "Yes", "800", ...],
+      "schemas": {"<game id>": {"mouse_settings": ["hz", "dpi", ...]}},
+      "games": [{"id": "...", "name": "...", "players": [
+        {"id": "...", "name": "...", "team": "...",
+         "settings": {"mouse_settings": [5, 2, ...]}}
+      ]}]
+    }
+
+Settings cujo valor não é um objeto são guardados como {"raw": valor}.
+"""
+
+import json
+from collections import Counter
+from typing import Any, Dict
+
+import settings_pool
+from compressed import open_text
+
+
+FORMAT_NAME = 'prosettings-dict-v1'
+
+
+def _value_key(value: Any) -> str:
+    # Chave hashável e sem ambiguidade de tipo ("1" e 1 são valores diferentes)
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def encode_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converte o documento aninhado para o formato com dicionários.
+    """
+    # Primeira passada: schemas por game e frequência de cada valor
+    schemas = {}
+    counts = Counter()
+    for game in document['games']:
+        game_schema = schemas.setdefault(game['id'], {})
+        for player in game['players']:
+            for setting_name, setting_value in player.get('settings', {}).items():
+                if not isinstance(setting_value, dict):
+                    continue
+                keys = game_schema.setdefault(setting_name, {})
+                for key, value in setting_value.items():
+                    keys.setdefault(key, len(keys))
+                    counts[_value_key(value)] += 1
+
+    value_keys = [key for key, _ in counts.most_common()]
+    value_index = {key: index for index, key in enumerate(value_keys)}
+
+    # Segunda passada: troca cada objeto de settings pelo array de índices
+    games = []
+    for game in document['games']:
+        game_schema = schemas[game['id']]
+        players = []
+        for player in game['players']:
+            encoded_settings = {}
+            for setting_name, setting_value in player.get('settings', {}).items():
+                if not isinstance(setting_value, dict):
+                    encoded_settings[setting_name] = {'raw': setting_value}
+                    continue
+
+                keys = game_schema[setting_name]
+                positions = [None] * len(keys)
+                for key, value in setting_value.items():
+                    positions[keys[key]] = value_index[_value_key(value)]
+
+                # Chaves ausentes no fim do schema não precisam ocupar espaço
+                while positions and positions[-1] is None:
+                    positions.pop()
+                encoded_settings[setting_name] = positions
+
+            players.append(dict(player, settings=encoded_settings))
+        games.append(dict(game, players=players))
+
+    return {
+        'format': FORMAT_NAME,
+        'values': [json.loads(key) for key in value_keys],
+        'schemas': {
+            game_id: {setting_name: list(keys) for setting_name, keys in game_schema.items()}
+            for game_id, game_schema in schemas.items()
+        },
+        'games': games,
+    }
+
+
+def decode_document(encoded: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reconstrói o documento aninhado (com dicts comuns) a partir do formato
+    com dicionários.
+    """
+    if encoded.get('format') != FORMAT_NAME:
+        raise ValueError(f"Formato desconhecido: {encoded.get('format')!r}")
+
+    values = encoded['values']
+    schemas = encoded['schemas']
+
+    games = []
+    for game in encoded['games']:
+        game_schema = schemas.get(game['id'], {})
+        players = []
+        for player in game['players']:
+            settings = {}
+            for setting_name, positions in player.get('settings', {}).items():
+                if isinstance(positions, dict):
+                    settings[setting_name] = positions['raw']
+                    continue
+
+                keys = game_schema[setting_name]
+                settings[setting_name] = {
+                    key: values[index]
+                    for key, index in zip(keys, positions)
+                    if index is not None
+                }
+            players.append(dict(player, settings=settings))
+        games.append(dict(game, players=players))
+
+    return {'games': games}
+
+
+def write_encoded(document: Dict[str, Any], output_file_path: str):
+    """
+    Grava o documento no formato com dicionários, sem espaços.
+    """
+    with open(output_file_path, 'w', encoding='utf-8') as f:
+        json.dump(encode_document(document), f, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_encoded(json_file: str) -> Dict[str, Any]:
+    """
+    Carrega um arquivo no formato com dicionários e devolve o documento
+    aninhado com dicts comuns.
+    """
+    with open_text(json_file) as f:
+        return decode_document(json.load(f))
+
+
+def load_document(json_file: str) -> Dict[str, Any]:
+    """
+    Carrega a saída do conversor em qualquer um dos formatos (comum, com
+    dicionários ou com pool de settings) e devolve o documento aninhado com
+    dicts comuns. Aceita arquivos comprimidos (ex: a cópia .json.gz).
+    """
+    with open_text(json_file) as f:
+        document = json.load(f)
+
+    if document.get('format') == settings_pool.FORMAT_NAME:
+        return settings_pool.decode_document(document)
+    if 'format' in document:
+        return decode_document(document)
+    return document
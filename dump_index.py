@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Índice de offsets dos INSERTs de um dump e filtros aplicados antes do parse.
+
+O índice guarda, para cada INSERT, a tabela, as colunas, o offset e o
+tamanho em bytes do statement e checkpoints a cada CHECKPOINT_ROWS
+registros (ver sql_scan.index_statements). Com ele, uma conversão filtrada
+(`--tables`, `--games`, `--setting-names`) pula com seek os INSERTs que não
+precisa e lê os outros trecho a trecho, de um checkpoint ao seguinte,
+sempre em fronteira de registro.
+
+O índice fica ao lado do dump (`<dump>.index.json`) e segue a mesma regra
+de invalidação do cache de parse (ver sql_cache.py). Em dumps comprimidos
+os offsets são do conteúdo descomprimido: o seek ainda descomprime o trecho
+pulado, mas não o tokeniza nem parseia.
+
+    index = load_index('bdprosettings.sql')
+    pushdown = Pushdown('bdprosettings.sql', index, games={'Valorant'})
+    for statement, table_name, columns, rows in pushdown.iter_values():
+        ...
+"""
+
+import json
+import os
+import re
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import compressed
+import sql_cache
+import sql_scan
+from conversion_stats import ConversionStats
+from sql_to_json import parse_row, parse_single_value, split_values
+
+
+# Aumentar sempre que o formato do índice mudar
+INDEX_VERSION = 1
+
+INDEX_SUFFIX = '.index.json'
+
+# Mesma regex de string de sql_to_json._QUOTED
+_QUOTED = r"'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'(?!')"
+_FIELD = r"(?:" + _QUOTED + r"|[^,']*)"
+
+
+def index_path(sql_file: str) -> str:
+    """
+    Caminho do arquivo de índice de um dump.
+    """
+    return sql_file + INDEX_SUFFIX
+
+
+def build_index(sql_file: str, checkpoint_rows: int = sql_scan.CHECKPOINT_ROWS) -> Dict[str, Any]:
+    """
+    Varre o dump (em bytes, sem parsear valores) e retorna o índice.
+    """
+    return {
+        'version': INDEX_VERSION,
+        'dump': sql_cache.file_fingerprint(sql_file),
+        'statements': sql_scan.index_statements(sql_file, checkpoint_rows),
+    }
+
+
+def read_index(sql_file: str) -> Optional[Dict[str, Any]]:
+    """
+    Índice gravado ao lado do dump, ou None se não existe ou não vale mais.
+    """
+    try:
+        with open(index_path(sql_file), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(index, dict) or index.get('version') != INDEX_VERSION:
+        return None
+    if not sql_cache.is_cache_valid(index.get('dump', {}), sql_file):
+        return None
+    return index
+
+
+def write_index(sql_file: str, index: Dict[str, Any]):
+    """
+    Grava o índice ao lado do dump (substitui o anterior de uma vez).
+    """
+    path = index_path(sql_file)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Aviso: não foi possível gravar o índice {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_index(sql_file: str, use_cache: bool = True, quiet: bool = False) -> Dict[str, Any]:
+    """
+    Índice do dump: o gravado, se ainda vale, ou um novo. Com `use_cache`
+    o índice novo também é gravado.
+    """
+    if use_cache:
+        index = read_index(sql_file)
+        if index is not None:
+            if not quiet:
+                print(f"Usando índice: {index_path(sql_file)}")
+            return index
+
+    if not quiet:
+        print("Indexando o dump...")
+    index = build_index(sql_file)
+    if use_cache:
+        write_index(sql_file, index)
+    return index
+
+
+def iter_segments(sql_file: str, index: Dict[str, Any], tables: Optional[Set[str]] = None,
+                  stats: Optional[ConversionStats] = None) -> Iterator[Tuple[int, Dict[str, Any], str]]:
+    """
+    Produz (statement, entrada do índice, texto) para cada trecho entre dois
+    checkpoints dos INSERTs de `tables` (todas, se None). Os outros INSERTs
+    não são lidos.
+
+    As quebras de linha são normalizadas como na leitura em modo texto do
+    conversor, então os registros saem iguais aos da leitura completa.
+    """
+    with compressed.open_binary(sql_file) as f:
+        for statement, entry in enumerate(index['statements']):
+            if tables is not None and entry['table'] not in tables:
+                continue
+
+            offsets = [offset for _, offset in entry['checkpoints']]
+            offsets.append(entry['offset'] + entry['length'])
+            for start, end in zip(offsets, offsets[1:]):
+                with nullcontext() if stats is None else stats.stage('read'):
+                    f.seek(start)
+                    text = f.read(end - start).decode('utf-8')
+                    if '\r' in text:
+                        text = text.replace('\r\n', '\n').replace('\r', '\n')
+                if stats is not None:
+                    stats.count('chars_read', len(text))
+                yield statement, entry, text
+
+
+@lru_cache(maxsize=None)
+def _column_regex(index: int) -> 're.Pattern':
+    """
+    Regex que captura o valor bruto da coluna `index` no início de um
+    registro (sem os parênteses), sem separar as colunas seguintes.
+    """
+    return re.compile(r"\s*(?:" + _FIELD + r"\s*,\s*){%d}(" % index + _FIELD + r")", re.DOTALL)
+
+
+class UnknownGamesError(ValueError):
+    """
+    Games pedidos em `games` que não existem no dump.
+    """
+
+
+class Pushdown:
+    """
+    Filtros por tabela, game e nome de setting aplicados antes do parse.
+
+    INSERTs de tabelas fora de `tables` não são lidos. Nos outros, cada
+    registro bruto é descartado pelo valor das colunas de filtro, extraído
+    por regex sem separar nem decodificar o resto do registro:
+    - games: id dos games de `games`
+    - game_player e settings: game_id dos games de `games`
+    - players: id dos players ligados a esses games por game_player
+    - settings: name em `setting_names`
+
+    `games` aceita ids ou nomes (sem diferenciar maiúsculas); games e
+    game_player são lidos antes, pelo índice, para achar os ids. Um game
+    que não existe no dump gera UnknownGamesError.
+    """
+
+    def __init__(self, sql_file: str, index: Dict[str, Any], tables: Optional[Set[str]] = None,
+                 games: Optional[Set[str]] = None, setting_names: Optional[Set[str]] = None):
+        self.sql_file = sql_file
+        self.index = index
+        self.tables = tables
+        self.game_ids: Optional[Set[str]] = None
+        # Registros descartados antes do parse, por tabela (inclui os dos
+        # INSERTs que nem foram lidos)
+        self.filtered: Dict[str, int] = {}
+        self._filters: Dict[str, List[Tuple[str, Set[Any]]]] = {}
+        self._decoded: Dict[str, Any] = {}
+
+        if games is not None:
+            self.game_ids = self._resolve_games(games)
+            self._filters['games'] = [('id', self.game_ids)]
+            self._filters['game_player'] = [('game_id', self.game_ids)]
+            self._filters['settings'] = [('game_id', self.game_ids)]
+            if tables is None or 'players' in tables:
+                self._filters['players'] = [('id', self._linked_players(self.game_ids))]
+        if setting_names is not None:
+            self._filters.setdefault('settings', []).append(('name', setting_names))
+
+    def _iter_records(self, table_name: str) -> Iterator[Dict[str, Any]]:
+        for _, entry, text in iter_segments(self.sql_file, self.index, {table_name}):
+            columns = entry['columns']
+            for row_str in split_values(text):
+                row = parse_row(row_str)
+                if len(row) == len(columns):
+                    yield dict(zip(columns, row))
+
+    def _resolve_games(self, games: Set[str]) -> Set[str]:
+        names = {record['id']: str(record['name']) for record in self._iter_records('games')}
+
+        # Os ids dos games são nomes de imagem ("<uuid>.png"): aceita o id
+        # com ou sem a extensão
+        game_ids = set()
+        missing = []
+        for game in sorted(games):
+            stem = os.path.splitext(game)[0].lower()
+            matches = [game_id for game_id, name in names.items()
+                       if stem == os.path.splitext(game_id)[0].lower() or game.lower() == name.lower()]
+            if not matches:
+                missing.append(game)
+            game_ids.update(matches)
+
+        if missing:
+            raise UnknownGamesError(f"Games não encontrados no dump: {', '.join(missing)} "
+                             f"(disponíveis: {', '.join(sorted(names.values()))})")
+        return game_ids
+
+    def _linked_players(self, game_ids: Set[str]) -> Set[str]:
+        return {record['player_id'] for record in self._iter_records('game_player')
+                if record['game_id'] in game_ids}
+
+    def select(self, table_name: str, columns: List[str], rows: List[str]) -> List[str]:
+        """
+        Registros brutos de `rows` que passam pelos filtros da tabela.
+        Registros em que a coluna não é encontrada passam (o parser avisa).
+        """
+        filters = self._filters.get(table_name)
+        if not filters:
+            return rows
+
+        selected = rows
+        for column, values in filters:
+            if column not in columns:
+                continue
+            column_re = _column_regex(columns.index(column))
+            kept = []
+            for row_str in selected:
+                match = column_re.match(row_str)
+                if match is None:
+                    kept.append(row_str)
+                    continue
+                raw = match.group(1)
+                value = self._decoded.get(raw)
+                if value is None:
+                    value = self._decoded[raw] = parse_single_value(raw)
+                if value in values:
+                    kept.append(row_str)
+            selected = kept
+
+        self.filtered[table_name] = self.filtered.get(table_name, 0) + len(rows) - len(selected)
+        return selected
+
+    def iter_values(self, stats: Optional[ConversionStats] = None) -> Iterator[Tuple[int, str, List[str], List[str]]]:
+        """
+        Mesmas tuplas de sql_to_json.iter_value_chunks, só com os INSERTs e
+        os registros que passam pelos filtros. Com `stats`, mede read e
+        tokenize (o filtro conta como tokenize).
+        """
+        for entry in self.index['statements']:
+            if self.tables is not None and entry['table'] not in self.tables:
+                self.filtered[entry['table']] = self.filtered.get(entry['table'], 0) + entry['rows']
+
+        for statement, entry, text in iter_segments(self.sql_file, self.index, self.tables, stats):
+            with nullcontext() if stats is None else stats.stage('tokenize'):
+                rows = self.select(entry['table'], entry['columns'], split_values(text))
+            if rows:
+                yield statement, entry['table'], entry['columns'], rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Indexa os INSERTs de um dump SQL.")
+    parser.add_argument('sql_file', help="arquivo SQL (pode estar comprimido com gzip, bz2 ou xz)")
+    args = parser.parse_args()
+
+    index = load_index(args.sql_file)
+
+    print("=" * 70)
+    print(f"ÍNDICE: {index_path(args.sql_file)}")
+    print("=" * 70)
+    for number, entry in enumerate(index['statements'], 1):
+        print(f"INSERT {number:>3}: {entry['table']:<20} {entry['rows']:>8,} registros  "
+              f"offset {entry['offset']:>12,}  {entry['length']:>12,} bytes  "
+              f"{len(entry['checkpoints'])} checkpoints")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Gera dumps SQL sintéticos no formato do HeidiSQL, com o mesmo schema do
+bdprosettingscorreto.sql (games, players, game_player, settings com JSON em
+`value`), para medir desempenho em escalas maiores que o dump real.
+
+A escala 1 tem aproximadamente o tamanho do dump real (~4 MB, 1.777 players,
+1.896 relacionamentos e ~8.500 settings); a escala N multiplica tudo por N.
+O arquivo é escrito em streaming e nada cresce com a escala: os ids dos
+players saem do índice de cada um e os relacionamentos são sorteados de
+novo, com a mesma semente, para game_player e para settings. Até a escala
+1000 (~4 GB) a memória fica constante.
+
+Inclui os casos difíceis para o parser:
+- aspas escapadas com barra (\\') e com aspas duplicadas ('')
+- parênteses, vírgulas e ponto-e-vírgula dentro de strings
+- aspas duplas escapadas dentro do JSON de settings
+- vários INSERTs por tabela (no máximo ROWS_PER_INSERT registros cada)
+
+Uso:
+    python generate_dump.py saida.sql --scale 10
+"""
+
+import hashlib
+import json
+import random
+import uuid
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+
+# Registros por INSERT (o HeidiSQL quebra tabelas grandes em vários INSERTs)
+ROWS_PER_INSERT = 2500
+
+# Quantidades da escala 1 (próximas do dump real)
+BASE_PLAYERS = 1777
+BASE_GAME_PLAYERS = 1896
+
+# Games e o peso de cada um na distribuição de players (igual ao dump real)
+GAMES = [
+    ('CS2', 842), ('Valorant', 506), ('Fortnite', 294), ('Apex Legends', 82),
+    ('Overwatch 2', 61), ('PUBG', 48), ('Rainbow Six Siege', 21),
+    ('League of Legends', 20), ('Call of Duty: Warzone', 13), ('Deadlock', 9), ('Dota 2', 0),
+]
+
+TIMESTAMP = '2024-11-21 20:21:28'
+
+Pool = Union[List[str], Callable[[random.Random], str]]
+
+
+def _number(low: float, high: float, digits: int = 2) -> Callable[[random.Random], str]:
+    return lambda rng: f"{rng.uniform(low, high):.{digits}f}"
+
+
+YES_NO = ['Yes', 'No', 'Unknown']
+
+SETTING_TEMPLATES: Dict[str, Dict[str, Pool]] = {
+    'mouse_settings': {
+        'hz': ['500', '1000', '1000', '2000', '4000', '8000', 'Unknown'],
+        'dpi': ['400', '400', '800', '800', '1600', '3200', 'Unknown'],
+        'edpi': _number(150, 1600, 1),
+        'sensitivity': _number(0.1, 3.5, 3),
+        'zoom_sensitivity': _number(0.5, 1.5),
+        'windows_sensitivity': ['6', '6', '6', '4', 'Unknown'],
+        'raw_input_buffer': ['On', 'Off', 'Unknown'],
+    },
+    'video_settings': {
+        'resolution': ['1920x1080', '1280x960', '1024x768', '2560x1440', '1440x1080 (stretched)'],
+        'aspect_ratio': ['16:9', '4:3', '16:10'],
+        'display_mode': ['Fullscreen', 'Windowed (borderless)', 'Unknown'],
+        'aspect_ratio_method': ['Fill', 'Letterbox', 'Unknown'],
+        'brightness': _number(0, 100, 0),
+    },
+    'crosshair_settings': {
+        'cl_crosshair_t': YES_NO,
+        'cl_crosshairdot': YES_NO,
+        'cl_crosshairgap': ['-4', '-3', '-2', '0', '1', 'Unknown'],
+        'cl_crosshairsize': ['1', '1.5', '2', '2.5', '3'],
+        'cl_crosshaircolor': ['Green', 'Yellow', 'Cyan', 'Custom (RGB)', 'Unknown'],
+        'cl_crosshairstyle': ['Classic Static', 'Classic (dynamic)', 'Default'],
+        'cl_crosshairthickness': _number(0, 2, 1),
+        'cl_crosshair_drawoutline': YES_NO,
+        'cl_crosshair_dynamic_splitalpha_outermod': ['0.5', '1', 'Unknown'],
+        'cl_crosshair_code': lambda rng: f"CSGO-{rng.randrange(10 ** 5):05d}; \"{rng.choice(['a', 'b'])}\"",
+    },
+    'hud_settings': {
+        'hud_scaling': ['0.85', '0.9', '1', 'Unknown'],
+        'cl_hud_color': ['White', 'Team color', 'Unknown'],
+    },
+    'radar_settings': {
+        'cl_radar_scale': _number(0.25, 1),
+        'cl_radar_rotate': YES_NO,
+        'cl_radar_always_centered': YES_NO,
+    },
+    'view_model_settings': {
+        'viewmodel_fov': ['54', '60', '68'],
+        'viewmodel_offset_x': ['0', '1', '2.5'],
+        'viewmodel_offset_y': ['-2', '0', '2'],
+        'viewmodel_presetpos': ['1', '2', '3'],
+    },
+    'bob_settings': {
+        'cl_bobcycle': ['0.98'],
+        'cl_bobamt_lat': _number(0.1, 0.4),
+        'cl_bobamt_vert': _number(0.1, 0.4),
+        'cl_bob_lower_amt': ['5', '15', '21'],
+    },
+}
+
+GAME_SETTINGS = {
+    'CS2': list(SETTING_TEMPLATES),
+    'Valorant': ['mouse_settings', 'video_settings', 'crosshair_settings'],
+}
+DEFAULT_GAME_SETTINGS = ['mouse_settings', 'video_settings']
+
+NAME_PARTS = ['ze', 'ro', 'ka', 'mi', 'tan', 'vex', 'lo', 'sh', 'ra', 'ny', 'kor', 'di', 'fal', 'en']
+# Nomes e times com aspas, parênteses e ponto-e-vírgula
+TRICKY_NAMES = ["O'Neil", "d'Arc", "mr.(x)", "semi;colon", "back\\slash"]
+TEAMS = ['Sentinels', 'FaZe Clan', 'Team Vitality', 'MIBR', 'Free Agent', 'NAVI (Academy)',
+         "Dragon's Lair", 'G2 Esports', '100 Thieves', '']
+
+
+def sql_string(value: str, rng: random.Random) -> str:
+    """
+    String SQL entre aspas simples. Aspas viram \\' ou '' (as duas formas
+    aparecem em dumps reais).
+    """
+    value = value.replace('\\', '\\\\')
+    quote = "\\'" if rng.random() < 0.5 else "''"
+    return "'" + value.replace("'", quote) + "'"
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _player_id(seed: int, index: int) -> str:
+    # Calculado a partir do índice, sem guardar a lista de ids (formatado à
+    # mão: uuid.UUID custa mais que o hash, e é chamado a cada relacionamento)
+    digest = bytearray(hashlib.blake2b(f"{seed}:player:{index}".encode(), digest_size=16).digest())
+    digest[6] = digest[6] & 0x0f | 0x40
+    digest[8] = digest[8] & 0x3f | 0x80
+    text = digest.hex()
+    return f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
+
+def _iter_links(seed: int, player_count: int, link_count: int) -> Iterator[Tuple[int, int]]:
+    """
+    Relacionamentos (índice do game, índice do player). Cada player entra em
+    um game; os relacionamentos extras repetem players. Com gerador próprio,
+    cada chamada produz a mesma sequência.
+    """
+    rng = random.Random(f"{seed}:links")
+    games = range(len(GAMES))
+    weights = [weight for _, weight in GAMES]
+    for player_index in range(player_count):
+        yield rng.choices(games, weights)[0], player_index
+    for _ in range(link_count - player_count):
+        yield rng.choices(games, weights)[0], rng.randrange(player_count)
+
+
+def _pick(pool: Pool, rng: random.Random) -> str:
+    return pool(rng) if callable(pool) else rng.choice(pool)
+
+
+class _InsertWriter:
+    """
+    Escreve os registros de uma tabela em INSERTs de até ROWS_PER_INSERT registros.
+    """
+
+    def __init__(self, f, table: str, columns: List[str]):
+        self.f = f
+        self.header = f"INSERT INTO `{table}` ({', '.join(f'`{c}`' for c in columns)}) VALUES\n\t"
+        self.rows_in_statement = 0
+        self.total = 0
+
+    def add(self, values: List[str]):
+        if self.rows_in_statement == ROWS_PER_INSERT:
+            self.f.write(";\n")
+            self.rows_in_statement = 0
+        self.f.write(self.header if self.rows_in_statement == 0 else ",\n\t")
+        self.f.write(f"({', '.join(values)})")
+        self.rows_in_statement += 1
+        self.total += 1
+
+    def close(self):
+        if self.rows_in_statement:
+            self.f.write(";\n")
+        self.f.write("\n")
+
+
+def _create_table(f, table: str, columns: List[str]):
+    f.write(f"-- Copiando estrutura para tabela prosettings.{table}\n")
+    f.write(f"CREATE TABLE IF NOT EXISTS `{table}` (\n")
+    for column in columns:
+        kind = 'json' if column == 'value' else 'timestamp NULL' if column.endswith('_at') else 'varchar(255)'
+        f.write(f"  `{column}` {kind} NOT NULL,\n")
+    f.write("  PRIMARY KEY (`id`)\n) ENGINE=InnoDB DEFAULT CHARSET=latin1;\n\n")
+    f.write(f"-- Copiando dados para a tabela prosettings.{table}\n")
+
+
+def generate_dump(output_file: str, scale: float = 1, seed: int = 42) -> Dict[str, int]:
+    """
+    Gera o dump sintético e retorna a quantidade de registros por tabela.
+    """
+    rng = random.Random(seed)
+    player_count = max(1, int(BASE_PLAYERS * scale))
+    link_count = max(player_count, int(BASE_GAME_PLAYERS * scale))
+
+    game_ids = [_uuid(rng) for _ in GAMES]
+
+    counts = {}
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("-- --------------------------------------------------------\n")
+        f.write("-- HeidiSQL Versão:              12.10.0.7000 (dump sintético)\n")
+        f.write("-- --------------------------------------------------------\n\n")
+        f.write("/*!40101 SET NAMES utf8 */;\n/*!50503 SET NAMES utf8mb4 */;\n\n")
+        f.write("CREATE DATABASE IF NOT EXISTS `prosettings`;\nUSE `prosettings`;\n\n")
+
+        columns = ['id', 'name', 'class_name', 'image', 'created_at', 'updated_at']
+        _create_table(f, 'games', columns)
+        writer = _InsertWriter(f, 'games', columns)
+        for game_id, (name, _) in zip(game_ids, GAMES):
+            class_name = ''.join(c for c in name.lower() if c.isalnum())
+            writer.add([sql_string(v, rng) for v in (game_id, name, class_name, f"{game_id}.png", TIMESTAMP, TIMESTAMP)])
+        writer.close()
+        counts['games'] = writer.total
+
+        columns = ['id', 'game_id', 'player_id', 'created_at', 'updated_at']
+        _create_table(f, 'game_player', columns)
+        writer = _InsertWriter(f, 'game_player', columns)
+        for game_index, player_index in _iter_links(seed, player_count, link_count):
+            player_id = _player_id(seed, player_index)
+            writer.add([sql_string(v, rng) for v in (_uuid(rng), game_ids[game_index], player_id, TIMESTAMP, TIMESTAMP)])
+        writer.close()
+        counts['game_player'] = writer.total
+
+        columns = ['id', 'name', 'profile_link', 'team', 'image', 'created_at', 'updated_at']
+        _create_table(f, 'players', columns)
+        writer = _InsertWriter(f, 'players', columns)
+        for player_index in range(player_count):
+            player_id = _player_id(seed, player_index)
+            if rng.random() < 0.02:
+                name = rng.choice(TRICKY_NAMES)
+            else:
+                name = ''.join(rng.choice(NAME_PARTS) for _ in range(rng.randint(2, 4)))
+            extension = rng.choices(['png', 'jpg', 'ebp'], [998, 1, 1])[0]
+            team = rng.choice(TEAMS)
+            writer.add([
+                sql_string(player_id, rng), sql_string(name, rng),
+                sql_string(f"https://prosettings.net/players/{name.lower()}/", rng),
+                'NULL' if rng.random() < 0.01 else sql_string(team, rng),
+                sql_string(f"{player_id}.{extension}", rng),
+                sql_string(TIMESTAMP, rng), sql_string(TIMESTAMP, rng),
+            ])
+        writer.close()
+        counts['players'] = writer.total
+
+        columns = ['id', 'game_id', 'player_id', 'name', 'value', 'created_at', 'updated_at']
+        _create_table(f, 'settings', columns)
+        writer = _InsertWriter(f, 'settings', columns)
+        for game_index, player_index in _iter_links(seed, player_count, link_count):
+            player_id = _player_id(seed, player_index)
+            game_name = GAMES[game_index][0]
+            for setting_name in GAME_SETTINGS.get(game_name, DEFAULT_GAME_SETTINGS):
+                template = SETTING_TEMPLATES[setting_name]
+                value = {key: _pick(pool, rng) for key, pool in template.items()}
+                writer.add([
+                    sql_string(_uuid(rng), rng), sql_string(game_ids[game_index], rng),
+                    sql_string(player_id, rng), sql_string(setting_name, rng),
+                    sql_string(json.dumps(value, ensure_ascii=False), rng),
+                    sql_string(TIMESTAMP, rng), sql_string(TIMESTAMP, rng),
+                ])
+        writer.close()
+        counts['settings'] = writer.total
+
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera um dump SQL sintético para benchmarks.")
+    parser.add_argument('output_file', nargs='?', default="synthetic.sql",
+                        help="arquivo SQL de saída")
+    parser.add_argument('--scale', type=float, default=1,
+                        help="multiplicador em relação ao dump real (padrão: 1)")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="semente do gerador aleatório (padrão: 42)")
+    args = parser.parse_args()
+
+    counts = generate_dump(args.output_file, args.scale, args.seed)
+    print(f"Dump gerado: {args.output_file}")
+    for table_name, count in counts.items():
+        print(f"  {table_name}: {count:,} registros")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Conversão incremental: compara os registros de um dump novo com os da
+conversão anterior e gera o conjunto de mudanças.
+
+Cada conversão com `--incremental` grava, ao lado do JSON de saída, o
+arquivo `<saida>.hashes.json` com o hash do conteúdo de cada registro de
+games, players, game_player e settings, indexado pela chave primária (`id`).
+Na conversão seguinte os hashes novos são comparados com os anteriores e o
+resultado vai para `<saida>.changes.json`:
+
+    {"games": {"added": [...], "removed": [...], "modified": [...]}, ...}
+
+O hash cobre os campos que aparecem na saída: todos com `--flat`; no
+documento aninhado, os que o conversor não remove (sem datas, class_name e
+profile_link). Os campos ignorados ficam no arquivo de hashes; se mudam
+(ex: a saída anterior era `--flat`), a conversão conta como a primeira.
+"""
+
+import hashlib
+import json
+import os
+from typing import AbstractSet, Any, Dict, Optional
+
+
+# Tabelas comparadas
+HASHED_TABLES = ('games', 'players', 'game_player', 'settings')
+
+
+def hashes_path(output_file: str) -> str:
+    """
+    Caminho do arquivo de hashes de uma saída.
+    """
+    return output_file + '.hashes.json'
+
+
+def changes_path(output_file: str) -> str:
+    """
+    Caminho do arquivo de mudanças de uma saída.
+    """
+    return output_file + '.changes.json'
+
+
+def record_hash(record: Dict[str, Any], ignored_fields: AbstractSet[str] = frozenset()) -> str:
+    """
+    Hash do conteúdo de um registro (sem `ignored_fields`), independente da
+    ordem das chaves.
+    """
+    content = {key: value for key, value in record.items() if key not in ignored_fields}
+    canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=12).hexdigest()
+
+
+class RecordHashes:
+    """
+    Acumula os hashes dos registros durante a conversão. `ignored_fields`
+    são os campos que não aparecem na saída.
+    """
+
+    def __init__(self, ignored_fields: AbstractSet[str] = frozenset()):
+        self.ignored_fields = frozenset(ignored_fields)
+        self.tables = {table: {} for table in HASHED_TABLES}
+
+    def add_record(self, table_name: str, record: Dict[str, Any]):
+        table_hashes = self.tables.get(table_name)
+        if table_hashes is not None:
+            table_hashes[record['id']] = record_hash(record, self.ignored_fields)
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'ignored_fields': sorted(self.ignored_fields), 'tables': self.tables},
+                      f, separators=(',', ':'))
+
+
+def load_hashes(path: str, ignored_fields: AbstractSet[str] = frozenset()) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Carrega os hashes de uma conversão anterior, ou None se não existirem
+    ou se foram calculados ignorando outros campos.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    if saved.get('ignored_fields') != sorted(ignored_fields):
+        return None
+    return saved['tables']
+
+
+def diff_hashes(old: Dict[str, Dict[str, str]], new: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, list]]:
+    """
+    Compara os hashes por chave primária e retorna os ids adicionados,
+    removidos e modificados de cada tabela.
+    """
+    changes = {}
+    for table_name in HASHED_TABLES:
+        old_hashes = old.get(table_name, {})
+        new_hashes = new.get(table_name, {})
+
+        changes[table_name] = {
+            'added': sorted(key for key in new_hashes if key not in old_hashes),
+            'removed': sorted(key for key in old_hashes if key not in new_hashes),
+            'modified': sorted(
+                key for key, digest in new_hashes.items()
+                if key in old_hashes and old_hashes[key] != digest
+            ),
+        }
+
+    return changes
+
+
+def write_changes(output_file: str, hashes: RecordHashes) -> Optional[Dict[str, Dict[str, list]]]:
+    """
+    Compara os hashes atuais com os da conversão anterior (se houver),
+    grava o conjunto de mudanças e atualiza o arquivo de hashes.
+    Retorna as mudanças, ou None na primeira conversão.
+    """
+    previous = load_hashes(hashes_path(output_file), hashes.ignored_fields)
+    changes = None
+
+    if previous is not None:
+        changes = diff_hashes(previous, hashes.tables)
+        with open(changes_path(output_file), 'w', encoding='utf-8') as f:
+            json.dump(changes, f, ensure_ascii=False, indent=2)
+    elif os.path.exists(changes_path(output_file)):
+        # Mudanças de uma conversão antiga não valem mais
+        os.remove(changes_path(output_file))
+
+    hashes.save(hashes_path(output_file))
+    return changes
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Gravação de JSON em streaming: listas podem ser geradas item a item
+(`StreamedList`) e cada item é serializado e gravado assim que fica pronto,
+sem montar a árvore inteira em memória.
+
+    document = {'games': StreamedList(iter_games())}
+    with open('saida.json', 'w', encoding='utf-8') as f:
+        write_json(document, f)
+
+A saída é byte a byte igual à de `json.dump(..., ensure_ascii=False, indent=2)`
+sobre o documento equivalente; com `compact=True`, igual à de
+`separators=(',', ':')` sem indentação.
+"""
+
+import json
+from typing import Any, Iterable, TextIO
+
+from lazy_json import LazyJSON
+
+
+INDENT = 2
+
+
+def _default(value: Any) -> Any:
+    # Valores do parser em modo lazy_json saem decodificados
+    if isinstance(value, LazyJSON):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Encoders reaproveitados (json.dumps com opções cria um encoder por chamada)
+_INDENTED = json.JSONEncoder(ensure_ascii=False, indent=INDENT, default=_default)
+_COMPACT = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_default)
+
+
+class StreamedList:
+    """
+    Lista gravada item a item a partir de um iterável (consumido uma vez).
+
+    Com `chunked=True` o iterável produz listas de itens (blocos), e cada
+    bloco é serializado numa única chamada do encoder, o que é bem mais
+    rápido para muitos itens pequenos.
+    """
+
+    def __init__(self, items: Iterable[Any], chunked: bool = False):
+        self.items = items
+        self.chunked = chunked
+
+
+def _has_stream(value: Any) -> bool:
+    # Só dicts com uma StreamedList como valor direto são percorridos aqui;
+    # os demais (ex: cada registro) vão inteiros para o encoder
+    return isinstance(value, dict) and any(type(item) is StreamedList for item in value.values())
+
+
+def write_json(value: Any, f: TextIO, compact: bool = False):
+    """
+    Grava `value` em `f`. StreamedList podem aparecer como valores de dicts
+    em qualquer nível, desde que cada dict do caminho até elas tenha uma
+    StreamedList como valor direto; o resto é serializado pelo encoder.
+    """
+    _write(value, f, 0, _COMPACT if compact else _INDENTED)
+
+
+def _write(value: Any, f: TextIO, level: int, encoder: json.JSONEncoder):
+    if isinstance(value, StreamedList):
+        _write_list(value, f, level, encoder)
+    elif _has_stream(value):
+        _write_dict(value, f, level, encoder)
+    elif encoder.indent is None or not level:
+        f.write(encoder.encode(value))
+    else:
+        # Strings JSON não têm quebras de linha literais, então reindentar
+        # o texto linha a linha é seguro
+        f.write(encoder.encode(value).replace('\n', '\n' + ' ' * (encoder.indent * level)))
+
+
+def _prefix(encoder: json.JSONEncoder, level: int) -> str:
+    # Quebra de linha + indentação de um item no nível `level`
+    return '' if encoder.indent is None else '\n' + ' ' * (encoder.indent * level)
+
+
+def _write_list(value: StreamedList, f: TextIO, level: int, encoder: json.JSONEncoder):
+    if value.chunked:
+        _write_chunks(value, f, level, encoder)
+        return
+
+    item_prefix = _prefix(encoder, level + 1)
+    f.write('[')
+    empty = True
+    for item in value.items:
+        f.write(item_prefix if empty else ',' + item_prefix)
+        _write(item, f, level + 1, encoder)
+        empty = False
+    if not empty:
+        f.write(_prefix(encoder, level))
+    f.write(']')
+
+
+def _write_chunks(value: StreamedList, f: TextIO, level: int, encoder: json.JSONEncoder):
+    f.write('[')
+    empty = True
+    for chunk in value.items:
+        if not chunk:
+            continue
+        # "[\n  a,\n  b\n]" → "\n  a,\n  b" no nível certo (ou "a,b" no compacto)
+        text = encoder.encode(list(chunk))
+        body = text[1:-1] if encoder.indent is None else text[1:text.rindex('\n')]
+        if level and encoder.indent is not None:
+            body = body.replace('\n', '\n' + ' ' * (encoder.indent * level))
+        f.write(body if empty else ',' + body)
+        empty = False
+    if not empty:
+        f.write(_prefix(encoder, level))
+    f.write(']')
+
+
+def _write_dict(value: dict, f: TextIO, level: int, encoder: json.JSONEncoder):
+    item_prefix = _prefix(encoder, level + 1)
+    f.write('{')
+    for position, (key, item) in enumerate(value.items()):
+        f.write(item_prefix if position == 0 else ',' + item_prefix)
+        f.write(encoder.encode(key) + encoder.key_separator)
+        _write(item, f, level + 1, encoder)
+    f.write(_prefix(encoder, level) + '}')
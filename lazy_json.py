@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Valores JSON decodificados só quando usados.
+
+No modo `lazy_json` do parser (ver sql_to_json.parse_row), as strings que
+parecem JSON (começam com { ou [) viram `LazyJSON`: o texto original fica
+guardado e o `json.loads` só roda no primeiro acesso a `.value`, com o
+resultado memorizado. Quem só conta registros, ou só usa alguns tipos de
+setting, não paga a decodificação do resto.
+
+    value = row[value_idx]          # LazyJSON
+    value.value['dpi']              # decodifica aqui, uma vez
+
+`resolve` devolve o valor decodificado de um LazyJSON e qualquer outro
+valor como veio.
+"""
+
+import json
+from typing import Any
+
+
+_PENDING = object()
+
+
+class LazyJSON:
+    """
+    Texto JSON de um campo, decodificado no primeiro acesso a `value`.
+    Se o texto não for JSON válido, `value` é o próprio texto (igual ao
+    parser sem lazy_json).
+    """
+
+    __slots__ = ('raw', '_value')
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        self._value = _PENDING
+
+    @property
+    def value(self) -> Any:
+        if self._value is _PENDING:
+            try:
+                self._value = json.loads(self.raw)
+            except json.JSONDecodeError:
+                self._value = self.raw
+        return self._value
+
+    @property
+    def decoded(self) -> bool:
+        return self._value is not _PENDING
+
+    def __eq__(self, other: Any) -> bool:
+        return self.value == resolve(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        raw = self.raw if len(self.raw) <= 40 else self.raw[:37] + '...'
+        return f"LazyJSON({raw!r})"
+
+    def __reduce__(self):
+        # Entre processos (pool do --workers) só o texto é enviado
+        return LazyJSON, (self.raw,)
+
+
+def resolve(value: Any) -> Any:
+    """
+    Valor decodificado de um LazyJSON; outros valores voltam como vieram.
+    """
+    return value.value if value.__class__ is LazyJSON else value
+
+
+def resolve_row(row: tuple) -> tuple:
+    """
+    O registro com todos os LazyJSON decodificados (o mesmo objeto se não
+    houver nenhum).
+    """
+    for value in row:
+        if value.__class__ is LazyJSON:
+            return tuple([resolve(value) for value in row])
+    return row
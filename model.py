@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Modelo compacto em memória para games, players e settings.
+
+O documento aninhado do conversor guarda cada player como um dict com o id
+em texto ("uuid.png", ~90 bytes por string) e cada setting como um dict
+próprio, com as chaves e os valores repetidos em milhares de players. Aqui:
+
+- `Game`, `Player` e `Setting` são classes com `__slots__` (sem o dict de
+  atributos por objeto);
+- UUIDs ficam como 16 bytes, e a imagem só como a extensão quando é
+  "<uuid>.<ext>" (o caso comum);
+- nomes de setting, listas de chaves (tuplas compartilhadas por todos os
+  settings com as mesmas chaves) e valores em texto são internados na
+  carga;
+- settings com o mesmo nome e conteúdo são o mesmo objeto `Setting`.
+
+`load_dataset` preenche o modelo direto das tuplas do parser
+(iter_table_chunks), sem montar um dict por registro; os ids dos
+game_player e settings viram referências aos objetos já carregados.
+
+    dataset = load_dataset('bdprosettingscorreto.sql')
+    valorant = dataset.game('Valorant')
+    for player, settings in valorant.entries():
+        mouse = next(s for s in settings if s.name == 'mouse_settings')
+        print(player.name, mouse['dpi'])
+
+`to_document` remonta o documento aninhado igual ao de build_document.
+"""
+
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sql_to_json import DROPPED_FIELDS, iter_table_chunks
+
+
+def pack_id(text: Any) -> Any:
+    """
+    UUID em texto → 16 bytes. Ids que não são UUIDs na forma canônica
+    (minúsculas, com hífens) ficam como vieram.
+    """
+    if isinstance(text, str) and len(text) == 36:
+        try:
+            packed = uuid.UUID(text)
+        except ValueError:
+            return text
+        if str(packed) == text:
+            return packed.bytes
+    return text
+
+
+def unpack_id(value: Any) -> Any:
+    return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) else value
+
+
+class _Record:
+    """
+    Campos comuns de games e players: id, imagem, nome e as colunas que o
+    modelo não conhece (em `extra`, ou None).
+    """
+
+    __slots__ = ('uuid', 'extension', 'image', 'name', 'extra')
+
+    def __init__(self, record_id: Any, image: Any, name: Any, extra: Optional[Dict[str, Any]], strings: 'Interner'):
+        self.uuid = pack_id(record_id)
+        self.extension = None
+        self.image = None
+        if image:
+            # "<id>.png" vira só ".png"; outras imagens ficam inteiras
+            if isinstance(image, str) and isinstance(record_id, str) and image.startswith(record_id + '.'):
+                self.extension = strings.intern(image[len(record_id):])
+            else:
+                self.image = image
+        self.name = name
+        self.extra = extra
+
+    @property
+    def id(self) -> Any:
+        """
+        O id do documento: a imagem quando existe (como em compact_record).
+        """
+        if self.extension is not None:
+            return unpack_id(self.uuid) + self.extension
+        if self.image is not None:
+            return self.image
+        return unpack_id(self.uuid)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class Game(_Record):
+    """
+    Game com os players na ordem do game_player e, em `settings`, a tupla
+    de settings de cada player naquele game (mesma posição).
+    """
+
+    __slots__ = ('players', 'settings')
+
+    def __init__(self, record_id: Any, image: Any, name: Any, extra: Optional[Dict[str, Any]], strings: 'Interner'):
+        super().__init__(record_id, image, name, extra, strings)
+        self.players: List['Player'] = []
+        self.settings: List[Tuple['Setting', ...]] = []
+
+    def entries(self) -> Iterator[Tuple['Player', Tuple['Setting', ...]]]:
+        """
+        Pares (player, settings do player neste game).
+        """
+        return zip(self.players, self.settings)
+
+
+class Player(_Record):
+    """
+    Player (um objeto por id, compartilhado pelos games em que joga).
+    """
+
+    __slots__ = ('team',)
+
+    def __init__(self, record_id: Any, image: Any, name: Any, team: Any, extra: Optional[Dict[str, Any]],
+                 strings: 'Interner'):
+        super().__init__(record_id, image, name, extra, strings)
+        self.team = strings.intern(team)
+
+
+class Setting:
+    """
+    Um setting de um player: nome, chaves (tupla compartilhada) e valores
+    na mesma ordem. Valores que não são objetos JSON ficam em `values` com
+    `keys` None. Objetos compartilhados: não alterar.
+    """
+
+    __slots__ = ('name', 'keys', 'values')
+
+    def __init__(self, name: str, keys: Optional[Tuple[str, ...]], values: Any):
+        self.name = name
+        self.keys = keys
+        self.values = values
+
+    @property
+    def value(self) -> Any:
+        """
+        O valor como no documento (dict novo a cada acesso).
+        """
+        if self.keys is None:
+            return self.values
+        return dict(zip(self.keys, self.values))
+
+    def __getitem__(self, key: str) -> Any:
+        if self.keys is None:
+            raise KeyError(key)
+        try:
+            return self.values[self.keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __repr__(self) -> str:
+        return f"Setting({self.name!r}, {self.value!r})"
+
+
+class Interner:
+    """
+    Tabela de objetos repetidos durante a carga de um dataset: textos,
+    tuplas de chaves e objetos Setting. Só existe durante a carga; as
+    chaves da tabela ocupam mais que o próprio modelo.
+    """
+
+    def __init__(self):
+        self._objects: Dict[Any, Any] = {}
+
+    def intern(self, value: Any) -> Any:
+        if value.__class__ is not str:
+            return value
+        return self._objects.setdefault(value, value)
+
+    def setting(self, name: str, value: Any) -> Setting:
+        """
+        O Setting com esse nome e valor, criado na primeira vez.
+        """
+        name = self.intern(name)
+        if value.__class__ is not dict:
+            return Setting(name, None, value)
+
+        keys = tuple([self.intern(key) for key in value])
+        values = tuple([self.intern(item) for item in value.values()])
+        try:
+            # Os tipos entram na chave para 1, 1.0 e true não virarem o mesmo valor
+            key = ('setting', name, keys, values, tuple(map(type, values)))
+            shared = self._objects.get(key)
+        except TypeError:
+            # Valores aninhados (listas, objetos) não são hasháveis: sem compartilhar
+            return Setting(name, self._objects.setdefault(('keys', keys), keys), values)
+        if shared is None:
+            keys = self._objects.setdefault(('keys', keys), keys)
+            shared = self._objects[key] = Setting(name, keys, values)
+        return shared
+
+
+class Dataset:
+    """
+    Games, players e settings carregados. `game_columns` e
+    `player_columns` guardam as colunas do documento (sem as removidas),
+    na ordem do dump, para `to_document`.
+    """
+
+    def __init__(self):
+        self.games: List[Game] = []
+        self.players: List[Player] = []
+        self.game_columns: List[str] = ['id', 'name']
+        self.player_columns: List[str] = ['id', 'name', 'team']
+        self.skipped_links = 0
+        self._games_by_name: Dict[str, Game] = {}
+
+    def game(self, game: str) -> Optional[Game]:
+        """
+        Game por nome (sem diferenciar maiúsculas) ou id.
+        """
+        if not self._games_by_name:
+            for item in self.games:
+                for key in (str(item.name).casefold(), item.id, unpack_id(item.uuid)):
+                    self._games_by_name.setdefault(key, item)
+        return self._games_by_name.get(game) or self._games_by_name.get(game.casefold())
+
+    @property
+    def player_count(self) -> int:
+        """
+        Pares (game, player), como no documento.
+        """
+        return sum(len(game.players) for game in self.games)
+
+    def _fields(self, record: _Record, columns: List[str]) -> Dict[str, Any]:
+        fields = {}
+        for column in columns:
+            if column == 'id':
+                fields['id'] = record.id
+            elif column in ('name', 'team'):
+                fields[column] = getattr(record, column)
+            else:
+                fields[column] = record.extra[column]
+        return fields
+
+    def to_document(self) -> Dict[str, Any]:
+        """
+        Documento aninhado igual ao de sql_to_json.build_document.
+        """
+        return {'games': [
+            dict(self._fields(game, self.game_columns), players=[
+                dict(self._fields(player, self.player_columns),
+                     settings={setting.name: setting.value for setting in settings})
+                for player, settings in game.entries()
+            ])
+            for game in self.games
+        ]}
+
+
+def _document_columns(columns: List[str], known: Tuple[str, ...]) -> Tuple[List[str], List[str]]:
+    """
+    Colunas do documento (compact_record: sem as removidas nem `image`) e,
+    delas, as que vão para `extra`.
+    """
+    kept = [column for column in columns if column not in DROPPED_FIELDS and column != 'image']
+    return kept, [column for column in kept if column not in known]
+
+
+def load_dataset(sql_file: str, workers: int = 1, use_cache: bool = True, quiet: bool = False) -> Dataset:
+    """
+    Carrega games, players, game_player e settings do dump no modelo
+    compacto, com as mesmas regras do GamesDocumentBuilder: registros com
+    quantidade errada de colunas e links para game ou player inexistente
+    são ignorados, e o último setting com o mesmo nome vale.
+    """
+    dataset = Dataset()
+    strings = Interner()
+    games: Dict[str, Game] = {}
+    players: Dict[str, Player] = {}
+    links: List[Tuple[str, str]] = []
+    # (game_id, player_id) → {nome: Setting}, até o join
+    settings: Dict[Tuple[str, str], Dict[str, Setting]] = {}
+
+    for _, table_name, columns, rows in iter_table_chunks(sql_file, workers, use_cache, quiet=quiet):
+        size = len(columns)
+        position = {column: index for index, column in enumerate(columns)}
+        get = position.get
+
+        if table_name in ('games', 'players'):
+            known = ('id', 'name', 'team') if table_name == 'players' else ('id', 'name')
+            kept, extra_columns = _document_columns(columns, known)
+            if table_name == 'games':
+                dataset.game_columns = kept
+            else:
+                dataset.player_columns = kept
+            id_idx, image_idx, name_idx, team_idx = get('id'), get('image'), get('name'), get('team')
+            extra_idx = [(column, position[column]) for column in extra_columns]
+
+            for row in rows:
+                if len(row) != size:
+                    continue
+                image = None if image_idx is None else row[image_idx]
+                name = None if name_idx is None else row[name_idx]
+                extra = {column: row[index] for column, index in extra_idx} if extra_idx else None
+                if table_name == 'games':
+                    games[row[id_idx]] = Game(row[id_idx], image, name, extra, strings)
+                else:
+                    team = None if team_idx is None else row[team_idx]
+                    players[row[id_idx]] = Player(row[id_idx], image, name, team, extra, strings)
+
+        elif table_name == 'game_player':
+            game_idx, player_idx = position['game_id'], position['player_id']
+            links.extend((row[game_idx], row[player_idx]) for row in rows if len(row) == size)
+
+        elif table_name == 'settings':
+            game_idx, player_idx = position['game_id'], position['player_id']
+            name_idx, value_idx = position['name'], position['value']
+            for row in rows:
+                if len(row) != size:
+                    continue
+                key = (row[game_idx], row[player_idx])
+                player_settings = settings.get(key)
+                if player_settings is None:
+                    player_settings = settings[key] = {}
+                setting = strings.setting(row[name_idx], row[value_idx])
+                player_settings[setting.name] = setting
+
+    for game_id, player_id in links:
+        game = games.get(game_id)
+        player = players.get(player_id)
+        if game is None or player is None:
+            dataset.skipped_links += 1
+            continue
+        game.players.append(player)
+        player_settings = settings.get((game_id, player_id))
+        game.settings.append(tuple(player_settings.values()) if player_settings else ())
+
+    dataset.games = list(games.values())
+    dataset.players = list(players.values())
+    return dataset
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Carrega o dump no modelo compacto e mostra um resumo.")
+    parser.add_argument('sql_file', nargs='?', default="bdprosettingscorreto.sql",
+                        help="arquivo SQL (pode estar comprimido com gzip, bz2 ou xz)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="não lê nem grava o cache de registros parseados")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dataset = load_dataset(args.sql_file, use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 70)
+    print(f"MODELO COMPACTO: {args.sql_file}")
+    print("=" * 70)
+    print(f"Games: {len(dataset.games)}  Players: {len(dataset.players):,}  "
+          f"Pares game/player: {dataset.player_count:,}")
+    references = [setting for game in dataset.games for settings in game.settings for setting in settings]
+    distinct = len({id(setting) for setting in references})
+    print(f"Settings: {len(references):,} ({distinct:,} objetos distintos)")
+    print(f"Carregado em {elapsed:.2f}s")
+    print("\nPara comparar a memória com o documento em dicts: python benchmark.py --memory")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Execução da conversão em estágios sobrepostos, ligados por filas limitadas.
+
+    leitura → tokenização → parse → (join no processo principal) → gravação
+
+Cada estágio roda numa thread e entrega os itens ao seguinte por uma
+`queue.Queue` de tamanho fixo: quando o estágio seguinte está atrasado, o
+anterior bloqueia no `put` (backpressure), então a memória fica limitada a
+`queue_size` itens por fila, não ao tamanho do dump. A leitura do arquivo e
+a gravação do JSON são I/O e liberam o GIL, então a latência de um disco de
+rede fica escondida atrás do parse. O parse em si continua limitado pelo
+GIL; com `--workers` ele vai para um pool de processos.
+
+Erros: a exceção de qualquer estágio é repassada pela fila e relançada em
+quem consome o estágio seguinte, até chegar ao processo principal. Quando o
+consumidor para antes do fim (erro ou `break`), os estágios anteriores são
+avisados, param e suas threads são aguardadas.
+
+    chunks = threaded(read_chunks(path), name='read')
+    rows = threaded(split_rows(chunks), name='tokenize', source=chunks)
+    for row in rows:
+        ...
+"""
+
+import queue
+import threading
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, TextIO, Union
+
+
+# Itens em cada fila entre dois estágios
+PIPELINE_QUEUE_SIZE = 8
+
+# Bytes (ou caracteres) acumulados antes de cada gravação da ThreadedWriter
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Intervalo para conferir se o consumidor desistiu enquanto a fila está cheia
+_POLL_SECONDS = 0.1
+
+_END = object()
+
+
+class _Failure:
+    """
+    Exceção de um estágio, levada pela fila até o consumidor.
+    """
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _put(items: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    # Bloqueia enquanto a fila está cheia; False se o consumidor desistiu
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def threaded(iterable: Iterable[Any], queue_size: int = PIPELINE_QUEUE_SIZE,
+             name: str = 'stage', source: Optional[Iterator[Any]] = None) -> Iterator[Any]:
+    """
+    Consome `iterable` numa thread própria e entrega os itens por uma fila
+    de `queue_size` itens. Exceções do estágio são relançadas aqui.
+
+    `source` é o estágio anterior, de onde `iterable` lê; ele é fechado
+    quando este estágio termina, mesmo com erro, para a cadeia inteira parar.
+    """
+    items: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def run():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not _put(items, item, stop):
+                    return
+            _put(items, _END, stop)
+        except BaseException as error:
+            _put(items, _Failure(error), stop)
+        finally:
+            for stage in (iterator, source):
+                close = getattr(stage, 'close', None)
+                if close is not None:
+                    close()
+
+    thread = threading.Thread(target=run, name=f"pipeline-{name}", daemon=True)
+    return _consume(items, stop, thread)
+
+
+def _consume(items: queue.Queue, stop: threading.Event, thread: threading.Thread) -> Iterator[Any]:
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class ThreadedWriter:
+    """
+    Arquivo só de escrita que agrupa as gravações em blocos de
+    `WRITE_BUFFER_SIZE` e as repassa a uma thread, que grava no arquivo
+    real. `close` grava o que falta, espera a thread e relança o erro de
+    gravação, se houver; um erro também aparece no próximo `write`.
+    """
+
+    def __init__(self, f: Union[TextIO, BinaryIO], queue_size: int = PIPELINE_QUEUE_SIZE):
+        self._file = f
+        self._pending: List[Any] = []
+        self._pending_size = 0
+        self._items: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="pipeline-write", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            block = self._items.get()
+            if block is _END:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._file.write(block)
+            except BaseException as error:
+                self._error = error
+                self._stop.set()
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, data: Any) -> int:
+        self._check()
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= WRITE_BUFFER_SIZE:
+            self._flush_pending()
+        return len(data)
+
+    def _flush_pending(self):
+        if not self._pending:
+            return
+        block = self._pending[0][:0].join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        _put(self._items, block, self._stop)
+        self._check()
+
+    def close(self):
+        """
+        Grava o que falta e espera a thread de gravação.
+        """
+        if self._thread.is_alive():
+            try:
+                if self._error is None:
+                    self._flush_pending()
+            finally:
+                self._items.put(_END)
+                self._thread.join()
+        self._check()
+
+    def __enter__(self) -> 'ThreadedWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        # Já há um erro subindo: só encerra a thread
+        self._error = self._error or exc
+        self._pending = []
+        if self._thread.is_alive():
+            self._items.put(_END)
+            self._thread.join()
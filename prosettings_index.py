@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Índice em memória sobre o documento games → players → settings.
+
+Carrega o JSON gerado pelo conversor uma vez e monta dicionários para
+consultas diretas, em vez de percorrer as listas com `next(...)`:
+
+    from prosettings_index import ProSettingsIndex
+
+    index = ProSettingsIndex.from_file('prosettings.json')
+    cs2 = index.game('cs2')
+    tenz = index.player('Valorant', 'TenZ')
+    matches = index.find(game='Valorant', settings=[('mouse_settings', 'dpi', '800')])
+
+Nomes de games, players e times são comparados sem diferenciar maiúsculas.
+Cada player aparece uma vez por game em que joga; as consultas que podem
+achar mais de um retornam listas de tuplas (game, player).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import dict_encoding
+
+
+def _normalize(text: Any) -> str:
+    return str(text).casefold()
+
+
+def _strip_extension(player_id: str) -> str:
+    # O id no JSON inclui a extensão da imagem ("uuid.png")
+    return player_id.rsplit('.', 1)[0]
+
+
+class ProSettingsIndex:
+    """
+    Índices por nome de game, nome/id de player, time e um índice invertido
+    (setting, chave, valor) → players.
+    """
+
+    def __init__(self, document: Dict[str, Any]):
+        self.games = document['games']
+
+        # Cada par (game, player) recebe um número; os índices guardam esses números
+        self._entries: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+
+        self._games: Dict[str, Dict[str, Any]] = {}
+        self._game_entries: Dict[int, Set[int]] = {}
+        self._players_in_game: Dict[Tuple[int, str], int] = {}
+        self._players_by_name: Dict[str, List[int]] = {}
+        self._players_by_id: Dict[str, List[int]] = {}
+        self._players_by_team: Dict[str, Set[int]] = {}
+        self._settings: Dict[Tuple[str, str, str], Set[int]] = {}
+
+        for game in self.games:
+            self._games.setdefault(_normalize(game['name']), game)
+            self._games.setdefault(game['id'], game)
+            self._games.setdefault(_strip_extension(game['id']), game)
+            game_entries = self._game_entries[id(game)] = set()
+
+            for player in game['players']:
+                entry = len(self._entries)
+                self._entries.append((game, player))
+                game_entries.add(entry)
+
+                self._players_in_game.setdefault((id(game), _normalize(player['name'])), entry)
+                self._players_in_game.setdefault((id(game), player['id']), entry)
+                self._players_in_game.setdefault((id(game), _strip_extension(player['id'])), entry)
+
+                self._players_by_name.setdefault(_normalize(player['name']), []).append(entry)
+                self._players_by_id.setdefault(_strip_extension(player['id']), []).append(entry)
+                if player.get('team'):
+                    self._players_by_team.setdefault(_normalize(player['team']), set()).add(entry)
+
+                for setting_name, setting_value in player.get('settings', {}).items():
+                    if not isinstance(setting_value, dict):
+                        continue
+                    for key, value in setting_value.items():
+                        self._settings.setdefault((setting_name, key, _normalize(value)), set()).add(entry)
+
+    @classmethod
+    def from_file(cls, json_file: str) -> 'ProSettingsIndex':
+        """
+        Carrega o JSON do conversor (formato comum ou `--format dict`).
+        """
+        return cls(dict_encoding.load_document(json_file))
+
+    def _resolve(self, entries: Iterable[int]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        return [self._entries[entry] for entry in sorted(entries)]
+
+    def game(self, game: str) -> Optional[Dict[str, Any]]:
+        """
+        Game por nome ou id.
+        """
+        return self._games.get(game) or self._games.get(_normalize(game))
+
+    def player(self, game: str, player: str) -> Optional[Dict[str, Any]]:
+        """
+        Player de um game, por nome ou id.
+        """
+        game_data = self.game(game)
+        if game_data is None:
+            return None
+
+        entry = self._players_in_game.get((id(game_data), player))
+        if entry is None:
+            entry = self._players_in_game.get((id(game_data), _normalize(player)))
+        return None if entry is None else self._entries[entry][1]
+
+    def players_named(self, name: str) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Todos os (game, player) com esse nome de player.
+        """
+        return self._resolve(self._players_by_name.get(_normalize(name), ()))
+
+    def player_by_id(self, player_id: str) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Todos os (game, player) com esse id (com ou sem a extensão da imagem).
+        """
+        return self._resolve(self._players_by_id.get(_strip_extension(player_id), ()))
+
+    def team(self, team: str) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Todos os (game, player) de um time.
+        """
+        return self._resolve(self._players_by_team.get(_normalize(team), ()))
+
+    def find(self, game: Optional[str] = None, team: Optional[str] = None,
+             settings: Iterable[Tuple[str, str, Any]] = ()) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Players que atendem a todos os filtros. `settings` é uma lista de
+        (tipo de setting, chave, valor), ex: [('mouse_settings', 'dpi', '800')].
+
+        Cada filtro vira um conjunto de players e o resultado é a interseção,
+        começando pelo menor conjunto.
+        """
+        candidates = []
+
+        if game is not None:
+            game_data = self.game(game)
+            if game_data is None:
+                return []
+            candidates.append(self._game_entries[id(game_data)])
+
+        if team is not None:
+            candidates.append(self._players_by_team.get(_normalize(team), set()))
+
+        for setting_name, key, value in settings:
+            candidates.append(self._settings.get((setting_name, key, _normalize(value)), set()))
+
+        if not candidates:
+            return list(self._entries)
+
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for candidate in candidates[1:]:
+            if not result:
+                break
+            result &= candidate
+
+        return self._resolve(result)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+API HTTP local sobre o documento games → players → settings.
+
+Converte o dump (ou carrega o JSON já gerado) uma vez e serializa todas as
+respostas antecipadamente, em bytes, com a versão gzip e o ETag de cada
+uma. Uma requisição só acha o buffer pronto e o envia; com If-None-Match
+igual ao ETag a resposta é 304, sem corpo.
+
+Rotas:
+    /games                       games com id, nome e quantidade de players
+    /games/{game}/players        players completos (com settings) do game,
+                                 por nome (sem diferenciar maiúsculas) ou id
+    /players/{id}                o player em cada game em que joga, por id
+                                 (com ou sem a extensão da imagem)
+
+Enquanto o servidor roda, uma thread confere a data de modificação do
+arquivo de origem. Quando ela muda (e o arquivo para de mudar), o
+documento é reconstruído em segundo plano e o conjunto de respostas é
+trocado de uma vez; as requisições em andamento terminam com o conjunto
+anterior. Se a reconstrução falha, o anterior continua valendo.
+
+    python serve.py bdprosettingscorreto.sql --port 8000
+    curl -i localhost:8000/games/valorant/players
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+import compressed
+import dict_encoding
+from sql_to_json import build_document
+
+
+# Intervalo (segundos) entre as conferências da data de modificação
+WATCH_INTERVAL = 2.0
+
+# Respostas menores que isso não são comprimidas
+GZIP_MIN_SIZE = 256
+
+
+def _normalize(text: Any) -> str:
+    return str(text).casefold()
+
+
+def _strip_extension(item_id: str) -> str:
+    # O id no JSON inclui a extensão da imagem ("uuid.png")
+    return item_id.rsplit('.', 1)[0]
+
+
+class Response:
+    """
+    Corpo JSON já serializado, a versão gzip (se compensa) e os ETags de
+    cada uma. Cada codificação tem o seu ETag, porque os bytes são outros.
+    """
+
+    __slots__ = ('body', 'etag', 'gzip_body', 'gzip_etag')
+
+    def __init__(self, payload: Any):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+        self.etag = f'"{digest}"'
+
+        self.gzip_body: Optional[bytes] = None
+        self.gzip_etag: Optional[str] = None
+        if len(self.body) >= GZIP_MIN_SIZE:
+            # mtime=0: o mesmo conteúdo dá sempre os mesmos bytes
+            compressed = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if len(compressed) < len(self.body):
+                self.gzip_body = compressed
+                self.gzip_etag = f'"{digest}-gzip"'
+
+
+class ResponseSet:
+    """
+    Todas as respostas de um documento, por rota. Nomes e ids alternativos
+    de um mesmo game ou player apontam para o mesmo Response.
+    """
+
+    def __init__(self, document: Dict[str, Any]):
+        self.games_response = Response([
+            dict({key: value for key, value in game.items() if key != 'players'}, players=len(game['players']))
+            for game in document['games']
+        ])
+        self.game_players: Dict[str, Response] = {}
+        self.players: Dict[str, Response] = {}
+        self.player_count = 0
+
+        appearances: Dict[str, List[Dict[str, Any]]] = {}
+        for game in document['games']:
+            response = Response(game['players'])
+            for key in (game['id'], _strip_extension(game['id']), _normalize(game['name'])):
+                self.game_players.setdefault(key, response)
+
+            game_summary = {'id': game['id'], 'name': game['name']}
+            for player in game['players']:
+                self.player_count += 1
+                appearances.setdefault(_strip_extension(player['id']), []).append(
+                    {'game': game_summary, 'player': player})
+
+        for player_id, entries in appearances.items():
+            self.players[player_id] = Response(entries)
+
+        self.game_count = len(document['games'])
+
+    def find(self, path: str) -> Optional[Response]:
+        """
+        Resposta de um caminho (já sem query string), ou None.
+        """
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+        if parts == ['games']:
+            return self.games_response
+        if len(parts) == 3 and parts[0] == 'games' and parts[2] == 'players':
+            return self.game_players.get(parts[1]) or self.game_players.get(_normalize(parts[1]))
+        if len(parts) == 2 and parts[0] == 'players':
+            return self.players.get(_strip_extension(parts[1]))
+        return None
+
+    def size(self) -> Tuple[int, int]:
+        """
+        Bytes das respostas distintas: (sem compressão, gzip).
+        """
+        responses = {id(response): response for response in
+                     [self.games_response, *self.game_players.values(), *self.players.values()]}
+        plain = sum(len(response.body) for response in responses.values())
+        compressed = sum(len(response.gzip_body or response.body) for response in responses.values())
+        return plain, compressed
+
+
+def load_source(source: str, workers: int = 1, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Documento aninhado a partir de um dump SQL (convertido aqui) ou de um
+    JSON gerado pelo conversor (qualquer formato, comprimido ou não).
+    """
+    # Pela extensão, sem a da compressão: "x.json.gz" é JSON, "x.json.sql" é dump
+    if compressed.strip_suffix(source).lower().endswith('.json'):
+        return dict_encoding.load_document(source)
+    return build_document(source, workers, use_cache, quiet=True)
+
+
+class SnapshotServer(ThreadingHTTPServer):
+    """
+    Servidor HTTP com o conjunto de respostas atual e a thread que o
+    reconstrói quando o arquivo de origem muda.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], source: str, workers: int = 1, use_cache: bool = True,
+                 watch_interval: float = WATCH_INTERVAL, quiet: bool = False):
+        self.source = source
+        self.workers = workers
+        self.use_cache = use_cache
+        self.watch_interval = watch_interval
+        self.quiet = quiet
+
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._loaded_stat = self._stat()
+        self.responses = self._build()
+        super().__init__(address, SnapshotRequestHandler)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.source)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _build(self) -> ResponseSet:
+        start = time.perf_counter()
+        responses = ResponseSet(load_source(self.source, self.workers, self.use_cache))
+        plain, compressed = responses.size()
+        print(f"Snapshot pronto: {responses.game_count} games, {responses.player_count:,} players, "
+              f"{plain / 1024 / 1024:.1f} MB ({compressed / 1024 / 1024:.1f} MB com gzip) "
+              f"em {time.perf_counter() - start:.2f}s")
+        return responses
+
+    def _watch(self):
+        pending = None
+        while not self._stop.wait(self.watch_interval):
+            stat = self._stat()
+            if stat is None or stat == self._loaded_stat:
+                pending = None
+                continue
+            if stat != pending:
+                # Mudou desde a última conferência: espera o arquivo parar de mudar
+                pending = stat
+                continue
+
+            print(f"{self.source} mudou, reconstruindo o snapshot...")
+            try:
+                responses = self._build()
+            except Exception as e:
+                print(f"Aviso: falha ao reconstruir o snapshot ({e}); mantendo o anterior")
+            else:
+                # Troca de uma referência só: cada requisição lê self.responses uma vez
+                self.responses = responses
+            self._loaded_stat = stat
+            pending = None
+
+    def start_watching(self):
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name='watch', daemon=True)
+            self._watcher.start()
+
+    def server_close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        super().server_close()
+
+
+def _quality(params: str) -> float:
+    # q do Accept-Encoding (1 se ausente, 0 se inválido)
+    for param in params.split(';'):
+        key, _, value = param.partition('=')
+        if key.strip().lower() == 'q':
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def _accepts_gzip(header: Optional[str]) -> bool:
+    # Uma entrada gzip explícita vale mais que o curinga "*"
+    qualities = {}
+    for coding in (header or '').split(','):
+        name, _, params = coding.partition(';')
+        name = name.strip().lower()
+        if name in ('gzip', '*'):
+            qualities.setdefault(name, _quality(params))
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    # If-None-Match usa comparação fraca: W/"x" vale como "x"
+    if header is None:
+        return False
+    if header.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in header.split(',')]
+    return any(tag[2:] == etag if tag.startswith('W/') else tag == etag for tag in tags)
+
+
+class SnapshotRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET e HEAD sobre o conjunto de respostas atual do servidor.
+    """
+
+    server: SnapshotServer
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em dois writes; com o Nagle ligado, respostas
+    # pequenas esperam o ACK atrasado do cliente (~40 ms) em keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body: bool):
+        response = self.server.responses.find(urlsplit(self.path).path)
+        if response is None:
+            self._send_error(404, 'rota ou registro não encontrado')
+            return
+
+        if response.gzip_body is not None and _accepts_gzip(self.headers.get('Accept-Encoding')):
+            body, etag, encoding = response.gzip_body, response.gzip_etag, 'gzip'
+        else:
+            body, etag, encoding = response.body, response.etag, None
+
+        if _etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self._send_cache_headers(etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        self._send_cache_headers(etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_cache_headers(self, etag: str):
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+
+    def _send_error(self, status: int, message: str):
+        body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve os dados convertidos por HTTP, a partir de um snapshot em memória.")
+    parser.add_argument('source', nargs='?', default="bdprosettingscorreto.sql",
+                        help="dump SQL (pode estar comprimido) ou JSON gerado pelo conversor")
+    parser.add_argument('--host', default='127.0.0.1', help="endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8000, help="porta (padrão: 8000)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processos para parsear o dump (padrão: 1)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="não lê nem grava o cache de registros parseados")
+    parser.add_argument('--watch-interval', type=float, default=WATCH_INTERVAL,
+                        help=f"segundos entre as conferências do arquivo de origem (padrão: {WATCH_INTERVAL})")
+    parser.add_argument('--quiet', action='store_true', help="não mostra o log de cada requisição")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        parser.error(f"arquivo não encontrado: {args.source}")
+
+    server = SnapshotServer((args.host, args.port), args.source, args.workers, not args.no_cache,
+                            args.watch_interval, args.quiet)
+    server.start_watching()
+    print(f"Servindo {args.source} em http://{args.host}:{server.server_address[1]}/games")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando...")
+    finally:
+        server.server_close()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Deduplicação dos objetos de settings por conteúdo.
+
+Muitos players têm objetos de settings idênticos (ex: o hud_settings
+{"hud_scaling": "Unknown", "cl_hud_color": "Unknown"}, o radar padrão e
+presets comuns de mira). Durante a conversão, o `SettingsPool` do
+GamesDocumentBuilder troca cada valor de setting pelo objeto já guardado
+com o mesmo conteúdo, então players com settings iguais apontam para o
+mesmo dict em memória. Os objetos são compartilhados: não devem ser
+alterados.
+
+No formato `--format pool` cada objeto aparece uma vez em `settings`,
+endereçado pelo hash do conteúdo canônico (JSON com chaves ordenadas), e
+os players guardam só o hash:
+
+    {
+      "format": "prosettings-pool-v1",
+      "settings": {"9c1e...": {"hud_scaling": "Unknown", "cl_hud_color": "Unknown"}, ...},
+      "games": [{"id": "...", "name": "...", "players": [
+        {"id": "...", "name": "...", "team": "...",
+         "settings": {"hud_settings": "9c1e...", ...}}
+      ]}]
+    }
+
+O hash só depende do conteúdo, então o mesmo objeto tem o mesmo endereço
+em qualquer conversão. `decode_document` remonta o documento aninhado com
+os objetos compartilhados.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict
+
+
+FORMAT_NAME = 'prosettings-pool-v1'
+
+
+def content_hash(value: Any) -> str:
+    """
+    Endereço de um objeto de settings: hash do JSON canônico (chaves
+    ordenadas, sem espaços).
+    """
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class SettingsPool:
+    """
+    Objetos de settings distintos vistos durante a conversão.
+    """
+
+    def __init__(self):
+        # Chave de conteúdo canônica (chaves ordenadas) → objeto guardado
+        self._objects: Dict[Any, Any] = {}
+        self.references = 0
+
+    def intern(self, value: Any) -> Any:
+        """
+        O objeto já guardado com o mesmo conteúdo de `value`, ou o próprio
+        `value` se é o primeiro.
+        """
+        self.references += 1
+        try:
+            # Caso comum, objeto plano: os pares em ordem de chave (a ordem
+            # em que as chaves vieram não importa) e os tipos dos valores
+            # (para 1, 1.0 e true não virarem o mesmo objeto), sem serializar
+            items = tuple(sorted(value.items()))
+            key = (items, tuple(type(item_value) for _, item_value in items))
+            shared = self._objects.get(key)
+        except (AttributeError, TypeError):
+            # Listas, objetos aninhados e valores que não são objetos
+            key = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+            shared = self._objects.get(key)
+        if shared is None:
+            shared = self._objects[key] = value
+        return shared
+
+    @property
+    def unique(self) -> int:
+        return len(self._objects)
+
+    @property
+    def ratio(self) -> float:
+        """
+        Referências por objeto distinto (1.0 = nenhuma repetição).
+        """
+        return self.references / self.unique if self.unique else 1.0
+
+
+def encode_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converte o documento aninhado para o formato com o pool de settings.
+    """
+    pool = {}
+    # Objetos compartilhados (do SettingsPool) têm o hash calculado uma vez
+    hashes: Dict[int, str] = {}
+
+    games = []
+    for game in document['games']:
+        players = []
+        for player in game['players']:
+            references = {}
+            for setting_name, setting_value in player.get('settings', {}).items():
+                key = hashes.get(id(setting_value))
+                if key is None:
+                    key = hashes[id(setting_value)] = content_hash(setting_value)
+                    stored = pool.setdefault(key, setting_value)
+                    if stored is not setting_value and stored != setting_value:
+                        raise ValueError(f"Colisão de hash no pool de settings: {key}")
+                references[setting_name] = key
+            players.append(dict(player, settings=references))
+        games.append(dict(game, players=players))
+
+    return {'format': FORMAT_NAME, 'settings': pool, 'games': games}
+
+
+def decode_document(encoded: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reconstrói o documento aninhado a partir do formato com pool. Players
+    com o mesmo hash recebem o mesmo objeto.
+    """
+    if encoded.get('format') != FORMAT_NAME:
+        raise ValueError(f"Formato desconhecido: {encoded.get('format')!r}")
+
+    pool = encoded['settings']
+    games = []
+    for game in encoded['games']:
+        players = [
+            dict(player, settings={name: pool[key] for name, key in player.get('settings', {}).items()})
+            for player in game['players']
+        ]
+        games.append(dict(game, players=players))
+
+    return {'games': games}
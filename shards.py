@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Saída dividida por game: um arquivo JSON por game (com seus players e
+settings) e um `manifest.json` pequeno com a lista de games.
+
+    shards/
+      manifest.json
+      cs2.json
+      valorant.json
+      ...
+
+Formato do manifest:
+
+    {
+      "format": "prosettings-shards-v1",
+      "games": [
+        {"id": "...", "name": "CS2", "players": 842, "file": "cs2.json",
+         "bytes": 123456, "sha256": "..."}
+      ]
+    }
+
+O app mostra a lista de games a partir do manifest e só baixa o arquivo do
+game aberto. O sha256 muda só quando o conteúdo do game muda, então pode ser
+usado para cache (ex: `cs2.json?v=<sha256>`). Cada shard é o objeto do game
+igual ao de `games[]` no JSON comum.
+
+O manifest é gravado por último: quem o lê nunca vê um shard que ainda não
+foi gravado.
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List
+
+from json_stream import StreamedList, write_json
+from sql_cache import file_sha256
+
+
+FORMAT_NAME = 'prosettings-shards-v1'
+MANIFEST_NAME = 'manifest.json'
+
+
+def shard_name(game_name: str, used: set) -> str:
+    """
+    Nome do arquivo do game ("Call of Duty: Warzone" → "call-of-duty-warzone.json"),
+    sem repetir nomes já usados.
+    """
+    slug = re.sub(r'[^a-z0-9]+', '-', game_name.lower()).strip('-') or 'game'
+    name = f"{slug}.json"
+    suffix = 2
+    while name in used or name == MANIFEST_NAME:
+        name = f"{slug}-{suffix}.json"
+        suffix += 1
+    used.add(name)
+    return name
+
+
+def _counted(items: Iterable[Any], counter: List[int]) -> Iterator[Any]:
+    for item in items:
+        counter[0] += 1
+        yield item
+
+
+def write_shards(document: Dict[str, Any], shards_dir: str, compact: bool = False,
+                 merge: bool = False) -> Dict[str, Any]:
+    """
+    Grava um arquivo por game e o manifest em `shards_dir`; retorna o manifest.
+    Aceita o documento de `GamesDocumentBuilder.build()` ou `.stream()`.
+
+    Com `merge`, o documento tem só alguns games (ex: conversão com
+    --games): os games dele são regravados e os outros do manifest
+    existente continuam lá, com os mesmos arquivos.
+    """
+    os.makedirs(shards_dir, exist_ok=True)
+
+    previous = _read_manifest(shards_dir) if merge else []
+    files = {entry['id']: entry['file'] for entry in previous}
+    used = set(files.values())
+    entries = []
+    games = document['games']
+    for game in (games.items if isinstance(games, StreamedList) else games):
+        # Conta os players enquanto grava (a lista pode ser um gerador)
+        counter = [0]
+        players = game['players']
+        if isinstance(players, StreamedList):
+            players = StreamedList(_counted(players.items, counter))
+        else:
+            counter[0] = len(players)
+
+        file_name = files.get(game['id']) or shard_name(game['name'], used)
+        path = os.path.join(shards_dir, file_name)
+        with open(path, 'w', encoding='utf-8') as f:
+            write_json(dict(game, players=players), f, compact)
+
+        entries.append({
+            'id': game['id'],
+            'name': game['name'],
+            'players': counter[0],
+            'file': file_name,
+            'bytes': os.path.getsize(path),
+            'sha256': file_sha256(path),
+        })
+
+    if previous:
+        # Mantém a ordem do manifest anterior; games novos vão para o fim
+        written = {entry['id']: entry for entry in entries}
+        entries = [written.pop(entry['id'], entry) for entry in previous] + list(written.values())
+
+    manifest = {'format': FORMAT_NAME, 'games': entries}
+    manifest_path = os.path.join(shards_dir, MANIFEST_NAME)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    return manifest
+
+
+def _read_manifest(shards_dir: str) -> List[Dict[str, Any]]:
+    """
+    Entradas do manifest existente em `shards_dir` (vazio se não houver).
+    """
+    try:
+        with open(os.path.join(shards_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if manifest.get('format') != FORMAT_NAME:
+        return []
+    return manifest['games']
+
+
+def load_sharded(shards_dir: str) -> Dict[str, Any]:
+    """
+    Remonta o documento {"games": [...]} a partir do manifest e dos shards,
+    conferindo o sha256 de cada arquivo.
+    """
+    with open(os.path.join(shards_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME:
+        raise ValueError(f"Formato desconhecido: {manifest.get('format')!r}")
+
+    games = []
+    for entry in manifest['games']:
+        path = os.path.join(shards_dir, entry['file'])
+        if file_sha256(path) != entry['sha256']:
+            raise ValueError(f"Shard {entry['file']} não confere com o sha256 do manifest")
+        with open(path, 'r', encoding='utf-8') as f:
+            games.append(json.load(f))
+
+    return {'games': games}
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Snapshot binário do documento games → players → settings com acesso direto.
+
+Em vez de carregar o JSON inteiro para ler um único player, o leitor faz
+mmap do arquivo, acha o registro por busca binária num índice ordenado e
+decodifica só aquele registro.
+
+Layout do arquivo (inteiros little-endian):
+
+    cabeçalho   magic, versão, nº de entradas do índice e os offsets do
+                catálogo, do bloco de chaves e do índice
+    registros   u32 tamanho + JSON UTF-8 (um por player, um por game e o
+                catálogo com a lista de games)
+    chaves      bytes das chaves do índice, concatenados
+    índice      entradas de tamanho fixo (offset da chave, tamanho da
+                chave, offset do registro), ordenadas pela chave
+
+Chaves do índice:
+    g\\0<game>              game
+    p\\0<game>\\0<player>     player de um game
+
+<game> e <player> são i<id sem a extensão> ou n<nome em casefold> (cada
+registro entra com as duas formas): como no ProSettingsIndex, a busca
+aceita o id com ou sem o ".png" e o nome sem diferenciar maiúsculas.
+
+Para conferir um snapshot contra o JSON gerado pelo conversor:
+
+    python snapshot.py prosettings.snap prosettings.json
+"""
+
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, List, Optional
+
+from compressed import open_text
+
+
+MAGIC = b'PSSNAP\x00\x00'
+VERSION = 2
+
+_HEADER = struct.Struct('<8sIIQQQ')
+_ENTRY = struct.Struct('<QIQ')
+_LENGTH = struct.Struct('<I')
+
+
+def _id_part(item_id: str) -> bytes:
+    # O id no JSON inclui a extensão da imagem ("uuid.png")
+    return b'i' + item_id.rsplit('.', 1)[0].encode('utf-8')
+
+
+def _name_part(name: Any) -> bytes:
+    return b'n' + str(name).casefold().encode('utf-8')
+
+
+def _lookup_parts(text: str) -> List[bytes]:
+    # Um texto da busca pode ser id (com ou sem extensão) ou nome; os
+    # prefixos i/n evitam que um nome case com um id
+    return [_id_part(text), _name_part(text)]
+
+
+def _game_key(game: bytes) -> bytes:
+    return b'g\x00' + game
+
+
+def _player_key(game: bytes, player: bytes) -> bytes:
+    return b'p\x00' + game + b'\x00' + player
+
+
+def write_snapshot(document: Dict[str, Any], snapshot_path: str):
+    """
+    Grava o snapshot do documento aninhado gerado pelo conversor.
+    """
+    entries = []
+    tmp_path = snapshot_path + '.tmp'
+
+    with open(tmp_path, 'wb') as f:
+        # O cabeçalho é preenchido no final, quando os offsets são conhecidos
+        f.write(b'\x00' * _HEADER.size)
+
+        def write_record(obj: Any) -> int:
+            offset = f.tell()
+            data = json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            f.write(_LENGTH.pack(len(data)))
+            f.write(data)
+            return offset
+
+        catalog = []
+        for game in document['games']:
+            game_parts = (_id_part(game['id']), _name_part(game['name']))
+            summaries = []
+
+            for player in game['players']:
+                offset = write_record(player)
+                for game_part in game_parts:
+                    for player_part in (_id_part(player['id']), _name_part(player['name'])):
+                        entries.append((_player_key(game_part, player_part), offset))
+                summaries.append({key: value for key, value in player.items() if key != 'settings'})
+
+            game_record = {key: value for key, value in game.items() if key != 'players'}
+            offset = write_record(dict(game_record, players=summaries))
+            for game_part in game_parts:
+                entries.append((_game_key(game_part), offset))
+
+            catalog.append(dict(game_record, players=len(summaries)))
+
+        catalog_offset = write_record(catalog)
+
+        # sort é estável: com chaves repetidas (ex: dois players com o mesmo
+        # nome, sem diferenciar maiúsculas, no mesmo game) vale a primeira ocorrência
+        entries.sort(key=lambda entry: entry[0])
+
+        keys_offset = f.tell()
+        key_offsets = []
+        for key, _ in entries:
+            key_offsets.append(f.tell())
+            f.write(key)
+
+        index_offset = f.tell()
+        for (key, record_offset), key_offset in zip(entries, key_offsets):
+            f.write(_ENTRY.pack(key_offset, len(key), record_offset))
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, len(entries), catalog_offset, keys_offset, index_offset))
+
+    os.replace(tmp_path, snapshot_path)
+
+
+class SnapshotReader:
+    """
+    Leitor de snapshot com mmap. Só decodifica os registros pedidos.
+
+        with SnapshotReader('prosettings.snap') as snapshot:
+            tenz = snapshot.player('Valorant', 'tenz')
+    """
+
+    def __init__(self, snapshot_path: str):
+        self._file = open(snapshot_path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, version, entry_count, catalog_offset, _, index_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{snapshot_path} não é um snapshot versão {VERSION}")
+
+        self._entry_count = entry_count
+        self._catalog_offset = catalog_offset
+        self._index_offset = index_offset
+
+    def _key_at(self, position: int) -> bytes:
+        key_offset, key_len, _ = _ENTRY.unpack_from(self._mm, self._index_offset + position * _ENTRY.size)
+        return self._mm[key_offset:key_offset + key_len]
+
+    def _find(self, key: bytes) -> Optional[int]:
+        # Busca binária (primeira ocorrência) no índice ordenado
+        low, high = 0, self._entry_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self._entry_count and self._key_at(low) == key:
+            return _ENTRY.unpack_from(self._mm, self._index_offset + low * _ENTRY.size)[2]
+        return None
+
+    def _read_record(self, offset: int) -> Any:
+        (length,) = _LENGTH.unpack_from(self._mm, offset)
+        start = offset + _LENGTH.size
+        return json.loads(self._mm[start:start + length])
+
+    def games(self) -> List[Dict[str, Any]]:
+        """
+        Lista de games com id, nome e quantidade de players.
+        """
+        return self._read_record(self._catalog_offset)
+
+    def _find_any(self, keys: Iterable[bytes]) -> Optional[Any]:
+        for key in keys:
+            offset = self._find(key)
+            if offset is not None:
+                return self._read_record(offset)
+        return None
+
+    def game(self, game: str) -> Optional[Dict[str, Any]]:
+        """
+        Game (por id, com ou sem a extensão, ou nome sem diferenciar
+        maiúsculas) com a lista de players, sem os settings.
+        """
+        return self._find_any(_game_key(part) for part in _lookup_parts(game))
+
+    def player(self, game: str, player: str) -> Optional[Dict[str, Any]]:
+        """
+        Player completo, com settings. Game e player como em `game`.
+        """
+        return self._find_any(_player_key(game_part, player_part)
+                              for game_part in _lookup_parts(game) for player_part in _lookup_parts(player))
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def verify_snapshot(snapshot_path: str, json_file: str) -> bool:
+    """
+    Confere se todos os games e players do JSON voltam iguais do snapshot.
+    """
+    print(f"Snapshot: {snapshot_path}")
+    print(f"JSON: {json_file}")
+    print("=" * 70)
+
+    with open_text(json_file) as f:
+        games = json.load(f)['games']
+
+    differences = 0
+    checked = 0
+
+    with SnapshotReader(snapshot_path) as snapshot:
+        catalog = snapshot.games()
+        if [game['id'] for game in catalog] != [game['id'] for game in games]:
+            print("❌ Lista de games diferente")
+            differences += 1
+
+        for game in games:
+            stored_game = snapshot.game(game['id'])
+            if stored_game is None or [p['id'] for p in stored_game['players']] != [p['id'] for p in game['players']]:
+                print(f"❌ Game {game['name']}: lista de players diferente")
+                differences += 1
+
+            for player in game['players']:
+                checked += 1
+                if snapshot.player(game['id'], player['id']) != player:
+                    print(f"❌ {game['name']} / {player['name']}: registro diferente")
+                    differences += 1
+
+    print(f"\nGames: {len(games)}  Players conferidos: {checked:,}")
+    if differences:
+        print(f"⚠️  {differences} diferenças encontradas")
+    else:
+        print("✅ Snapshot idêntico ao JSON")
+    print("=" * 70)
+
+    return differences == 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    snapshot_file = "prosettings.snap"
+    json_file = "prosettings.json"
+
+    if len(sys.argv) > 1:
+        snapshot_file = sys.argv[1]
+
+    if len(sys.argv) > 2:
+        json_file = sys.argv[2]
+
+    sys.exit(0 if verify_snapshot(snapshot_file, json_file) else 1)
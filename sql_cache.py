@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Cache em disco dos registros já parseados de um dump SQL.
+
+O cache fica ao lado do dump (`<dump>.cache`) e guarda um cabeçalho com a
+identificação do arquivo seguido dos blocos de registros parseados, cada um
+serializado com pickle. Depois da primeira leitura, o conversor e os
+validadores carregam os blocos direto do cache em vez de tokenizar o SQL de
+novo.
+
+Regra de invalidação: o cache só é usado se foi gerado pela mesma
+CACHE_VERSION e se o dump tem o mesmo tamanho e a mesma data de modificação.
+Se só a data mudou (ex: o arquivo foi copiado), o SHA-256 do conteúdo é
+recalculado e comparado. Qualquer outra diferença descarta o cache.
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+# Aumentar sempre que o formato dos registros parseados mudar
+CACHE_VERSION = 1
+
+CACHE_SUFFIX = '.cache'
+
+
+def cache_path(sql_file: str) -> str:
+    """
+    Caminho do arquivo de cache de um dump.
+    """
+    return sql_file + CACHE_SUFFIX
+
+
+def file_sha256(path: str) -> str:
+    """
+    SHA-256 do conteúdo do arquivo, lido em blocos de 1 MB.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(sql_file: str) -> Dict[str, Any]:
+    """
+    Identificação do dump gravada no cabeçalho do cache.
+    """
+    stat = os.stat(sql_file)
+    return {
+        'version': CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_sha256(sql_file),
+    }
+
+
+def is_cache_valid(header: Dict[str, Any], sql_file: str) -> bool:
+    """
+    Aplica a regra de invalidação descrita no início do módulo.
+    """
+    stat = os.stat(sql_file)
+
+    if header.get('version') != CACHE_VERSION or header.get('size') != stat.st_size:
+        return False
+
+    if header.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+
+    return header.get('sha256') == file_sha256(sql_file)
+
+
+def read_cache(sql_file: str) -> Optional[Iterator[Any]]:
+    """
+    Retorna um iterador sobre os blocos gravados no cache, ou None se não
+    existe cache válido para o dump.
+    """
+    path = cache_path(sql_file)
+    try:
+        f = open(path, 'rb')
+    except OSError:
+        return None
+
+    try:
+        header = pickle.load(f)
+        if not isinstance(header, dict) or not is_cache_valid(header, sql_file):
+            f.close()
+            return None
+    except Exception:
+        f.close()
+        return None
+
+    return _iter_cache_blocks(f)
+
+
+def _iter_cache_blocks(f) -> Iterator[Any]:
+    with f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def write_cache(sql_file: str, blocks: Iterable[Any]) -> Iterator[Any]:
+    """
+    Repassa os blocos de `blocks` e, ao mesmo tempo, grava cada um no cache.
+
+    Os blocos são gravados num arquivo temporário que só substitui o cache
+    quando o iterador é consumido até o fim. Se a leitura for interrompida,
+    o arquivo temporário é apagado e o cache antigo (se houver) continua lá.
+    """
+    path = cache_path(sql_file)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    header = file_fingerprint(sql_file)
+
+    try:
+        f = open(tmp_path, 'wb')
+    except OSError as e:
+        print(f"Aviso: não foi possível criar o cache {path}: {e}")
+        yield from blocks
+        return
+
+    completed = False
+    try:
+        with f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            for block in blocks:
+                pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+                yield block
+        os.replace(tmp_path, path)
+        completed = True
+    finally:
+        if not completed and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
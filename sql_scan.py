@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Contagem rápida de registros direto nos bytes do dump, sem parsear valores.
+
+O arquivo é mapeado com mmap (ou lido em blocos, se estiver comprimido) e
+cada INSERT é varrido em janelas de bytes:
+
+1. escapes (\\\\ e \\') viram "__", que tem o mesmo tamanho, então as
+   posições não mudam e toda aspa restante abre ou fecha uma string;
+2. um byte está fora das strings quando o número de aspas antes dele é
+   par (aspas duplicadas '' somam duas e não mudam a paridade);
+3. fora das strings, cada "(" abre um registro e o primeiro ";" fecha o
+   INSERT.
+
+Com NumPy, os passos 2 e 3 usam as posições de aspas, "(" e ";" e
+`searchsorted`; sem NumPy, a janela é dividida nas aspas com `bytes.split`
+e os "(" são contados nas partes de fora. Nos dois casos não há laço
+Python por caractere ou por registro. Só as tabelas cujos valores são
+necessários passam por regex: games (nomes) e game_player, onde só a
+coluna game_id é capturada para contar players por game.
+
+    counts = scan_dump('bdprosettings.sql')
+    counts['tables']['settings']  # registros de settings
+
+`index_statements` usa a mesma leitura em bytes para montar o índice de
+offsets dos INSERTs (ver dump_index.py).
+"""
+
+import mmap
+import re
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+import compressed
+from sql_to_json import parse_row
+
+try:
+    import numpy as np
+except ImportError:  # sem NumPy, a varredura usa só bytes.split
+    np = None
+
+
+# Tamanho de cada janela de bytes varrida de uma vez
+WINDOW_SIZE = 4 << 20
+
+# Tabelas cujos registros são parseados (o resto só é contado)
+VALUE_TABLES = ('games', 'game_player')
+
+_INSERT_RE = re.compile(rb"INSERT\s+INTO\s+`(\w+)`\s*\(([^)]*)\)\s*VALUES\s+", re.IGNORECASE)
+
+# Mesma regex de registro de sql_to_json._ROW_RE, sobre bytes
+_QUOTED = rb"'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'(?!')"
+_ROW_RE = re.compile(rb"\s*\(((?:[^'()]*" + _QUOTED + rb")*[^'()]*)\)\s*([,;])", re.DOTALL)
+
+# ";" no fim de linha: candidato a fim de INSERT
+_LINE_END_RE = re.compile(rb";\r?\n")
+
+_QUOTE, _PAREN, _SEMICOLON, _BACKSLASH = b"'(;\\"
+
+# Registros entre dois checkpoints do índice (ver index_statements)
+CHECKPOINT_ROWS = 1000
+
+# Cabeçalho de INSERT cortado entre dois blocos (fontes comprimidas)
+_HEADER_TAIL = 1 << 16
+
+
+class _ByteSource:
+    """
+    Acesso por offset absoluto ao conteúdo do dump: fatias do mmap para
+    arquivos comuns, ou um buffer reabastecido em blocos para arquivos
+    comprimidos (descarta o que já foi varrido).
+    """
+
+    def __init__(self, sql_file: str):
+        self._file = None
+        self._map = None
+        self._stream = None
+        self._buffer = b''
+        self._base = 0
+        self._eof = False
+
+        if compressed.detect_compression(sql_file) is None:
+            self._file = open(sql_file, 'rb')
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Arquivo vazio não pode ser mapeado
+                self._map = b''
+        else:
+            self._stream = compressed.open_binary(sql_file)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        for f in (self._file, self._stream):
+            if f is not None:
+                f.close()
+
+    def _fill(self, start: int, end: int):
+        # Garante o intervalo [start, end) no buffer (ou até o fim do arquivo)
+        if start > self._base:
+            self._buffer = self._buffer[start - self._base:]
+            self._base = start
+        while not self._eof and self._base + len(self._buffer) < end:
+            chunk = self._stream.read(max(WINDOW_SIZE, end - self._base - len(self._buffer)))
+            self._eof = not chunk
+            self._buffer += chunk
+
+    def get(self, start: int, size: int) -> bytes:
+        """
+        Até `size` bytes a partir de `start` (vazio no fim do arquivo).
+        """
+        if self._stream is None:
+            return self._map[start:start + size]
+        self._fill(start, start + size)
+        offset = start - self._base
+        return self._buffer[offset:offset + size]
+
+    def search(self, pattern: 're.Pattern', start: int, end: int) -> int:
+        """
+        Offset absoluto do primeiro match de `pattern` em [start, end), ou -1.
+        """
+        if self._stream is None:
+            match = pattern.search(self._map, start, end)
+            return -1 if match is None else match.start()
+        self._fill(start, end)
+        match = pattern.search(self._buffer, start - self._base, end - self._base)
+        return -1 if match is None else self._base + match.start()
+
+    def find_insert(self, start: int) -> Optional[Tuple[str, List[str], int, int]]:
+        """
+        Próximo cabeçalho de INSERT a partir de `start`:
+        (tabela, colunas, offset do INSERT, offset do início dos VALUES).
+        """
+        while True:
+            if self._stream is None:
+                match = _INSERT_RE.search(self._map, start)
+                base = 0
+            else:
+                self._fill(start, start + WINDOW_SIZE)
+                match = _INSERT_RE.search(self._buffer, start - self._base)
+                base = self._base
+
+            if match is not None:
+                columns = [col.strip().strip('`') for col in match.group(2).decode('utf-8').split(',')]
+                return match.group(1).decode('utf-8'), columns, base + match.start(), base + match.end()
+
+            if self._stream is None or self._eof:
+                return None
+            # Mantém só o final do buffer, onde pode haver um cabeçalho cortado
+            start = max(start, self._base + len(self._buffer) - _HEADER_TAIL)
+            self._fill(start, self._base + len(self._buffer) + WINDOW_SIZE)
+
+
+def _scan_window_split(window: bytes, inside: bool) -> Tuple[int, int, bool]:
+    # Só biblioteca padrão: divide nas aspas e junta as partes de fora
+    parts = window.split(b"'")
+    first_outside = 1 if inside else 0
+    outside = parts[first_outside::2]
+    text = b''.join(outside)
+    end = text.find(b';')
+
+    if end == -1:
+        # Número ímpar de aspas: a janela termina dentro de uma string
+        return text.count(b'('), -1, inside ^ (len(parts) % 2 == 0)
+
+    # Converte a posição do ";" no texto de fora das strings para a posição na janela
+    lengths = list(accumulate(map(len, outside)))
+    k = bisect_right(lengths, end)
+    part_index = first_outside + 2 * k
+    offset = sum(map(len, parts[:part_index])) + part_index + end - (lengths[k - 1] if k else 0)
+    return text.count(b'(', 0, end), offset, inside
+
+
+def _scan_window_numpy(window: bytes, inside: bool) -> Tuple[int, int, bool]:
+    # Posições de aspas, "(" e ";"; um byte está fora das strings quando o
+    # número de aspas antes dele (mais o estado inicial) é par
+    data = np.frombuffer(window, np.uint8)
+    quotes = np.flatnonzero(data == _QUOTE)
+    parens = np.flatnonzero(data == _PAREN)
+    semicolons = np.flatnonzero(data == _SEMICOLON)
+
+    shift = 1 if inside else 0
+    parens = parens[(np.searchsorted(quotes, parens) + shift) % 2 == 0]
+    ends = semicolons[(np.searchsorted(quotes, semicolons) + shift) % 2 == 0]
+
+    if ends.size == 0:
+        return parens.size, -1, inside ^ bool(quotes.size % 2)
+
+    end = int(ends[0])
+    return int(np.searchsorted(parens, end)), end, inside
+
+
+_scan_window = _scan_window_split if np is None else _scan_window_numpy
+
+
+def _count_rows(source: _ByteSource, start: int) -> Tuple[int, int]:
+    """
+    Conta os registros de um INSERT cujos VALUES começam em `start`.
+    Retorna (registros, offset logo depois do ";" final).
+    """
+    rows = 0
+    inside = False
+    pos = start
+
+    while True:
+        # A janela vai até o próximo ";" no fim de linha (candidato a fim do
+        # INSERT), para não varrer os INSERTs seguintes junto
+        candidate = source.search(_LINE_END_RE, pos, pos + WINDOW_SIZE)
+        window = source.get(pos, WINDOW_SIZE if candidate == -1 else candidate + 1 - pos)
+        if not window:
+            print("Aviso: INSERT incompleto ou malformado no fim do arquivo")
+            return rows, pos
+
+        # Não corta uma sequência de escape no meio
+        trailing = 0
+        while trailing < len(window) and window[-1 - trailing] == _BACKSLASH:
+            trailing += 1
+        if trailing % 2:
+            window = source.get(pos, len(window) + 1)
+
+        if b"\\'" in window:
+            window = window.replace(b'\\\\', b'__').replace(b"\\'", b'__')
+
+        count, end, inside = _scan_window(window, inside)
+        rows += count
+        if end != -1:
+            return rows, pos + end + 1
+        pos += len(window)
+
+
+def _iter_matches(source: _ByteSource, start: int, row_re: 're.Pattern'):
+    """
+    Registros de um INSERT cujos VALUES começam em `start`, como matches de
+    `row_re` (o último grupo é o "," ou ";" depois do registro).
+    Produz (match, offset logo depois do registro).
+    """
+    pos = start
+    size = WINDOW_SIZE
+    while True:
+        window = source.get(pos, size)
+        consumed = 0
+        while True:
+            match = row_re.match(window, consumed)
+            if match is None:
+                break
+            consumed = match.end()
+            yield match, pos + consumed
+            if match.group(match.lastindex) == b';':
+                return
+
+        if consumed:
+            pos += consumed
+            size = WINDOW_SIZE
+        elif len(window) < size:
+            print("Aviso: INSERT incompleto ou malformado no fim do arquivo")
+            return
+        else:
+            # Registro maior que a janela
+            size *= 2
+
+
+def _column_regex(index: int) -> 're.Pattern':
+    """
+    Regex de registro que captura só o valor bruto da coluna `index`.
+    """
+    field = rb"(?:" + _QUOTED + rb"|[^,'()]*)"
+    before = (rb"\s*" + field + rb"\s*,") * index
+    return re.compile(
+        rb"\s*\(" + before + rb"\s*(" + field + rb")\s*(?:,\s*" + field + rb"\s*)*\)\s*([,;])",
+        re.DOTALL,
+    )
+
+
+def scan_dump(sql_file: str) -> Dict[str, Any]:
+    """
+    Varre o dump e retorna:
+    - tables: registros por tabela
+    - statements: INSERTs por tabela
+    - game_names: nome de cada game por id
+    - game_player_counts: relacionamentos game_player por game_id
+    """
+    tables: Dict[str, int] = {}
+    statements: Dict[str, int] = {}
+    game_names: Dict[str, str] = {}
+    raw_ids: Counter = Counter()
+
+    source = _ByteSource(sql_file)
+    try:
+        pos = 0
+        while True:
+            header = source.find_insert(pos)
+            if header is None:
+                break
+            table_name, columns, _, pos = header
+            statements[table_name] = statements.get(table_name, 0) + 1
+
+            if table_name not in VALUE_TABLES:
+                rows, pos = _count_rows(source, pos)
+                tables[table_name] = tables.get(table_name, 0) + rows
+                continue
+
+            count = 0
+            if table_name == 'games':
+                id_idx, name_idx = columns.index('id'), columns.index('name')
+                for match, pos in _iter_matches(source, pos, _ROW_RE):
+                    count += 1
+                    row = parse_row(match.group(1).decode('utf-8'))
+                    game_names[row[id_idx]] = row[name_idx]
+            else:
+                # Conta pelo valor bruto e só decodifica cada game_id distinto uma vez
+                row_re = _column_regex(columns.index('game_id'))
+                for match, pos in _iter_matches(source, pos, row_re):
+                    count += 1
+                    raw_ids[match.group(1)] += 1
+            tables[table_name] = tables.get(table_name, 0) + count
+    finally:
+        source.close()
+
+    game_player_counts: Dict[str, int] = {}
+    for raw_id, count in raw_ids.items():
+        game_id = parse_row(raw_id.decode('utf-8'))[0]
+        game_player_counts[game_id] = game_player_counts.get(game_id, 0) + count
+
+    return {
+        'tables': tables,
+        'statements': statements,
+        'game_names': game_names,
+        'game_player_counts': game_player_counts,
+    }
+
+
+def index_statements(sql_file: str, checkpoint_rows: int = CHECKPOINT_ROWS) -> List[Dict[str, Any]]:
+    """
+    Offsets em bytes de cada INSERT do dump, na ordem do arquivo:
+    - table, columns: tabela e colunas do INSERT
+    - offset, length: início do "INSERT" e tamanho até o ";" final
+    - rows: quantidade de registros
+    - checkpoints: [registro, offset] a cada `checkpoint_rows` registros,
+      sempre no início de um registro (o primeiro é o início dos VALUES)
+
+    Em dumps comprimidos os offsets são do conteúdo descomprimido.
+    """
+    statements = []
+    source = _ByteSource(sql_file)
+    try:
+        pos = 0
+        while True:
+            header = source.find_insert(pos)
+            if header is None:
+                break
+            table_name, columns, start, pos = header
+
+            rows = 0
+            checkpoints = [[0, pos]]
+            for _, pos in _iter_matches(source, pos, _ROW_RE):
+                rows += 1
+                if rows % checkpoint_rows == 0:
+                    checkpoints.append([rows, pos])
+            if len(checkpoints) > 1 and checkpoints[-1][0] == rows:
+                # Checkpoint no fim do INSERT não marca nenhum registro
+                checkpoints.pop()
+
+            statements.append({
+                'table': table_name,
+                'columns': columns,
+                'offset': start,
+                'length': pos - start,
+                'rows': rows,
+                'checkpoints': checkpoints,
+            })
+    finally:
+        source.close()
+
+    return statements
@@ -3,91 +3,405 @@
 Script para extrair dados de um arquivo SQL e converter para JSON.
 """
 
+import os
+import pickle
 import re
 import json
-from typing import List, Dict, Any
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, nullcontext
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
+
+import compressed
+import dict_encoding
+import incremental
+import pipeline
+import settings_pool
+import shards
+import snapshot
+import sql_cache
+import sqlite_export
+from conversion_stats import PROFILE_MODES, STAGES, ConversionStats
+from json_stream import StreamedList, write_json
+from lazy_json import LazyJSON, resolve_row
+
+
+# Quantidade de caracteres lidos do arquivo por vez no modo streaming
+CHUNK_SIZE = 1 << 20
+
+# Quantidade de registros enviados de uma vez para cada processo no modo --workers
+PARALLEL_BATCH_ROWS = 1000
+
+# Quantos caracteres do final do buffer são mantidos quando nenhum INSERT é
+# encontrado (um cabeçalho de INSERT pode ter sido cortado entre dois blocos)
+_HEADER_TAIL = 1 << 16
+
+# Cabeçalho de um INSERT: nome da tabela, lista de colunas e "VALUES"
+_INSERT_RE = re.compile(r"INSERT\s+INTO\s+`(\w+)`\s*\(([^)]*)\)\s*VALUES\s+", re.IGNORECASE)
+
+# String SQL entre aspas simples (aceita escapes com barra e aspas duplicadas)
+_QUOTED = r"'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'(?!')"
+
+# Um registro completo "(...)" seguido do separador "," (mais registros) ou ";"
+# (fim do INSERT). Parênteses dentro de strings não fecham o registro.
+_ROW_RE = re.compile(r"\s*\(((?:[^'()]*" + _QUOTED + r")*[^'()]*)\)\s*([,;])", re.DOTALL)
+
+# Versão de _ROW_RE para textos sem barra invertida: aspas duplicadas ('')
+# viram duas strings seguidas, o que não muda onde o registro termina, e a
+# classe de caracteres mais simples deixa o casamento ~3x mais rápido
+_ROW_SIMPLE_RE = re.compile(r"\s*\(((?:[^'()]*'[^']*')*[^'()]*)\)\s*([,;])", re.DOTALL)
+
+# Um campo dentro de um registro: string entre aspas (grupo 1, sem as aspas)
+# ou valor sem aspas como NULL e números (grupo 2). Vírgulas e espaços entre
+# os campos não casam com nenhum dos dois e são pulados pelo findall.
+_FIELD_RE = re.compile(r"'([^'\\]*(?:(?:\\.|'')[^'\\]*)*)'(?!')|([^,'\s]+)", re.DOTALL)
+
+# Sequências de escape do MySQL dentro de strings
+_ESCAPE_RE = re.compile(r"\\(.)|''", re.DOTALL)
+_ESCAPES = {
+    '0': '\0',
+    'b': '\b',
+    'n': '\n',
+    'r': '\r',
+    't': '\t',
+    'Z': '\x1a',
+    '%': '\\%',
+    '_': '\\_',
+}
+
+
+def _stage(stats: Optional[ConversionStats], name: str):
+    # Mede o bloco só quando há métricas ativas
+    return nullcontext() if stats is None else stats.stage(name)
+
+
+def _silent(*args, **kwargs):
+    pass
+
+
+def iter_value_chunks(sql_file_path: str, chunk_size: int = CHUNK_SIZE,
+                      stats: Optional[ConversionStats] = None) -> Iterator[Tuple[int, str, List[str], List[str]]]:
+    """
+    Lê o arquivo SQL em blocos de `chunk_size` caracteres e produz tuplas
+    (statement, tabela, colunas, registros), onde `statement` é o número do
+    INSERT (começando em 0) e `registros` é a lista com o conteúdo bruto de
+    cada registro "(...)" completo encontrado no bloco atual.
+
+    Só o bloco atual fica em memória, então o consumo não cresce com o
+    tamanho do dump. Um mesmo INSERT pode gerar várias tuplas.
 
+    Dumps comprimidos (gzip, bz2, xz) são detectados pelos primeiros bytes e
+    descomprimidos em streaming (ver compressed.py).
 
-def extract_insert_statements(sql_file_path: str) -> Dict[str, List[tuple]]:
+    Com `stats`, mede as etapas read e tokenize.
     """
-    Extrai todos os INSERT statements do arquivo SQL agrupados por tabela.
-    Retorna um dicionário com o nome da tabela, colunas e valores.
+    return _split_values(_read_chunks(sql_file_path, chunk_size, stats), stats)
+
+
+def _read_chunks(sql_file_path: str, chunk_size: int = CHUNK_SIZE,
+                 stats: Optional[ConversionStats] = None) -> Iterator[str]:
+    """
+    Blocos de texto do arquivo (descomprimido se necessário), medindo read.
+    """
+    with compressed.open_text(sql_file_path) as f:
+        while True:
+            with _stage(stats, 'read'):
+                chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            if stats is not None:
+                stats.count('chars_read', len(chunk))
+            yield chunk
+
+
+def _split_values(chunks: Iterable[str],
+                  stats: Optional[ConversionStats] = None) -> Iterator[Tuple[int, str, List[str], List[str]]]:
     """
-    with open(sql_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    Tokenização de `iter_value_chunks` sobre blocos de texto já lidos.
+    """
+    chunks = iter(chunks)
+    buffer = next(chunks, '')
+    eof = not buffer
+    pos = 0
+    statement = -1
+    table_name = None
+    columns = None
+
+    while True:
+        if table_name is None:
+            match = _INSERT_RE.search(buffer, pos)
+            if match is None:
+                if eof:
+                    return
+                # Mantém só o final do buffer, onde pode haver um cabeçalho cortado
+                buffer = buffer[max(pos, len(buffer) - _HEADER_TAIL):]
+                pos = 0
+                chunk = next(chunks, '')
+                eof = not chunk
+                buffer += chunk
+                continue
 
-    inserts = {}
+            statement += 1
+            table_name = match.group(1)
+            columns = [col.strip().strip('`') for col in match.group(2).split(',')]
+            pos = match.end()
+
+        # Consome todos os registros completos disponíveis no buffer
+        rows = []
+        statement_end = False
+        with _stage(stats, 'tokenize'):
+            row_re = _ROW_RE if '\\' in buffer else _ROW_SIMPLE_RE
+            while True:
+                match = row_re.match(buffer, pos)
+                if match is None:
+                    break
+                rows.append(match.group(1))
+                pos = match.end()
+                if match.group(2) == ';':
+                    statement_end = True
+                    break
+
+        if rows:
+            yield statement, table_name, columns, rows
+
+        if statement_end:
+            table_name = None
+            continue
 
-    # Procura o início de cada INSERT statement
-    insert_pattern = r"INSERT\s+INTO\s+`(\w+)`\s*\("
+        if eof:
+            if buffer[pos:].strip():
+                print(f"Aviso: INSERT de {table_name} incompleto ou malformado no fim do arquivo")
+            return
 
-    matches = list(re.finditer(insert_pattern, content, re.IGNORECASE))
+        # Registro cortado no fim do bloco: descarta o que já foi lido e continua
+        buffer = buffer[pos:]
+        pos = 0
+        chunk = next(chunks, '')
+        eof = not chunk
+        buffer += chunk
 
-    insert_count = 0
-    for i, match in enumerate(matches):
-        insert_count += 1
-        table_name = match.group(1)
-        start_pos = match.end()  # Posição após o "("
-
-        # Extrai a lista de colunas - vai até o próximo ")"
-        paren_count = 1
-        col_end = start_pos
-        while paren_count > 0 and col_end < len(content):
-            if content[col_end] == '(':
-                paren_count += 1
-            elif content[col_end] == ')':
-                paren_count -= 1
-            col_end += 1
-
-        columns_str = content[start_pos:col_end-1]
-        columns = [col.strip().strip('`') for col in columns_str.split(',')]
-
-        # Procura "VALUES"
-        values_match = re.search(r"\s*VALUES\s+", content[col_end:col_end+50], re.IGNORECASE)
-        if not values_match:
-            print(f"Aviso: VALUES não encontrado para {table_name}")
-            continue
 
-        values_start = col_end + values_match.end()
+def iter_parsed_chunks(sql_file_path: str, workers: int = 1, chunk_size: int = CHUNK_SIZE,
+                       stats: Optional[ConversionStats] = None,
+                       lazy_json: bool = False) -> Iterator[Tuple[int, str, List[str], List[tuple]]]:
+    """
+    Igual a `iter_value_chunks`, mas com os registros já parseados em tuplas.
 
-        # Procura o ponto-e-vírgula que termina o INSERT
-        # Precisa respeitar strings e parênteses
-        values_end = values_start
-        in_string = False
-        escape_next = False
+    Com `workers` > 1 os registros são divididos em lotes de
+    `PARALLEL_BATCH_ROWS` (sempre em fronteiras de registro) e parseados num
+    ProcessPoolExecutor. Os lotes são devolvidos na ordem original, então o
+    resultado é idêntico ao do modo com um único processo.
 
-        while values_end < len(content):
-            char = content[values_end]
+    Com `stats`, os campos são separados e decodificados em duas fases para
+    medir row-parse e value-decode separadamente.
 
-            if escape_next:
-                escape_next = False
-                values_end += 1
-                continue
+    Com `lazy_json`, os valores JSON vêm como LazyJSON (ver `parse_row`).
+    """
+    return _parse_chunks(iter_value_chunks(sql_file_path, chunk_size, stats), workers, stats, lazy_json)
 
-            if char == '\\':
-                escape_next = True
-                values_end += 1
-                continue
 
-            if char == "'" and not escape_next:
-                in_string = not in_string
+def _parse_chunks(chunks: Iterable[Tuple[int, str, List[str], List[str]]], workers: int = 1,
+                  stats: Optional[ConversionStats] = None,
+                  lazy_json: bool = False) -> Iterator[Tuple[int, str, List[str], List[tuple]]]:
+    """
+    Parse de `iter_parsed_chunks` sobre blocos de registros já tokenizados.
+    """
+    if workers <= 1:
+        for statement, table_name, columns, rows in chunks:
+            if stats is None:
+                yield statement, table_name, columns, _parse_rows(rows, lazy_json)
+            else:
+                yield statement, table_name, columns, _parse_rows_measured(rows, stats, lazy_json)
+        return
+
+    parse = _parse_rows if stats is None else _parse_rows_timed
+
+    def result(future) -> List[tuple]:
+        if stats is None:
+            return future.result()
+        parsed, split_seconds, decode_seconds = future.result()
+        stats.add_time('row-parse', split_seconds)
+        stats.add_time('value-decode', decode_seconds)
+        return parsed
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Limita os lotes em andamento para a memória não crescer com o arquivo
+        pending = deque()
+        max_pending = workers * 4
+
+        for statement, table_name, columns, rows in chunks:
+            for start in range(0, len(rows), PARALLEL_BATCH_ROWS):
+                batch = rows[start:start + PARALLEL_BATCH_ROWS]
+                future = executor.submit(parse, batch, lazy_json)
+                pending.append((statement, table_name, columns, future))
+
+                if len(pending) >= max_pending:
+                    statement_done, table_done, columns_done, future = pending.popleft()
+                    yield statement_done, table_done, columns_done, result(future)
+
+        while pending:
+            statement_done, table_done, columns_done, future = pending.popleft()
+            yield statement_done, table_done, columns_done, result(future)
+
+
+def iter_pipelined_chunks(sql_file_path: str, workers: int = 1, chunk_size: int = CHUNK_SIZE,
+                          stats: Optional[ConversionStats] = None,
+                          queue_size: int = pipeline.PIPELINE_QUEUE_SIZE,
+                          lazy_json: bool = False) -> Iterator[Tuple[int, str, List[str], List[tuple]]]:
+    """
+    Igual a `iter_parsed_chunks`, mas com leitura, tokenização e parse em
+    threads separadas, ligadas por filas de `queue_size` itens (ver
+    pipeline.py). A leitura do próximo bloco acontece enquanto os anteriores
+    são tokenizados e parseados. O resultado é o mesmo, na mesma ordem.
+    """
+    chunks = pipeline.threaded(_read_chunks(sql_file_path, chunk_size, stats), queue_size, 'read')
+    values = pipeline.threaded(_split_values(chunks, stats), queue_size, 'tokenize', chunks)
+    return pipeline.threaded(_parse_chunks(values, workers, stats, lazy_json), queue_size, 'parse', values)
+
+
+def iter_table_chunks(sql_file_path: str, workers: int = 1, use_cache: bool = True,
+                      stats: Optional[ConversionStats] = None, quiet: bool = False,
+                      pipelined: bool = False, lazy_json: bool = False,
+                      pushdown: Optional[Any] = None) -> Iterator[Tuple[int, str, List[str], List[tuple]]]:
+    """
+    Fonte de registros parseados usada pelo conversor e pelos validadores.
+    Produz as mesmas tuplas que `iter_parsed_chunks`.
+
+    Com `use_cache` os blocos vêm do cache em disco (ver sql_cache.py) quando
+    ele é válido; caso contrário o dump é parseado e o cache é regravado.
+    A leitura do cache conta como etapa read nas métricas.
+
+    Com `pipelined` o dump é parseado por `iter_pipelined_chunks`.
+
+    Com `lazy_json`, os valores JSON parseados vêm como LazyJSON (os do
+    cache já vêm decodificados). Nesse modo o cache é lido, mas não é
+    gravado, já que guarda os valores decodificados.
 
-            if char == ';' and not in_string:
-                break
+    Com `pushdown` (um dump_index.Pushdown), só os INSERTs e registros que
+    passam pelos filtros são lidos e parseados, pelo índice do dump; o cache
+    não é usado.
+    """
+    if pushdown is not None:
+        if stats is not None:
+            stats.info['cache'] = 'index'
+        values = pushdown.iter_values(stats)
+        if pipelined:
+            values = pipeline.threaded(values, name='read')
+            yield from pipeline.threaded(_parse_chunks(values, workers, stats, lazy_json), name='parse', source=values)
+        else:
+            yield from _parse_chunks(values, workers, stats, lazy_json)
+        return
+
+    parse = iter_pipelined_chunks if pipelined else iter_parsed_chunks
+
+    if not use_cache:
+        if stats is not None:
+            stats.info['cache'] = 'off'
+        yield from parse(sql_file_path, workers, stats=stats, lazy_json=lazy_json)
+        return
+
+    cached = sql_cache.read_cache(sql_file_path)
+    if cached is not None:
+        if not quiet:
+            print(f"Usando cache: {sql_cache.cache_path(sql_file_path)}")
+        if stats is not None:
+            stats.info['cache'] = 'hit'
+            cached = _timed_iter(cached, stats, 'read')
+        yield from cached
+        return
+
+    if stats is not None:
+        stats.info['cache'] = 'miss'
+    if lazy_json:
+        yield from parse(sql_file_path, workers, stats=stats, lazy_json=True)
+        return
+    yield from sql_cache.write_cache(sql_file_path, parse(sql_file_path, workers, stats=stats))
+
+
+def _timed_iter(items: Iterable, stats: ConversionStats, name: str) -> Iterator:
+    """
+    Repassa os itens medindo só o tempo gasto para obter cada um.
+    """
+    iterator = iter(items)
+    while True:
+        with stats.stage(name):
+            item = next(iterator, None)
+        if item is None:
+            return
+        yield item
+
+
+def _parse_rows(rows: List[str], lazy_json: bool = False) -> List[tuple]:
+    """
+    Parse uma lista de registros brutos (executado nos processos do pool).
+    """
+    return [parse_row(row_str, lazy_json) for row_str in rows]
+
+
+def _parse_rows_measured(rows: List[str], stats: ConversionStats, lazy_json: bool = False) -> List[tuple]:
+    """
+    Igual a `_parse_rows`, medindo row-parse e value-decode em `stats`.
+    """
+    with stats.stage('row-parse'):
+        fields = [_split_row(row_str) for row_str in rows]
+    with stats.stage('value-decode'):
+        return [_decode_fields(row_fields, lazy_json) for row_fields in fields]
+
+
+def _parse_rows_timed(rows: List[str], lazy_json: bool = False) -> Tuple[List[tuple], float, float]:
+    """
+    Versão de `_parse_rows_measured` para os processos do pool: devolve os
+    registros e os tempos de row-parse e value-decode.
+    """
+    start = time.perf_counter()
+    fields = [_split_row(row_str) for row_str in rows]
+    split_done = time.perf_counter()
+    parsed = [_decode_fields(row_fields, lazy_json) for row_fields in fields]
+    return parsed, split_done - start, time.perf_counter() - split_done
 
-            values_end += 1
 
-        values_section = content[values_start:values_end]
+def iter_insert_rows(sql_file_path: str, chunk_size: int = CHUNK_SIZE, workers: int = 1) -> Iterator[Tuple[str, List[str], tuple]]:
+    """
+    Percorre o arquivo SQL em modo streaming e produz (tabela, colunas, registro)
+    para cada registro de cada INSERT, um de cada vez.
+    """
+    for _, table_name, columns, rows in iter_parsed_chunks(sql_file_path, workers, chunk_size):
+        yield from ((table_name, columns, row) for row in rows)
 
-        print(f"INSERT {insert_count}: {table_name} - {len(columns)} colunas - tamanho: {len(values_section)} caracteres")
+
+def extract_insert_statements(sql_file_path: str, quiet: bool = False) -> Dict[str, List[tuple]]:
+    """
+    Extrai todos os INSERT statements do arquivo SQL agrupados por tabela.
+    Retorna um dicionário com o nome da tabela, colunas e valores.
+
+    Mantém o texto de todos os VALUES em memória; para dumps grandes prefira
+    `iter_insert_rows`. Com `quiet` não mostra o progresso.
+    """
+    log = _silent if quiet else print
+    inserts = {}
+    sections = {}
+
+    for statement, table_name, columns, rows in iter_value_chunks(sql_file_path):
+        if statement not in sections:
+            sections[statement] = (table_name, columns, [])
+        sections[statement][2].extend(rows)
+
+    insert_count = 0
+    for table_name, columns, rows in sections.values():
+        insert_count += 1
+        values_section = ",\n".join(f"({row})" for row in rows)
+
+        log(f"INSERT {insert_count}: {table_name} - {len(columns)} colunas - tamanho: {len(values_section)} caracteres")
 
         if table_name not in inserts:
             inserts[table_name] = {'columns': columns, 'values': []}
 
         inserts[table_name]['values'].append(values_section)
 
-    print(f"Total de INSERT statements encontrados: {insert_count}")
-    print(f"Tabelas únicas: {list(inserts.keys())}")
+    log(f"Total de INSERT statements encontrados: {insert_count}")
+    log(f"Tabelas únicas: {list(inserts.keys())}")
 
     return inserts
 
@@ -97,68 +411,100 @@ def parse_values(values_str: str) -> List[tuple]:
     Parse a string de VALUES de um INSERT statement.
     Retorna uma lista de tuplas com os valores.
     """
+    return [parse_row(row_str) for row_str in split_values(values_str)]
+
+
+def split_values(values_str: str) -> List[str]:
+    """
+    Separa a string de VALUES (ou um trecho dela que termine num registro
+    completo) no conteúdo bruto de cada registro, sem os parênteses.
+    """
     rows = []
 
-    # Remove espaços extras e quebras de linha
-    values_str = values_str.strip()
+    # Remove espaços extras e garante o ";" final esperado por _ROW_RE
+    values_str = values_str.strip().rstrip(';') + ';'
 
-    # Padrão para extrair cada linha de valores entre parênteses
-    # Considera strings com aspas simples, NULL, números, JSON, etc.
-    pattern = r"\(([^)]*(?:\{[^}]*\}[^)]*)*)\)"
+    row_re = _ROW_RE if '\\' in values_str else _ROW_SIMPLE_RE
+    pos = 0
+    while True:
+        match = row_re.match(values_str, pos)
+        if match is None:
+            break
+        rows.append(match.group(1))
+        pos = match.end()
 
-    matches = re.finditer(pattern, values_str, re.DOTALL)
+    return rows
 
-    for match in matches:
-        row_str = match.group(1)
-        values = []
 
-        # Parse cada valor individual
-        # Precisamos lidar com strings entre aspas, JSON, números, NULL
-        current_value = ""
-        in_string = False
-        in_json = False
-        json_depth = 0
-        escape_next = False
+def parse_row(row_str: str, lazy_json: bool = False) -> tuple:
+    """
+    Parse o conteúdo de um único registro (sem os parênteses externos).
+    Retorna uma tupla com os valores.
 
-        for i, char in enumerate(row_str):
-            if escape_next:
-                current_value += char
-                escape_next = False
-                continue
+    Trabalha sobre trechos inteiros da string (split/findall), sem percorrer
+    o registro caractere por caractere.
 
-            if char == '\\':
-                current_value += char
-                escape_next = True
-                continue
+    Com `lazy_json`, strings JSON viram LazyJSON (decodificadas só quando
+    usadas, ver lazy_json.py).
+    """
+    if '\\' in row_str or "''" in row_str:
+        # Caminho geral: com escapes, todos os campos são separados numa
+        # única chamada de findall
+        return tuple([
+            _decode_literal(literal) if literal else _decode_string(content, lazy_json)
+            for content, literal in _FIELD_RE.findall(row_str)
+        ])
+
+    # Caminho rápido: sem escapes, cada aspa abre ou fecha uma string, então
+    # os trechos de índice ímpar do split são exatamente os valores entre
+    # aspas e os de índice par contêm só vírgulas, NULL e números
+    values = []
+    quoted = False
+    for part in row_str.split("'"):
+        if quoted:
+            values.append(_decode_string(part, lazy_json))
+        elif part != ', ' and part != ',' and part:
+            for literal in part.split(','):
+                literal = literal.strip()
+                if literal:
+                    values.append(_decode_literal(literal))
+        quoted = not quoted
+
+    return tuple(values)
+
+
+def _split_row(row_str: str) -> List[Tuple[str, str]]:
+    """
+    Primeira metade de `parse_row`: separa os campos do registro em pares
+    (conteúdo da string, literal sem aspas), no formato do findall de
+    _FIELD_RE, sem decodificar. Usada quando as etapas são medidas.
+    """
+    if '\\' in row_str or "''" in row_str:
+        return _FIELD_RE.findall(row_str)
 
-            if char == "'" and not in_json:
-                in_string = not in_string
-                current_value += char
-            elif char == '{' and in_string:
-                if json_depth == 0:
-                    in_json = True
-                json_depth += 1
-                current_value += char
-            elif char == '}' and in_json:
-                json_depth -= 1
-                if json_depth == 0:
-                    in_json = False
-                current_value += char
-            elif char == ',' and not in_string and not in_json:
-                # Fim de um valor
-                value = current_value.strip()
-                values.append(parse_single_value(value))
-                current_value = ""
-            else:
-                current_value += char
+    fields = []
+    quoted = False
+    for part in row_str.split("'"):
+        if quoted:
+            fields.append((part, ''))
+        elif part != ', ' and part != ',' and part:
+            for literal in part.split(','):
+                literal = literal.strip()
+                if literal:
+                    fields.append(('', literal))
+        quoted = not quoted
 
-        # Adiciona o último valor
-        if current_value.strip():
-            values.append(parse_single_value(current_value.strip()))
+    return fields
 
-        rows.append(tuple(values))
 
-    return rows
+def _decode_fields(fields: List[Tuple[str, str]], lazy_json: bool = False) -> tuple:
+    """
+    Segunda metade de `parse_row`: decodifica os campos separados por `_split_row`.
+    """
+    return tuple([
+        _decode_literal(literal) if literal else _decode_string(content, lazy_json)
+        for content, literal in fields
+    ])
 
 
 def parse_single_value(value_str: str) -> Any:
@@ -167,25 +513,49 @@ def parse_single_value(value_str: str) -> Any:
     """
     value_str = value_str.strip()
 
-    # NULL
-    if value_str.upper() == 'NULL':
-        return None
-
     # String entre aspas simples
-    if value_str.startswith("'") and value_str.endswith("'"):
-        content = value_str[1:-1]
-        # Remove escapes
-        content = content.replace("\\'", "'")
-        content = content.replace("\\\\", "\\")
+    if len(value_str) >= 2 and value_str.startswith("'") and value_str.endswith("'"):
+        return _decode_string(value_str[1:-1])
+
+    return _decode_literal(value_str)
 
-        # Tenta parsear como JSON se começar com { ou [
-        if content.strip().startswith(('{', '[')):
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                pass
 
-        return content
+def _unescape_match(match) -> str:
+    char = match.group(1)
+    if char is None:
+        # Aspas duplicadas ('') dentro da string
+        return "'"
+    return _ESCAPES.get(char, char)
+
+
+def _decode_string(content: str, lazy_json: bool = False) -> Any:
+    """
+    Decodifica o conteúdo de uma string SQL (já sem as aspas externas).
+    """
+    # Remove escapes (só quando existem, o caso comum não tem nenhum)
+    if '\\' in content or "''" in content:
+        content = _ESCAPE_RE.sub(_unescape_match, content)
+
+    # Tenta parsear como JSON se começar com { ou [ (lstrip só quando há
+    # espaço no início, para não copiar todas as strings)
+    if content.startswith(('{', '[')) or (content[:1].isspace() and content.lstrip().startswith(('{', '['))):
+        if lazy_json:
+            return LazyJSON(content)
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            pass
+
+    return content
+
+
+def _decode_literal(value_str: str) -> Any:
+    """
+    Decodifica um valor sem aspas: NULL, número inteiro ou decimal.
+    """
+    # NULL
+    if value_str.upper() == 'NULL':
+        return None
 
     # Número inteiro
     try:
@@ -202,69 +572,498 @@ def parse_single_value(value_str: str) -> Any:
     return value_str
 
 
-def convert_to_json(sql_file_path: str, output_file_path: str):
-    """
-    Converte o arquivo SQL para JSON.
+# Campos removidos de games e players no documento aninhado
+DROPPED_FIELDS = {'created_at', 'updated_at', 'class_name', 'profile_link'}
+
+
+class GamesDocumentBuilder:
     """
-    print(f"Lendo arquivo SQL: {sql_file_path}")
+    Monta o documento aninhado {"games": [{..., "players": [{..., "settings": {...}}]}]}
+    a partir dos registros das tabelas games, players, game_player e settings.
 
-    # Extrai os INSERT statements
-    inserts = extract_insert_statements(sql_file_path)
+    Os registros podem chegar em qualquer ordem. Cada tabela é indexada em
+    dicionários por game_id/player_id, então o join é uma única passada
+    linear, sem laços aninhados.
 
-    result = {}
+    Valores de settings com o mesmo conteúdo são guardados uma vez só (ver
+    settings_pool.py): players com settings iguais compartilham o objeto.
+    """
 
-    for table_name, table_data in inserts.items():
-        print(f"\nProcessando tabela: {table_name}")
+    def __init__(self, quiet: bool = False):
+        self.games = {}
+        self.players = {}
+        self.game_players = []
+        self.settings = {}
+        self.settings_pool = settings_pool.SettingsPool()
+        self.settings_count = 0
+        self.skipped_links = 0
+        self.player_count = 0
+        self.quiet = quiet
+        self._grouped = None
+
+    def add_record(self, table_name: str, record: Dict[str, Any]):
+        """
+        Registra um registro de uma das tabelas usadas no documento.
+        Registros de outras tabelas são ignorados.
+        """
+        if table_name == 'games':
+            self.games[record['id']] = compact_record(record)
+        elif table_name == 'players':
+            self.players[record['id']] = compact_record(record)
+        elif table_name == 'game_player':
+            self.game_players.append((record['game_id'], record['player_id']))
+        elif table_name == 'settings':
+            key = (record['game_id'], record['player_id'])
+            player_settings = self.settings.get(key)
+            if player_settings is None:
+                player_settings = self.settings[key] = {}
+            player_settings[record['name']] = self.settings_pool.intern(record['value'])
+            self.settings_count += 1
+
+    def _players_by_game(self) -> Dict[str, List[str]]:
+        """
+        Agrupa os player_ids de game_player por game, na ordem original.
+        Relacionamentos com game ou player inexistente são ignorados.
+        Calculado uma vez; `build` e `stream` podem ser chamados várias vezes.
+        """
+        if self._grouped is not None:
+            return self._grouped
+
+        players_by_game = {game_id: [] for game_id in self.games}
+        for game_id, player_id in self.game_players:
+            game_players = players_by_game.get(game_id)
+            if game_players is None or player_id not in self.players:
+                self.skipped_links += 1
+                if not self.quiet:
+                    print(f"  Aviso: game_player aponta para game/player inexistente ({game_id}, {player_id}) - ignorado")
+                continue
+            game_players.append(player_id)
+
+        self.player_count = sum(len(player_ids) for player_ids in players_by_game.values())
+        self._grouped = players_by_game
+        return players_by_game
+
+    def _iter_players(self, game_id: str, player_ids: List[str]) -> Iterator[Dict[str, Any]]:
+        for player_id in player_ids:
+            yield dict(self.players[player_id], settings=self.settings.get((game_id, player_id), {}))
+
+    def build(self) -> Dict[str, Any]:
+        """
+        Faz o join e retorna o documento final.
+        """
+        players_by_game = self._players_by_game()
+        return {'games': [
+            dict(game, players=list(self._iter_players(game_id, players_by_game[game_id])))
+            for game_id, game in self.games.items()
+        ]}
+
+    def stream(self) -> Dict[str, Any]:
+        """
+        Igual a `build`, mas games e players são StreamedList: cada player só
+        é montado na hora de ser gravado por json_stream.write_json.
+        """
+        players_by_game = self._players_by_game()
+        return {'games': StreamedList(
+            dict(game, players=StreamedList(self._iter_players(game_id, players_by_game[game_id])))
+            for game_id, game in self.games.items()
+        )}
+
+
+def compact_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Remove os campos não usados pelo frontend e junta `image` no `id`
+    (o id passa a incluir a extensão da imagem, ex: "uuid.png").
+    """
+    compact = {key: value for key, value in record.items() if key not in DROPPED_FIELDS}
+    image = compact.pop('image', None)
+    if image:
+        compact['id'] = image
+    return compact
 
-        columns = table_data['columns']
-        print(f"  Colunas encontradas: {len(columns)} - {', '.join(columns)}")
 
-        # Parse todos os valores
-        all_rows = []
-        for values_section in table_data['values']:
-            rows = parse_values(values_section)
-            all_rows.extend(rows)
+def select_rows(table_name: str, columns: List[str], rows: List[tuple],
+                setting_names: Optional[Set[str]] = None) -> List[tuple]:
+    """
+    Registros de um bloco parseado com `lazy_json`: descarta os settings cujo
+    `name` não está em `setting_names` (sem decodificar o valor) e
+    decodifica os LazyJSON dos que ficam. Registros com quantidade errada de
+    colunas passam como vieram.
+    """
+    if table_name == 'settings' and setting_names is not None and 'name' in columns:
+        name_idx = columns.index('name')
+        size = len(columns)
+        rows = [row for row in rows if len(row) != size or row[name_idx] in setting_names]
+    return [resolve_row(row) for row in rows]
 
-        print(f"  Registros encontrados: {len(all_rows)}")
 
-        # Converte para lista de dicionários
-        table_records = []
-        for row in all_rows:
+def build_document(sql_file_path: str, workers: int = 1, use_cache: bool = True, quiet: bool = False,
+                   setting_names: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """
+    Monta o documento aninhado em memória, sem gravar arquivo.
+    Registros com quantidade errada de colunas são ignorados.
+
+    Com `setting_names`, só os settings com esses nomes entram no documento
+    e os valores dos outros nem são decodificados.
+    """
+    builder = GamesDocumentBuilder(quiet)
+    lazy = setting_names is not None
+    for _, table_name, columns, rows in iter_table_chunks(sql_file_path, workers, use_cache, quiet=quiet,
+                                                          lazy_json=lazy):
+        if lazy:
+            rows = select_rows(table_name, columns, rows, setting_names)
+        for row in rows:
             if len(row) == len(columns):
-                row_dict = dict(zip(columns, row))
-                table_records.append(row_dict)
+                builder.add_record(table_name, dict(zip(columns, row)))
+    return builder.build()
+
+
+def convert_to_json(sql_file_path: str, output_file_path: str, workers: int = 1, flat: bool = False,
+                    use_cache: bool = True, incremental_mode: bool = False, output_format: str = 'json',
+                    snapshot_path: Optional[str] = None, quiet: bool = False,
+                    stats: Optional[ConversionStats] = None, compact: bool = False,
+                    shards_dir: Optional[str] = None, gzip_output: bool = False,
+                    sqlite_path: Optional[str] = None, pipelined: bool = False,
+                    setting_names: Optional[Set[str]] = None, tables: Optional[Set[str]] = None,
+                    games: Optional[Set[str]] = None):
+    """
+    Converte o arquivo SQL para JSON.
+    Com `workers` > 1 os registros são parseados em paralelo e com
+    `use_cache` os registros parseados são lidos/gravados no cache em disco.
+
+    Com `incremental_mode` também grava os hashes dos registros e, se houver
+    hashes da conversão anterior, o conjunto de mudanças (ver incremental.py).
+
+    `output_format='dict'` grava o documento aninhado no formato compacto com
+    dicionários de chaves e valores (ver dict_encoding.py), e
+    `output_format='pool'` grava cada objeto de settings distinto uma vez,
+    com os players apontando para ele pelo hash (ver settings_pool.py).
+
+    Por padrão gera o documento aninhado games → players → settings; com
+    `flat=True` gera uma lista de registros por tabela, sem join.
+
+    O JSON comum é gravado em streaming (ver json_stream.py): cada player é
+    montado e gravado na hora, e no modo flat os registros de cada tabela
+    ficam num arquivo temporário até a gravação, então a saída nunca fica
+    inteira em memória. O formato 'dict' e o snapshot precisam do documento
+    completo e continuam montando-o. Com `compact` o JSON sai sem espaços
+    nem indentação.
+
+    Com `shards_dir` também grava um arquivo por game e o manifest.json
+    nesse diretório (ver shards.py). Com `gzip_output` também grava uma
+    cópia comprimida da saída em `output_file_path` + '.gz'.
+
+    Com `sqlite_path` os registros também são carregados, durante a mesma
+    leitura, num banco SQLite (ver sqlite_export.py).
+
+    O dump pode estar comprimido com gzip, bz2 ou xz.
+
+    Com `pipelined`, leitura, tokenização e parse rodam em threads ligadas
+    por filas limitadas, em paralelo com o join no processo principal, e o
+    JSON é gravado no arquivo por outra thread (ver pipeline.py).
+
+    Filtros (ver dump_index.py): com `tables`, só os INSERTs dessas tabelas
+    são lidos; com `games` (ids ou nomes), só os registros desses games e
+    dos players ligados a eles; com `setting_names` (ex: {'mouse_settings'}),
+    só os settings com esses nomes. Os INSERTs de fora são pulados pelo
+    índice do dump e os registros de fora são descartados antes do parse.
+    Com `games` e `shards_dir`, os shards dos outros games continuam no
+    manifest.
+
+    Com `quiet` não mostra progresso nem avisos por registro (os registros
+    ignorados continuam contados em `stats`). Com `stats`, mede cada etapa
+    (ver conversion_stats.py).
+    """
+    if flat and output_format in ('dict', 'pool'):
+        raise ValueError(f"O formato {output_format!r} exige o documento aninhado (não use flat)")
+    if flat and shards_dir:
+        raise ValueError("A saída por game exige o documento aninhado (não use flat)")
+    if not flat and tables is not None and 'games' not in tables:
+        raise ValueError("O documento aninhado exige a tabela games em `tables`")
+
+    log = _silent if quiet else print
+    log(f"Lendo arquivo SQL: {sql_file_path}")
+
+    if stats is not None:
+        stats.info.update(sql_file=sql_file_path, output_file=output_file_path, workers=workers,
+                          compression=compressed.detect_compression(sql_file_path), pipelined=pipelined,
+                          setting_names=sorted(setting_names) if setting_names is not None else None,
+                          tables=sorted(tables) if tables is not None else None,
+                          games=sorted(games) if games is not None else None)
+        stats.count('input_bytes', os.path.getsize(sql_file_path))
+
+    pushdown = None
+    if tables is not None or games is not None or setting_names is not None:
+        # dump_index importa este módulo: importado só aqui para não criar um ciclo
+        import dump_index
+        index = dump_index.load_index(sql_file_path, use_cache, quiet)
+        pushdown = dump_index.Pushdown(sql_file_path, index, tables, games, setting_names)
+
+    builder = None if flat else GamesDocumentBuilder(quiet)
+    # O hash cobre só os campos que aparecem na saída
+    hashes = incremental.RecordHashes(frozenset() if flat else DROPPED_FIELDS) if incremental_mode else None
+    exporter = sqlite_export.SQLiteExporter(sqlite_path) if sqlite_path else None
+    # Modo flat: registros de cada tabela em arquivo temporário (pickle por bloco)
+    spills = {}
+    found = {}
+    valid = {}
+    current_statement = None
+
+    # Lê e converte os registros em streaming, sem carregar o arquivo inteiro
+    # Com --pipeline, fecha os estágios mesmo se a conversão falhar no meio
+    with closing(iter_table_chunks(sql_file_path, workers, use_cache, stats, quiet, pipelined,
+                                   pushdown=pushdown)) as chunks:
+        for statement, table_name, columns, rows in chunks:
+            if table_name not in found:
+                log(f"\nProcessando tabela: {table_name}")
+                log(f"  Colunas encontradas: {len(columns)} - {', '.join(columns)}")
+                if builder is None:
+                    spills[table_name] = tempfile.TemporaryFile()
+                found[table_name] = 0
+                valid[table_name] = 0
+
+            if statement != current_statement:
+                current_statement = statement
+                log(f"  INSERT {statement + 1}: {table_name}")
+
+            found[table_name] += len(rows)
+
+            # Converte para dicionários
+            with _stage(stats, 'join'):
+                records = []
+                for row in rows:
+                    if len(row) == len(columns):
+                        records.append(dict(zip(columns, row)))
+                    else:
+                        log(f"  Aviso: Linha com {len(row)} valores mas esperava {len(columns)} colunas - ignorada")
+
+                if builder is None:
+                    pickle.dump(records, spills[table_name], pickle.HIGHEST_PROTOCOL)
+                else:
+                    for record in records:
+                        builder.add_record(table_name, record)
+
+            if hashes is not None:
+                with _stage(stats, 'hash'):
+                    for record in records:
+                        hashes.add_record(table_name, record)
+
+            if exporter is not None:
+                with _stage(stats, 'sqlite'):
+                    exporter.add_rows(table_name, columns, rows)
+
+            valid[table_name] += len(records)
+            if stats is not None:
+                stats.count('rows', len(rows), table_name)
+                stats.count('rows_skipped', len(rows) - len(records), table_name)
+
+    for table_name in found:
+        log(f"\n{table_name}: {found[table_name]} registros encontrados, {valid[table_name]} válidos")
+    if pushdown is not None:
+        log("\nRegistros fora dos filtros (não parseados):")
+        for table_name, count in pushdown.filtered.items():
+            log(f"  {table_name}: {count}")
+            if stats is not None:
+                stats.count('rows_filtered', count, table_name)
+
+    if exporter is not None:
+        log(f"\nCriando índices do banco SQLite: {sqlite_path}")
+        with _stage(stats, 'sqlite'):
+            exporter.close()
+
+    # Com streaming, os players são montados durante a gravação (o tempo
+    # desse join entra em serialize)
+    if builder is None:
+        result = {table_name: StreamedList(_iter_spill(spill), chunked=True) for table_name, spill in spills.items()}
+    else:
+        log("\nMontando estrutura games → players → settings")
+        with _stage(stats, 'join'):
+            if output_format in ('dict', 'pool') or snapshot_path:
+                result = builder.build()
             else:
-                print(f"  Aviso: Linha com {len(row)} valores mas esperava {len(columns)} colunas - ignorada")
-
-        result[table_name] = table_records
-        print(f"  Registros válidos: {len(table_records)}")
+                result = builder.stream()
+        if stats is not None:
+            stats.count('links_skipped', builder.skipped_links)
+            stats.count('settings_unique', builder.settings_pool.unique)
 
     # Salva o JSON
-    print(f"\nSalvando JSON em: {output_file_path}")
-    with open(output_file_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
-
-    print("Conversão concluída!")
+    log(f"\nSalvando JSON em: {output_file_path}")
+    try:
+        with _stage(stats, 'serialize'):
+            if output_format == 'dict':
+                dict_encoding.write_encoded(result, output_file_path)
+            else:
+                document = settings_pool.encode_document(result) if output_format == 'pool' else result
+                with open(output_file_path, 'w', encoding='utf-8') as f:
+                    if pipelined:
+                        with pipeline.ThreadedWriter(f) as writer:
+                            write_json(document, writer, compact)
+                    else:
+                        write_json(document, f, compact)
+    finally:
+        for spill in spills.values():
+            spill.close()
+
+    if gzip_output:
+        with _stage(stats, 'serialize'):
+            gz_path = compressed.write_gzip_copy(output_file_path)
+        log(f"Cópia comprimida: {gz_path} ({os.path.getsize(gz_path):,} bytes)")
+
+    if snapshot_path:
+        log(f"Salvando snapshot em: {snapshot_path}")
+        with _stage(stats, 'serialize'):
+            snapshot.write_snapshot(result, snapshot_path)
+
+    if shards_dir:
+        log(f"Salvando um arquivo por game em: {shards_dir}")
+        with _stage(stats, 'serialize'):
+            # O documento em streaming já foi consumido: gera outro
+            sharded = result if isinstance(result['games'], list) else builder.stream()
+            manifest = shards.write_shards(sharded, shards_dir, compact, merge=games is not None)
+        log(f"  {len(manifest['games'])} games, manifest em {os.path.join(shards_dir, shards.MANIFEST_NAME)}")
+
+    if hashes is not None:
+        with _stage(stats, 'hash'):
+            changes = incremental.write_changes(output_file_path, hashes)
+        if changes is None:
+            log(f"Hashes salvos em: {incremental.hashes_path(output_file_path)} (primeira conversão incremental)")
+        else:
+            log(f"Mudanças salvas em: {incremental.changes_path(output_file_path)}")
+            for table_name, table_changes in changes.items():
+                log(f"  {table_name}: {len(table_changes['added'])} adicionados, "
+                    f"{len(table_changes['removed'])} removidos, {len(table_changes['modified'])} modificados")
+
+    if stats is not None:
+        stats.count('output_bytes', os.path.getsize(output_file_path))
+        stats.finish()
+
+    log("Conversão concluída!")
 
     # Mostra um resumo
-    print("\n=== RESUMO ===")
-    for table_name, data in result.items():
-        print(f"{table_name}: {len(data)} registros")
+    log("\n=== RESUMO ===")
+    if builder is None:
+        for table_name in found:
+            log(f"{table_name}: {valid[table_name]} registros")
+    else:
+        log(f"games: {len(builder.games)}")
+        log(f"players: {builder.player_count}")
+        pool = builder.settings_pool
+        log(f"settings: {builder.settings_count} ({pool.unique} objetos distintos, dedup {pool.ratio:.2f}x)")
+
+
+def _iter_spill(spill) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Relê os blocos de registros gravados no arquivo temporário do modo flat.
+    """
+    spill.seek(0)
+    while True:
+        try:
+            yield pickle.load(spill)
+        except EOFError:
+            return
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
 
-    # Caminho do arquivo SQL
-    sql_file = "/Users/glaucomendes/Downloads/bdprosettings.sql"
+    # Importado aqui: dump_index importa este módulo
+    import dump_index
 
+    parser = argparse.ArgumentParser(description="Converte um dump SQL para JSON.")
+    # Caminho do arquivo SQL
+    parser.add_argument('sql_file', nargs='?', default="/Users/glaucomendes/Downloads/bdprosettings.sql",
+                        help="arquivo SQL de entrada (pode estar comprimido com gzip, bz2 ou xz)")
     # Caminho do arquivo JSON de saída
-    output_file = "prosettings_data.json"
-
-    if len(sys.argv) > 1:
-        sql_file = sys.argv[1]
+    parser.add_argument('output_file', nargs='?', default="prosettings_data.json",
+                        help="arquivo JSON de saída")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processos usados para parsear os registros (padrão: 1)")
+    parser.add_argument('--flat', action='store_true',
+                        help="gera uma lista de registros por tabela em vez do documento aninhado")
+    parser.add_argument('--format', choices=('json', 'dict', 'pool'), default='json',
+                        help="json: documento aninhado comum; dict: formato compacto com dicionários; "
+                             "pool: cada objeto de settings distinto uma vez, referenciado por hash")
+    parser.add_argument('--compact', action='store_true',
+                        help="grava o JSON sem espaços nem indentação")
+    parser.add_argument('--gzip', action='store_true',
+                        help="também grava a saída comprimida em OUTPUT_FILE.gz")
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help="também grava o snapshot binário com índice por game e player")
+    parser.add_argument('--shards', metavar='DIR',
+                        help="também grava um JSON por game e um manifest.json em DIR")
+    parser.add_argument('--sqlite', metavar='PATH',
+                        help="também carrega os registros num banco SQLite com índices")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="não lê nem grava o cache de registros parseados")
+    parser.add_argument('--tables', metavar='TABELAS',
+                        help="só lê os INSERTs destas tabelas, separadas por vírgula (usa o índice do dump)")
+    parser.add_argument('--games', metavar='GAMES',
+                        help="só inclui estes games (ids, com ou sem .png, ou nomes, separados por vírgula) "
+                             "e os players e settings deles")
+    parser.add_argument('--setting-names', metavar='NOMES',
+                        help="só inclui os settings com estes nomes, separados por vírgula "
+                             "(ex: mouse_settings,crosshair); os outros nem são parseados")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="lê, tokeniza, parseia e grava em estágios paralelos ligados por filas limitadas")
+    parser.add_argument('--incremental', action='store_true',
+                        help="compara com a conversão anterior e grava os registros que mudaram")
+    parser.add_argument('--quiet', action='store_true',
+                        help="não mostra o progresso por tabela e por INSERT")
+    parser.add_argument('--stats', action='store_true',
+                        help="mostra o tempo de cada etapa no fim da conversão")
+    parser.add_argument('--stats-json', metavar='PATH',
+                        help="grava as métricas da conversão em JSON")
+    parser.add_argument('--profile-stage', choices=STAGES,
+                        help="roda a etapa escolhida sob profiling")
+    parser.add_argument('--profile', choices=PROFILE_MODES, default='cprofile',
+                        help="profiler usado com --profile-stage (padrão: cprofile)")
+    parser.add_argument('--profile-output', metavar='PATH',
+                        help="grava o profile do cProfile em PATH em vez de mostrá-lo")
+    args = parser.parse_args()
+
+    if args.flat and args.format != 'json':
+        parser.error(f"--format {args.format} não pode ser usado com --flat")
+    if args.flat and args.snapshot:
+        parser.error("--snapshot não pode ser usado com --flat")
+    if args.flat and args.shards:
+        parser.error("--shards não pode ser usado com --flat")
+    if args.compact and args.format == 'dict':
+        parser.error("--compact não se aplica a --format dict (que já é compacto)")
+    if args.profile_stage in ('row-parse', 'value-decode') and args.workers > 1:
+        parser.error(f"--profile-stage {args.profile_stage} roda nos processos do pool; use --workers 1")
+    if args.pipeline and args.profile_stage:
+        parser.error("--profile-stage não pode ser usado com --pipeline (as etapas rodam em threads)")
+    if args.incremental and (args.tables or args.games or args.setting_names):
+        parser.error("--incremental compara a conversão completa; não use com --tables, --games ou --setting-names")
+    if args.tables and not args.flat and 'games' not in args.tables.split(','):
+        parser.error("o documento aninhado exige a tabela games em --tables (ou use --flat)")
+    if args.profile_output and args.profile != 'cprofile':
+        parser.error("--profile-output só funciona com --profile cprofile")
+
+    stats = None
+    if args.stats or args.stats_json or args.profile_stage:
+        stats = ConversionStats(args.profile_stage, args.profile)
 
-    if len(sys.argv) > 2:
-        output_file = sys.argv[2]
-
-    convert_to_json(sql_file, output_file)
+    try:
+        convert_to_json(args.sql_file, args.output_file, workers=args.workers, flat=args.flat,
+                        use_cache=not args.no_cache, incremental_mode=args.incremental,
+                        output_format=args.format, snapshot_path=args.snapshot,
+                        quiet=args.quiet, stats=stats, compact=args.compact,
+                        shards_dir=args.shards, gzip_output=args.gzip, sqlite_path=args.sqlite,
+                        pipelined=args.pipeline,
+                        setting_names=set(args.setting_names.split(',')) if args.setting_names else None,
+                        tables=set(args.tables.split(',')) if args.tables else None,
+                        games=set(args.games.split(',')) if args.games else None)
+    except dump_index.UnknownGamesError as e:
+        parser.error(str(e))
+
+    if stats is not None:
+        if args.stats:
+            stats.report()
+        if args.stats_json:
+            stats.write_json(args.stats_json)
+        if args.profile_stage:
+            if args.profile_output:
+                stats.save_profile(args.profile_output)
+            else:
+                print(f"\n=== PROFILE ({args.profile_stage}, {args.profile}) ===")
+                print(stats.profile_report())
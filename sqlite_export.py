@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Exportação dos registros do dump para um banco SQLite, para consultas
+ad-hoc sobre players e settings:
+
+    python sql_to_json.py dump.sql prosettings.json --sqlite prosettings.db
+
+    sqlite3 prosettings.db "
+      SELECT p.name, json_extract(s.value, '$.dpi') AS dpi
+      FROM settings s JOIN players p ON p.id = s.player_id
+      WHERE s.name = 'mouse_settings' AND json_extract(s.value, '$.dpi') = '800'"
+
+Cada tabela do dump vira uma tabela com as mesmas colunas. A coluna `value`
+é gravada como texto JSON (funciona com as funções json_* do SQLite); os
+outros valores são gravados como vieram do parser.
+
+A carga usa executemany por bloco de registros dentro de transações
+grandes, com journal WAL e synchronous=OFF. Os índices (id de games e
+players, game_id e player_id de game_player e settings, e settings.name)
+são criados no fim, depois da carga. O banco é montado num arquivo
+temporário e só substitui o anterior quando completo.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List
+
+
+# Colunas gravadas como texto JSON
+JSON_COLUMNS = {'value'}
+
+# Colunas indexadas por tabela; outras tabelas recebem índice em game_id e
+# player_id quando têm essas colunas
+INDEXES = {
+    'games': ('id',),
+    'players': ('id',),
+    'game_player': ('game_id', 'player_id'),
+    'settings': ('game_id', 'player_id', 'name'),
+}
+DEFAULT_INDEXES = ('game_id', 'player_id')
+
+# Registros por transação
+COMMIT_ROWS = 500_000
+
+# Cache de páginas durante a carga e a criação dos índices (KB)
+CACHE_KB = 256 * 1024
+
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_sql(value: Any) -> Any:
+    # Valores que o sqlite3 não aceita direto (ex: JSON parseado fora de `value`)
+    if isinstance(value, (dict, list)):
+        return _JSON_ENCODER.encode(value)
+    return value
+
+
+class SQLiteExporter:
+    """
+    Recebe os registros em blocos (`add_rows`) e grava no banco; `close`
+    cria os índices e publica o arquivo.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.tmp_path = db_path + '.tmp'
+        for path in (self.tmp_path, self.tmp_path + '-wal', self.tmp_path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.connection = sqlite3.connect(self.tmp_path, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=OFF')
+        self.connection.execute(f'PRAGMA cache_size=-{CACHE_KB}')
+        self.connection.execute('PRAGMA temp_store=MEMORY')
+        self.connection.execute('BEGIN')
+
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self.row_counts: Dict[str, int] = {}
+        self._pending = 0
+
+    def _create_table(self, table_name: str, columns: List[str]) -> Dict[str, Any]:
+        column_defs = ', '.join(_quote(column) for column in columns)
+        self.connection.execute(f"CREATE TABLE {_quote(table_name)} ({column_defs})")
+        placeholders = ', '.join('?' * len(columns))
+        table = {
+            'columns': columns,
+            'insert': f"INSERT INTO {_quote(table_name)} VALUES ({placeholders})",
+            'json_indexes': [index for index, column in enumerate(columns) if column in JSON_COLUMNS],
+        }
+        self.tables[table_name] = table
+        self.row_counts[table_name] = 0
+        return table
+
+    def add_rows(self, table_name: str, columns: List[str], rows: List[tuple]):
+        """
+        Grava um bloco de registros (tuplas na ordem de `columns`).
+        Registros com quantidade errada de colunas são ignorados.
+        """
+        table = self.tables.get(table_name) or self._create_table(table_name, columns)
+        if columns != table['columns']:
+            raise ValueError(f"INSERT de {table_name} com colunas diferentes do primeiro INSERT")
+
+        size = len(columns)
+        json_indexes = table['json_indexes']
+        encode = _JSON_ENCODER.encode
+        if len(json_indexes) == 1:
+            # Caso comum (settings.value): remonta a tupla por fatias
+            index = json_indexes[0]
+            rows = [row[:index] + (encode(row[index]),) + row[index + 1:] for row in rows if len(row) == size]
+        elif json_indexes:
+            converted = []
+            for row in rows:
+                if len(row) != size:
+                    continue
+                row = list(row)
+                for index in json_indexes:
+                    row[index] = encode(row[index])
+                converted.append(row)
+            rows = converted
+        else:
+            rows = [row for row in rows if len(row) == size]
+
+        try:
+            self.connection.executemany(table['insert'], rows)
+        except (sqlite3.InterfaceError, sqlite3.ProgrammingError):
+            # Algum valor fora das colunas JSON veio parseado como JSON
+            self.connection.executemany(table['insert'], [[_to_sql(value) for value in row] for row in rows])
+
+        self.row_counts[table_name] += len(rows)
+        self._pending += len(rows)
+        if self._pending >= COMMIT_ROWS:
+            self.connection.execute('COMMIT')
+            self.connection.execute('BEGIN')
+            self._pending = 0
+
+    def close(self):
+        """
+        Finaliza a carga, cria os índices e substitui o banco anterior.
+        """
+        self.connection.execute('COMMIT')
+
+        for table_name, table in self.tables.items():
+            indexed = INDEXES.get(table_name, DEFAULT_INDEXES)
+            for column in (column for column in indexed if column in table['columns']):
+                self.connection.execute(
+                    f"CREATE INDEX {_quote(f'idx_{table_name}_{column}')} "
+                    f"ON {_quote(table_name)} ({_quote(column)})"
+                )
+
+        self.connection.execute('ANALYZE')
+        # Volta ao journal comum: o banco publicado é um único arquivo
+        self.connection.execute('PRAGMA journal_mode=DELETE')
+        self.connection.close()
+        os.replace(self.tmp_path, self.db_path)
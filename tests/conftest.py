@@ -0,0 +1,98 @@
+import json
+import os
+import random
+import sys
+
+import pytest
+
+# Os scripts ficam na raiz do repositório, sem pacote
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generate_dump  # noqa: E402
+
+
+TIMESTAMP = '2024-11-21 20:21:28'
+
+GAME_COLUMNS = ['id', 'name', 'class_name', 'image', 'created_at', 'updated_at']
+PLAYER_COLUMNS = ['id', 'name', 'profile_link', 'team', 'image', 'created_at', 'updated_at']
+LINK_COLUMNS = ['id', 'game_id', 'player_id', 'created_at', 'updated_at']
+SETTING_COLUMNS = ['id', 'game_id', 'player_id', 'name', 'value', 'created_at', 'updated_at']
+
+
+def _id(prefix: str, n: int) -> str:
+    return f"{prefix}{n:07d}-0000-4000-8000-000000000000"
+
+
+def sample_tables():
+    """
+    Tabelas pequenas com os casos difíceis do generate_dump.py (aspas, barras,
+    parênteses e ponto-e-vírgula nos nomes, NULL, aspas duplas no JSON), como
+    listas de dicts coluna → valor. Cada chamada devolve uma cópia nova.
+    """
+    games = [
+        {'id': _id('a', n), 'name': name, 'class_name': name.lower().replace(' ', ''),
+         'image': f"{_id('a', n)}.png", 'created_at': TIMESTAMP, 'updated_at': TIMESTAMP}
+        for n, name in enumerate(['CS2', 'Valorant', 'Call of Duty: Warzone'])
+    ]
+    names = ["O'Neil", 'semi;colon (x)', 'back\\slash', "d'Arc''s", 'Zé Ninguém', 'plain']
+    teams = ["Dragon's Lair", 'NAVI (Academy)', None, '', 'G2, Esports', 'MIBR']
+    players = [
+        {'id': _id('b', n), 'name': name, 'profile_link': f"https://prosettings.net/players/{name.lower()}/",
+         'team': team, 'image': f"{_id('b', n)}.png", 'created_at': TIMESTAMP, 'updated_at': TIMESTAMP}
+        for n, (name, team) in enumerate(zip(names, teams))
+    ]
+    # O último player fica em dois games
+    pairs = [(0, 0), (0, 1), (1, 2), (1, 3), (2, 4), (0, 5), (1, 5)]
+    links = [
+        {'id': _id('c', n), 'game_id': games[g]['id'], 'player_id': players[p]['id'],
+         'created_at': TIMESTAMP, 'updated_at': TIMESTAMP}
+        for n, (g, p) in enumerate(pairs)
+    ]
+    settings = []
+    for g, p in pairs:
+        for name, value in (
+            ('mouse_settings', {'dpi': str(400 * (p + 1)), 'hz': '1000', 'sensitivity': f"{0.3 + p / 10:.2f}"}),
+            ('crosshair_settings', {'code': 'CSGO-"quoted"-\\path', 'style': "it's (4); ok"}),
+        ):
+            settings.append({'id': _id('d', len(settings)), 'game_id': games[g]['id'],
+                             'player_id': players[p]['id'], 'name': name, 'value': value,
+                             'created_at': TIMESTAMP, 'updated_at': TIMESTAMP})
+    return {'games': games, 'game_player': links, 'players': players, 'settings': settings}
+
+
+def _sql_value(value, rng: random.Random) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, dict):
+        value = json.dumps(value, ensure_ascii=False)
+    return generate_dump.sql_string(value, rng)
+
+
+def write_dump(path: str, tables, rows_per_insert: int = 3, seed: int = 7) -> str:
+    """
+    Grava `tables` (ver sample_tables) como dump do HeidiSQL, com os mesmos
+    INSERTs do generate_dump.py, e retorna o caminho.
+    """
+    rng = random.Random(seed)
+    columns_by_table = {'games': GAME_COLUMNS, 'game_player': LINK_COLUMNS,
+                        'players': PLAYER_COLUMNS, 'settings': SETTING_COLUMNS}
+    previous, generate_dump.ROWS_PER_INSERT = generate_dump.ROWS_PER_INSERT, rows_per_insert
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("/*!40101 SET NAMES utf8 */;\n\n")
+            for table, rows in tables.items():
+                columns = columns_by_table[table]
+                generate_dump._create_table(f, table, columns)
+                writer = generate_dump._InsertWriter(f, table, columns)
+                for row in rows:
+                    writer.add([_sql_value(row[column], rng) for column in columns])
+                writer.close()
+    finally:
+        generate_dump.ROWS_PER_INSERT = previous
+    return path
+
+
+@pytest.fixture
+def sample_dump(tmp_path):
+    return write_dump(str(tmp_path / 'dump.sql'), sample_tables())
@@ -0,0 +1,79 @@
+import math
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import analytics
+
+
+def _player(mouse):
+    return {'settings': {'mouse_settings': mouse}}
+
+
+def test_to_float_strips_percent_units_and_separators():
+    assert analytics._to_float('6.0%') == pytest.approx(0.06)
+    assert analytics._to_float('1,600') == 1600
+    assert analytics._to_float('1000 Hz') == 1000
+    assert analytics._to_float('800DPI') == 800
+    assert analytics._to_float('0.35') == 0.35
+    assert math.isnan(analytics._to_float('Unknown'))
+    assert math.isnan(analytics._to_float(''))
+    assert math.isnan(analytics._to_float(None))
+
+
+def test_percent_valued_game_has_samples():
+    document = {'games': [{
+        'name': 'Fortnite',
+        'players': [
+            _player({'dpi': '800', 'hz': '1000', 'x-axis_sensitivity': '6.0%'}),
+            _player({'dpi': '1,600', 'hz': '1000 Hz', 'x-axis_sensitivity': '5.5%'}),
+            _player({'dpi': '400', 'hz': '1000', 'x-axis_sensitivity': 'Unknown'}),
+        ],
+    }]}
+
+    stats = analytics.compute_stats(analytics.extract_columns(document))['Fortnite']
+
+    assert stats['dpi']['count'] == 3
+    assert stats['sensitivity']['count'] == 2
+    assert stats['edpi']['count'] == 2
+    assert stats['edpi']['mean'] == pytest.approx((800 * 0.06 + 1600 * 0.055) / 2)
+
+
+def test_unparseable_sensitivity_falls_back_to_next_key():
+    document = {'games': [{
+        'name': 'Game',
+        'players': [_player({'dpi': '800', 'sensitivity': 'Unknown', 'ow_sensitivity': '4.5'})],
+    }]}
+
+    columns = analytics.extract_columns(document)
+
+    assert columns.sensitivity[0] == 4.5
+    assert columns.edpi[0] == 3600
+
+
+def test_extract_columns_million_rows_in_bulk():
+    import random
+    import time
+
+    rng = random.Random(7)
+    sensitivities = ['Unknown', '6.5%', '0.35'] + [f"{rng.uniform(0.1, 3.5):.3f}" for _ in range(2000)]
+    players = [_player({'dpi': rng.choice(['400', '800', '1,600', 'Unknown']),
+                        'hz': rng.choice(['1000', '500', '1000 Hz', 'Unknown']),
+                        'sensitivity': rng.choice(sensitivities)})
+               for _ in range(5000)]
+    # Os mesmos players repetidos: 1M registros sem montar 1M de dicts
+    document = {'games': [{'name': f'game {i}', 'players': players * 20} for i in range(10)]}
+
+    start = time.perf_counter()
+    columns = analytics.extract_columns(document)
+    elapsed = time.perf_counter() - start
+
+    assert len(columns) == 1_000_000
+    expected = np.array([[analytics._to_float(player['settings']['mouse_settings'][field]) for player in players]
+                         for field in ('dpi', 'hz', 'sensitivity')])
+    for row, field in enumerate(('dpi', 'hz', 'sensitivity')):
+        np.testing.assert_array_equal(columns.column(field)[:5000], expected[row])
+        np.testing.assert_array_equal(columns.column(field)[-5000:], expected[row])
+    # A passada pelo documento é Python; a conversão não pode ser por valor
+    assert elapsed < 8, f"extract_columns levou {elapsed:.1f} s para 1M players"
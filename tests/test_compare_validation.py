@@ -0,0 +1,48 @@
+import json
+
+from compare_validation import diff_trees, extract_json_data, extract_sql_data
+from sql_to_json import build_document
+
+
+def _tree(document, tmp_path):
+    path = tmp_path / 'saida.json'
+    path.write_text(json.dumps(document, ensure_ascii=False, indent=2), encoding='utf-8')
+    return extract_json_data(str(path))['tree']
+
+
+def test_identical_conversion_has_no_differences(sample_dump, tmp_path):
+    sql_tree = extract_sql_data(sample_dump, use_cache=False)['tree']
+    json_tree = _tree(build_document(sample_dump, use_cache=False, quiet=True), tmp_path)
+
+    differences, visited = diff_trees(sql_tree, json_tree)
+    assert differences == []
+    # Raízes iguais: a comparação para no primeiro nó
+    assert visited == 1
+
+
+def test_diff_trees_finds_changed_records(sample_dump, tmp_path):
+    sql_tree = extract_sql_data(sample_dump, use_cache=False)['tree']
+    document = build_document(sample_dump, use_cache=False, quiet=True)
+    cs2, valorant = document['games'][0], document['games'][1]
+
+    # Um setting alterado, um player com outro time, um player removido e um setting a mais
+    old_mouse = dict(cs2['players'][0]['settings']['mouse_settings'])
+    cs2['players'][0]['settings']['mouse_settings'] = dict(old_mouse, dpi='401')
+    old_player = {key: value for key, value in valorant['players'][0].items() if key != 'settings'}
+    valorant['players'][0]['team'] = 'Outro Time'
+    removed = valorant['players'].pop(1)
+    cs2['players'][1]['settings']['extra_settings'] = {'a': '1'}
+
+    differences, visited = diff_trees(sql_tree, _tree(document, tmp_path))
+
+    assert sorted(differences, key=repr) == sorted([
+        (('CS2', "O'Neil", 'mouse_settings'), 'registro diferente',
+         old_mouse, cs2['players'][0]['settings']['mouse_settings']),
+        (('Valorant', 'back\\slash'), 'registro diferente',
+         old_player, dict(old_player, team='Outro Time')),
+        (('Valorant', "d'Arc''s"), 'só no SQL',
+         {key: value for key, value in removed.items() if key != 'settings'}, None),
+        (('CS2', 'semi;colon (x)', 'extra_settings'), 'só no JSON', None, {'a': '1'}),
+    ], key=repr)
+    # O game sem mudanças não é percorrido
+    assert visited < sql_tree.size()
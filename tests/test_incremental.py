@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+from conftest import sample_tables, write_dump
+
+import incremental
+from sql_to_json import convert_to_json
+
+
+def _changes(tmp_path, flat, edit):
+    output = str(tmp_path / 'saida.json')
+    for tables in (sample_tables(), edit(sample_tables())):
+        dump = write_dump(str(tmp_path / 'dump.sql'), tables)
+        convert_to_json(dump, output, flat=flat, use_cache=False, incremental_mode=True, quiet=True)
+    with open(incremental.changes_path(output), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _touch_player(tables):
+    # Só a data de atualização muda
+    tables['players'][1]['updated_at'] = '2025-01-01 00:00:00'
+    return tables
+
+
+def _rename_player(tables):
+    tables['players'][1]['name'] = 'outro nome'
+    return tables
+
+
+@pytest.mark.parametrize('flat, edit, modified', [
+    (True, _touch_player, ['b0000001-0000-4000-8000-000000000000']),
+    (False, _touch_player, []),
+    (False, _rename_player, ['b0000001-0000-4000-8000-000000000000']),
+])
+def test_changes_cover_fields_in_output(tmp_path, flat, edit, modified):
+    changes = _changes(tmp_path, flat, edit)
+
+    assert changes['players'] == {'added': [], 'removed': [], 'modified': modified}
+    for table_name in ('games', 'game_player', 'settings'):
+        assert changes[table_name] == {'added': [], 'removed': [], 'modified': []}
+
+
+def test_switching_layout_starts_over(tmp_path):
+    output = str(tmp_path / 'saida.json')
+    dump = write_dump(str(tmp_path / 'dump.sql'), sample_tables())
+    convert_to_json(dump, output, flat=True, use_cache=False, incremental_mode=True, quiet=True)
+    convert_to_json(dump, output, flat=False, use_cache=False, incremental_mode=True, quiet=True)
+
+    # Hashes de outra saída não servem de base: nada de mudanças falsas
+    assert not os.path.exists(incremental.changes_path(output))
@@ -0,0 +1,54 @@
+import io
+import json
+
+import pytest
+
+from json_stream import StreamedList, write_json
+from sql_to_json import build_document, convert_to_json
+
+
+def _streamed(plain):
+    # Mesmo documento com StreamedList nos pontos em que o conversor as usa:
+    # listas item a item, em blocos (inclusive vazios) e listas vazias
+    return {
+        'games': StreamedList({
+            'id': game['id'],
+            'players': StreamedList(iter([game['players'][:1], [], game['players'][1:]]), chunked=True),
+            'tags': StreamedList(iter(game['tags'])),
+        } for game in plain['games']),
+        'empty': StreamedList(iter([])),
+        'chunks': StreamedList(iter([[], []]), chunked=True),
+        'meta': plain['meta'],
+    }
+
+
+PLAIN = {
+    'games': [
+        {'id': 'a.png', 'players': [{'name': "O'Neil", 'settings': {}}, {'name': 'Zé\n"x"', 'team': None}],
+         'tags': []},
+        {'id': 'b.png', 'players': [], 'tags': [1, 2.5, True, {'nested': [[], {}]}]},
+    ],
+    'empty': [],
+    'chunks': [],
+    'meta': {'count': 2, 'names': ['a', 'b']},
+}
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_write_json_matches_json_dump(compact):
+    f = io.StringIO()
+    write_json(_streamed(PLAIN), f, compact)
+
+    if compact:
+        expected = json.dumps(PLAIN, ensure_ascii=False, separators=(',', ':'))
+    else:
+        expected = json.dumps(PLAIN, ensure_ascii=False, indent=2)
+    assert f.getvalue() == expected
+
+
+def test_converted_document_matches_json_dump(sample_dump, tmp_path):
+    output = tmp_path / 'saida.json'
+    convert_to_json(sample_dump, str(output), use_cache=False, quiet=True)
+
+    document = build_document(sample_dump, use_cache=False, quiet=True)
+    assert output.read_text(encoding='utf-8') == json.dumps(document, ensure_ascii=False, indent=2)
@@ -0,0 +1,48 @@
+import gzip
+import json
+import shutil
+
+import pytest
+
+from serve import _accepts_gzip, load_source
+from sql_to_json import build_document
+
+
+@pytest.mark.parametrize('header, accepted', [
+    (None, False),
+    ('', False),
+    ('gzip', True),
+    ('deflate, gzip;q=0.5', True),
+    ('*', True),
+    ('gzip;q=0', False),
+    ('gzip; q=0.0', False),
+    ('gzip;q=0.001', True),
+    ('GZIP ; Q = 0.8', True),
+    ('*;q=0.5, gzip;q=0', False),
+    ('gzip;q=0, *', False),
+    ('*;q=0, gzip', True),
+    ('*;q=0', False),
+    ('identity, br', False),
+    ('gzip;q=abc', False),
+])
+def test_accepts_gzip(header, accepted):
+    assert _accepts_gzip(header) is accepted
+
+
+def test_load_source_by_suffix_without_compression(sample_dump, tmp_path):
+    document = build_document(sample_dump, use_cache=False, quiet=True)
+
+    # Dump com ".json" no meio do nome continua sendo dump
+    sql_named_json = tmp_path / 'export.json.sql'
+    shutil.copy(sample_dump, sql_named_json)
+    assert load_source(str(sql_named_json), use_cache=False) == document
+
+    sql_gz = tmp_path / 'export.json.sql.gz'
+    with open(sample_dump, 'rb') as src, gzip.open(sql_gz, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    assert load_source(str(sql_gz), use_cache=False) == document
+
+    json_gz = tmp_path / 'saida.JSON.gz'
+    with gzip.open(json_gz, 'wt', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False)
+    assert load_source(str(json_gz)) == document
@@ -0,0 +1,20 @@
+from settings_pool import SettingsPool
+
+
+def test_intern_ignores_key_order_but_not_value_types():
+    pool = SettingsPool()
+
+    first = pool.intern({'hud_scaling': '1', 'cl_hud_color': 'White'})
+    assert pool.intern({'cl_hud_color': 'White', 'hud_scaling': '1'}) is first
+
+    number = pool.intern({'a': 1, 'b': 'x'})
+    assert pool.intern({'b': 'x', 'a': 1}) is number
+    assert pool.intern({'a': 1.0, 'b': 'x'}) is not number
+    assert pool.intern({'a': True, 'b': 'x'}) is not number
+
+    nested = pool.intern({'preset': {'x': 1, 'y': [1, 2]}, 'name': 'a'})
+    assert pool.intern({'name': 'a', 'preset': {'y': [1, 2], 'x': 1}}) is nested
+    assert pool.intern({'name': 'a', 'preset': {'y': [1, 2], 'x': True}}) is not nested
+
+    assert pool.unique == 6
+    assert pool.references == 9
@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+from snapshot import SnapshotReader, write_snapshot
+from sql_to_json import build_document
+
+
+SAMPLE_DUMP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'bdprosettingscorreto.sql')
+
+
+def _roundtrip(obj):
+    # O snapshot guarda JSON: compara com o que o json devolve
+    return json.loads(json.dumps(obj, ensure_ascii=False))
+
+
+@pytest.fixture(scope='module')
+def document():
+    return build_document(SAMPLE_DUMP, use_cache=False, quiet=True)
+
+
+@pytest.fixture(scope='module')
+def snapshot(document, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('snapshot') / 'prosettings.snap')
+    write_snapshot(document, path)
+    with SnapshotReader(path) as reader:
+        yield reader
+
+
+def test_catalog_matches_document(snapshot, document):
+    catalog = snapshot.games()
+
+    assert [game['id'] for game in catalog] == [game['id'] for game in document['games']]
+    assert [game['name'] for game in catalog] == [game['name'] for game in document['games']]
+    assert [game['players'] for game in catalog] == [len(game['players']) for game in document['games']]
+
+
+def test_every_game_lookup_matches_document(snapshot, document):
+    for game in document['games']:
+        expected = _roundtrip([{key: value for key, value in player.items() if key != 'settings'}
+                               for player in game['players']])
+        for game_key in (game['id'], game['name']):
+            stored = snapshot.game(game_key)
+            assert stored is not None, game_key
+            assert stored['id'] == game['id']
+            assert stored['players'] == expected
+
+
+def test_every_player_lookup_matches_document(snapshot, document):
+    checked = 0
+    for game in document['games']:
+        # Com nomes repetidos (sem diferenciar maiúsculas) no mesmo game vale o primeiro player
+        first_by_name = {}
+        for player in game['players']:
+            first_by_name.setdefault(player['name'].casefold(), player)
+
+        for player in game['players']:
+            expected = _roundtrip(player)
+            for game_key in (game['id'], game['name']):
+                assert snapshot.player(game_key, player['id']) == expected
+                assert snapshot.player(game_key, player['name']) == \
+                    _roundtrip(first_by_name[player['name'].casefold()])
+            checked += 1
+
+    assert checked == sum(len(game['players']) for game in document['games'])
+    assert checked > 0
+
+
+def test_lookups_ignore_extension_and_case(snapshot, document):
+    game = document['games'][0]
+    player = game['players'][-1]
+    expected_player = _roundtrip(player)
+
+    for game_key in (os.path.splitext(game['id'])[0], game['name'].upper(), game['name'].lower()):
+        assert snapshot.game(game_key)['id'] == game['id']
+        assert snapshot.player(game_key, os.path.splitext(player['id'])[0]) == expected_player
+
+    first = next(p for p in game['players'] if p['name'].casefold() == player['name'].casefold())
+    for player_key in (player['name'].upper(), player['name'].swapcase()):
+        assert snapshot.player(game['id'], player_key) == _roundtrip(first)
+
+
+def test_missing_keys_return_none(snapshot, document):
+    game = document['games'][0]
+    player = game['players'][0]
+
+    assert snapshot.game('não existe') is None
+    assert snapshot.player(game['id'], 'não existe') is None
+    assert snapshot.player('não existe', player['id']) is None
+    # Prefixo de uma chave existente não é a chave
+    assert snapshot.game(os.path.splitext(game['id'])[0][:-1]) is None
+    assert snapshot.game(game['name'][:-1]) is None
@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+from conftest import sample_tables
+
+import sql_to_json
+from sql_to_json import build_document, convert_to_json, parse_values
+
+
+def test_parse_values_handles_mysql_escapes():
+    values = (
+        "('O\\'Neil', 'd''Arc', 'back\\\\slash', 'semi;colon (x), ok', NULL, 42, -1.5),\n"
+        "\t('linha\\nnova\\ttab\\0', '\\%\\_\\Z', '{\"code\": \"a\\\\\"b\", \"style\": \"it''s (4); ok\"}', '', 'NULL', 0, 1e3);"
+    )
+
+    # Como no MySQL, \% e \_ mantêm a barra (só são escapes em LIKE)
+    assert parse_values(values) == [
+        ("O'Neil", "d'Arc", 'back\\slash', 'semi;colon (x), ok', None, 42, -1.5),
+        ('linha\nnova\ttab\0', '\\%\\_\x1a', {'code': 'a"b', 'style': "it's (4); ok"}, '', 'NULL', 0, 1000.0),
+    ]
+
+
+def test_tricky_names_survive_the_dump(sample_dump):
+    document = build_document(sample_dump, use_cache=False, quiet=True)
+    tables = sample_tables()
+
+    players = {player['id']: player for game in document['games'] for player in game['players']}
+    assert {player['name'] for player in players.values()} == {player['name'] for player in tables['players']}
+    assert {player['team'] for player in players.values()} == {player['team'] for player in tables['players']}
+    for player in players.values():
+        assert player['settings']['crosshair_settings'] == tables['settings'][1]['value']
+
+
+@pytest.mark.parametrize('flat', [False, True])
+def test_workers_output_is_byte_identical(sample_dump, tmp_path, monkeypatch, flat):
+    # Lotes de 2 registros: cada INSERT é dividido entre vários processos
+    monkeypatch.setattr(sql_to_json, 'PARALLEL_BATCH_ROWS', 2)
+    outputs = []
+    for workers in (1, 2):
+        output = tmp_path / f"workers{workers}.json"
+        convert_to_json(sample_dump, str(output), workers=workers, flat=flat, use_cache=False, quiet=True)
+        outputs.append(output.read_bytes())
+
+    assert outputs[0] == outputs[1]
+
+
+def _convert(sql_file, output, **kwargs):
+    convert_to_json(sql_file, str(output), use_cache=False, quiet=True, **kwargs)
+    with open(output, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('filters', [
+    {'tables': {'players', 'settings'}},
+    {'games': {'valorant'}},
+    {'games': {'a0000002-0000-4000-8000-000000000000', 'CS2'}, 'tables': {'players', 'game_player'}},
+    {'setting_names': {'mouse_settings'}},
+    {'games': {'a0000001-0000-4000-8000-000000000000.png'}, 'setting_names': {'crosshair_settings'}},
+])
+def test_pushdown_equals_filtered_full_conversion(sample_dump, tmp_path, filters):
+    full = _convert(sample_dump, tmp_path / 'full.json', flat=True)
+    filtered = _convert(sample_dump, tmp_path / 'filtered.json', flat=True, **filters)
+
+    # Os mesmos filtros aplicados depois, sobre a conversão completa
+    tables = filters.get('tables', set(full))
+    expected = {name: records for name, records in full.items() if name in tables}
+    if 'games' in filters:
+        # Ids com ou sem o .png, nomes sem diferenciar maiúsculas
+        wanted = {os.path.splitext(game)[0].lower() for game in filters['games']}
+        game_ids = {game['id'] for game in full['games']
+                    if os.path.splitext(game['id'])[0].lower() in wanted or game['name'].lower() in wanted}
+        player_ids = {link['player_id'] for link in full['game_player'] if link['game_id'] in game_ids}
+        for name, column, ids in (('games', 'id', game_ids), ('game_player', 'game_id', game_ids),
+                                  ('settings', 'game_id', game_ids), ('players', 'id', player_ids)):
+            if name in expected:
+                expected[name] = [record for record in expected[name] if record[column] in ids]
+    if 'setting_names' in filters and 'settings' in expected:
+        expected['settings'] = [record for record in expected['settings']
+                                if record['name'] in filters['setting_names']]
+
+    assert filtered == expected
+    assert filtered != full
+
+
+def test_pushdown_nested_document(sample_dump, tmp_path):
+    full = _convert(sample_dump, tmp_path / 'full.json')
+    filtered = _convert(sample_dump, tmp_path / 'filtered.json',
+                        games={'VALORANT', 'CS2'}, setting_names={'mouse_settings'})
+
+    expected = []
+    for game in full['games']:
+        if game['name'] in ('Valorant', 'CS2'):
+            for player in game['players']:
+                player['settings'] = {name: value for name, value in player['settings'].items()
+                                      if name == 'mouse_settings'}
+            expected.append(game)
+    assert filtered == {'games': expected}
@@ -0,0 +1,84 @@
+import gzip
+import os
+import shutil
+
+from conftest import sample_tables, write_dump
+
+import timeline
+from sql_to_json import build_document
+
+
+def _daily_tables():
+    # Três dias: mudanças de setting, de time, de vínculo, um game a menos e um player novo
+    first = sample_tables()
+
+    second = sample_tables()
+    second['settings'][0]['value'] = dict(second['settings'][0]['value'], dpi='401')
+    second['settings'].append(dict(second['settings'][1], id='novo', name='extra_settings', value={'a': '1'}))
+    second['players'][2]['team'] = 'Outro Time'
+    removed = second['game_player'].pop(3)
+    second['settings'] = [setting for setting in second['settings']
+                          if (setting['game_id'], setting['player_id']) != (removed['game_id'], removed['player_id'])]
+
+    third = sample_tables()
+    third['games'].pop(2)
+    third['players'].append(dict(third['players'][0], id='e0000000-0000-4000-8000-000000000000',
+                                 name='novato', image='e0000000-0000-4000-8000-000000000000.png'))
+    third['game_player'].append(dict(third['game_player'][0], id='novo', player_id=third['players'][-1]['id']))
+    third['settings'].append(dict(third['settings'][0], id='novo', player_id=third['players'][-1]['id']))
+    return [first, second, third]
+
+
+def _normalized(document):
+    # state_at segue a ordem da linha do tempo; o conversor, a do dump
+    return sorted(({**game, 'players': sorted(game['players'], key=lambda player: player['id'])}
+                   for game in document['games']), key=lambda game: game['id'])
+
+
+def _write_day(directory, day, tables, compress=False):
+    dump = write_dump(str(directory / f"2024-01-{day:02d}.sql"), tables, seed=day)
+    if not compress:
+        return dump
+    # Como vêm dos backups: só o .sql.gz fica no diretório
+    with open(dump, 'rb') as src, gzip.open(dump + '.gz', 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(dump)
+    return dump + '.gz'
+
+
+def test_state_at_rebuilds_every_snapshot_and_rerun_reuses_them(tmp_path, monkeypatch):
+    directory = tmp_path / 'dumps'
+    directory.mkdir()
+    days = _daily_tables()
+    dumps = [_write_day(directory, 1, days[0], compress=True), _write_day(directory, 2, days[1])]
+    output = str(tmp_path / 'timeline.json')
+
+    store = timeline.build_timeline(str(directory), output, use_cache=False)
+
+    calls = []
+    read_snapshot = timeline.read_snapshot
+
+    def counting_read_snapshot(dump, use_cache=True):
+        calls.append(dump)
+        return read_snapshot(dump, use_cache)
+
+    monkeypatch.setattr(timeline, 'read_snapshot', counting_read_snapshot)
+
+    # De novo sobre o mesmo diretório: nenhum dump é convertido
+    assert timeline.build_timeline(str(directory), output, use_cache=False) == store
+    assert calls == []
+
+    # Um dia novo: só ele é convertido
+    dumps.append(_write_day(directory, 3, days[2]))
+    store = timeline.build_timeline(str(directory), output, use_cache=False)
+    assert calls == [dumps[2]]
+    assert [snapshot['name'] for snapshot in store['snapshots']] == ['2024-01-01', '2024-01-02', '2024-01-03']
+
+    stored = timeline.load_timeline(output)
+    states = []
+    for index, dump in enumerate(dumps):
+        expected = _normalized(build_document(dump, use_cache=False, quiet=True))
+        assert _normalized(timeline.state_at(store, index)) == expected
+        assert _normalized(timeline.state_at(stored, index)) == expected
+        states.append(expected)
+    assert states[0] != states[1] != states[2]
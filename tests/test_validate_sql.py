@@ -0,0 +1,31 @@
+import os
+
+import pytest
+from conftest import ROOT, sample_tables, write_dump
+
+from validate_sql import _parse_counts, _scan_counts
+
+
+def _tricky_dump(path):
+    tables = sample_tables()
+    # Nome de game com aspas, parênteses e ponto-e-vírgula, e um link órfão
+    tables['games'][1]['name'] = "Tom\\'s (Game); x, ''y''"
+    tables['game_player'].append(dict(tables['game_player'][0], id='órfão', game_id='não existe'))
+    return write_dump(path, tables, rows_per_insert=2)
+
+
+@pytest.mark.parametrize('dump', ['inline', 'real'])
+def test_scan_counts_equal_parse_counts(dump, tmp_path):
+    if dump == 'real':
+        sql_file = os.path.join(ROOT, 'bdprosettingscorreto.sql')
+    else:
+        sql_file = _tricky_dump(str(tmp_path / 'dump.sql'))
+
+    scan_tables, scan_links, scan_names = _scan_counts(sql_file)
+    parse_tables, parse_links, parse_names = _parse_counts(sql_file, use_cache=False)
+
+    assert {name: table['count'] for name, table in scan_tables.items()} == \
+        {name: table['count'] for name, table in parse_tables.items()}
+    assert dict(scan_links) == dict(parse_links)
+    assert scan_names == parse_names
+    assert sum(scan_links.values()) == scan_tables['game_player']['count']
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Conversão em lote de dumps históricos para uma linha do tempo de settings.
+
+Recebe um diretório de dumps datados (um snapshot por arquivo, em ordem de
+nome: `2024-01-01.sql`, `2024-01-02.sql.gz`, ...), parseia os dumps em
+paralelo, um por processo, e grava um único arquivo com o que mudou de um
+snapshot para o seguinte, em vez de um JSON completo por dia:
+
+    {
+      "format": "prosettings-timeline-v1",
+      "snapshots": [{"name": "2024-01-01", "dump": {...}}, ...],
+      "names": ["mouse_settings", "dpi", ...],
+      "games": [{"id": "...", "changes": [[0, {"name": "CS2"}]]}],
+      "players": [{"id": "...", "changes": [[0, {"name": "s1mple", "team": "NAVI"}], [5, {...}]]}],
+      "entries": [{"game": 0, "player": 3, "changes": [
+        [0, [[0, [[1, "800"], [2, "1000"]]], ...]],
+        [7, [[0, [[1, "400"], [2, "1000"]]]]],
+        [9, null]
+      ]}]
+    }
+
+- `names` é o dicionário compartilhado por todos os snapshots de nomes de
+  setting e de chaves; os settings guardam os índices.
+- `games` e `players` são os dicionários de ids; cada um guarda os campos
+  (sem o id) só nos snapshots em que eles mudam, e null quando o registro
+  some do dump.
+- `entries` são os pares (game, player) do game_player. Cada mudança traz
+  só os settings que mudaram: [índice do nome, valor], com o valor como
+  pares [índice da chave, valor] (ou {"raw": valor} se não é um objeto) e
+  null para setting removido. null no lugar da lista: o player saiu do
+  game naquele snapshot.
+
+O arquivo cresce com o número de mudanças, não de snapshots. Rodando de
+novo sobre o mesmo diretório, os snapshots já gravados (mesmo nome e mesmo
+dump, pela regra do cache de parse) são mantidos e só os dumps novos são
+parseados; o estado atual vem de repassar as mudanças gravadas. Se um dump
+já gravado mudou ou um novo entra antes do último, a linha do tempo é
+refeita.
+
+Um par (game, player) repetido no game_player aparece uma vez só.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import sql_cache
+from sql_to_json import build_document
+
+
+FORMAT_NAME = 'prosettings-timeline-v1'
+
+# Arquivos aceitos como dump no diretório (o sufixo sai do nome do snapshot)
+DUMP_RE = re.compile(r'\.sql(?:\.(?:gz|bz2|xz))?$')
+
+# Um encoder só para os digests (json.dumps monta um a cada chamada)
+_CANONICAL = json.JSONEncoder(sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+
+def _digest(value: Any) -> bytes:
+    return hashlib.blake2b(_CANONICAL.encode(value).encode('utf-8'), digest_size=12).digest()
+
+
+def list_dumps(directory: str) -> List[str]:
+    """
+    Dumps do diretório (.sql, .sql.gz, .sql.bz2, .sql.xz), em ordem de nome.
+    """
+    names = sorted(name for name in os.listdir(directory) if DUMP_RE.search(name))
+    return [os.path.join(directory, name) for name in names]
+
+
+def snapshot_name(dump: str) -> str:
+    return DUMP_RE.sub('', os.path.basename(dump))
+
+
+def read_snapshot(dump: str, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Converte um dump e devolve o que a linha do tempo precisa, já com os
+    digests (roda nos processos do pool):
+    {'games': {id: campos}, 'players': {id: campos},
+     'entries': {(game_id, player_id): {nome: (digest, valor)}}}
+    """
+    document = build_document(dump, use_cache=use_cache, quiet=True)
+
+    games = {}
+    players = {}
+    entries = {}
+    for game in document['games']:
+        games[game['id']] = {key: value for key, value in game.items() if key not in ('id', 'players')}
+        for player in game['players']:
+            players[player['id']] = {key: value for key, value in player.items() if key not in ('id', 'settings')}
+            entries.setdefault((game['id'], player['id']), {
+                name: (_digest(value), value) for name, value in player['settings'].items()
+            })
+
+    return {
+        'name': snapshot_name(dump),
+        'dump': sql_cache.file_fingerprint(dump),
+        'games': games,
+        'players': players,
+        'entries': entries,
+    }
+
+
+def _read_snapshot_task(task: Tuple[str, bool]) -> Dict[str, Any]:
+    return read_snapshot(*task)
+
+
+def iter_snapshots(dumps: List[str], workers: int = 1, use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Snapshots dos dumps, na ordem da lista. Com `workers` > 1 os dumps são
+    convertidos em paralelo, com no máximo 2 por processo em andamento
+    (a memória não cresce com o número de dumps).
+    """
+    if workers <= 1:
+        for dump in dumps:
+            yield read_snapshot(dump, use_cache)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for dump in dumps:
+            pending.append(executor.submit(_read_snapshot_task, (dump, use_cache)))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _encode_value(value: Any, name_index) -> Any:
+    if value.__class__ is dict:
+        return [[name_index(key), item] for key, item in value.items()]
+    return {'raw': value}
+
+
+def _decode_value(encoded: Any, names: List[str]) -> Any:
+    if encoded.__class__ is dict:
+        return encoded['raw']
+    return {names[key]: item for key, item in encoded}
+
+
+class Series:
+    """
+    Um registro ao longo dos snapshots: as mudanças gravadas e o digest do
+    estado atual (None = ausente).
+    """
+
+    __slots__ = ('changes', 'digest')
+
+    def __init__(self, changes: Optional[List[list]] = None):
+        self.changes = changes if changes is not None else []
+        self.digest: Optional[bytes] = None
+
+    def update(self, snapshot: int, fields: Optional[Dict[str, Any]]):
+        digest = None if fields is None else _digest(fields)
+        if digest != self.digest:
+            self.changes.append([snapshot, fields])
+            self.digest = digest
+
+
+class EntrySeries:
+    """
+    Um par (game, player): as mudanças gravadas e os digests dos settings
+    atuais por nome (None = o player não está no game).
+    """
+
+    __slots__ = ('game', 'player', 'changes', 'settings')
+
+    def __init__(self, game: int, player: int, changes: Optional[List[list]] = None):
+        self.game = game
+        self.player = player
+        self.changes = changes if changes is not None else []
+        self.settings: Optional[Dict[str, bytes]] = None
+
+
+class TimelineBuilder:
+    """
+    Monta a linha do tempo um snapshot por vez, guardando só o estado atual
+    (digests) e as mudanças. Com `store`, continua uma linha do tempo já
+    gravada.
+    """
+
+    def __init__(self, store: Optional[Dict[str, Any]] = None):
+        self.snapshots: List[Dict[str, Any]] = []
+        self.names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self.games: Dict[str, Series] = {}
+        self.players: Dict[str, Series] = {}
+        self.entries: Dict[Tuple[str, str], EntrySeries] = {}
+        self._game_ids: Dict[str, int] = {}
+        self._player_ids: Dict[str, int] = {}
+        self.change_count = 0
+
+        if store is not None:
+            self._restore(store)
+
+    def _name_index(self, name: str) -> int:
+        index = self._name_ids.get(name)
+        if index is None:
+            index = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def _restore(self, store: Dict[str, Any]):
+        self.snapshots = list(store['snapshots'])
+        for name in store['names']:
+            self._name_index(name)
+
+        for table, series_by_id, ids in (('games', self.games, self._game_ids),
+                                         ('players', self.players, self._player_ids)):
+            for item in store[table]:
+                series = Series(item['changes'])
+                fields = item['changes'][-1][1] if item['changes'] else None
+                series.digest = None if fields is None else _digest(fields)
+                ids[item['id']] = len(series_by_id)
+                series_by_id[item['id']] = series
+                self.change_count += len(item['changes'])
+
+        game_ids = [item['id'] for item in store['games']]
+        player_ids = [item['id'] for item in store['players']]
+        for item in store['entries']:
+            entry = EntrySeries(item['game'], item['player'], item['changes'])
+            # Estado atual: repassa as mudanças gravadas
+            settings = None
+            for _, delta in item['changes']:
+                if delta is None:
+                    settings = None
+                    continue
+                settings = dict(settings or {})
+                for name, encoded in delta:
+                    if encoded is None:
+                        settings.pop(self.names[name], None)
+                    else:
+                        settings[self.names[name]] = _digest(_decode_value(encoded, self.names))
+            entry.settings = settings
+            self.entries[(game_ids[item['game']], player_ids[item['player']])] = entry
+            self.change_count += len(item['changes'])
+
+    def _series(self, series_by_id: Dict[str, Series], ids: Dict[str, int], item_id: str) -> Series:
+        series = series_by_id.get(item_id)
+        if series is None:
+            ids[item_id] = len(series_by_id)
+            series = series_by_id[item_id] = Series()
+        return series
+
+    def add_snapshot(self, snapshot: Dict[str, Any]) -> int:
+        """
+        Registra o próximo snapshot (de read_snapshot) e retorna quantas
+        mudanças ele gerou.
+        """
+        index = len(self.snapshots)
+        self.snapshots.append({'name': snapshot['name'], 'dump': snapshot['dump']})
+        before = self.change_count
+
+        for table, series_by_id, ids in (('games', self.games, self._game_ids),
+                                         ('players', self.players, self._player_ids)):
+            current = snapshot[table]
+            for item_id in current:
+                self._series(series_by_id, ids, item_id)
+            for item_id, series in series_by_id.items():
+                count = len(series.changes)
+                series.update(index, current.get(item_id))
+                self.change_count += len(series.changes) - count
+
+        current_entries = snapshot['entries']
+        for key in current_entries:
+            if key not in self.entries:
+                self.entries[key] = EntrySeries(self._game_ids[key[0]], self._player_ids[key[1]])
+
+        for key, entry in self.entries.items():
+            settings = current_entries.get(key)
+            if settings is None:
+                if entry.settings is not None:
+                    entry.changes.append([index, None])
+                    entry.settings = None
+                    self.change_count += 1
+                continue
+
+            previous = entry.settings or {}
+            delta = []
+            for name, (digest, value) in settings.items():
+                if previous.get(name) != digest:
+                    delta.append([self._name_index(name), _encode_value(value, self._name_index)])
+            for name in previous:
+                if name not in settings:
+                    delta.append([self._name_index(name), None])
+
+            if delta or entry.settings is None:
+                entry.changes.append([index, delta])
+                self.change_count += 1
+            entry.settings = {name: digest for name, (digest, _) in settings.items()}
+
+        return self.change_count - before
+
+    def to_store(self) -> Dict[str, Any]:
+        return {
+            'format': FORMAT_NAME,
+            'snapshots': self.snapshots,
+            'names': self.names,
+            'games': [{'id': item_id, 'changes': series.changes} for item_id, series in self.games.items()],
+            'players': [{'id': item_id, 'changes': series.changes} for item_id, series in self.players.items()],
+            'entries': [{'game': entry.game, 'player': entry.player, 'changes': entry.changes}
+                        for entry in self.entries.values()],
+        }
+
+
+def load_timeline(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Linha do tempo gravada, ou None se o arquivo não existe ou não é uma.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return store if isinstance(store, dict) and store.get('format') == FORMAT_NAME else None
+
+
+def _reusable_snapshots(store: Dict[str, Any], dumps: List[str]) -> int:
+    """
+    Quantos snapshots do início da linha do tempo gravada continuam valendo
+    para esta lista de dumps (0 se é preciso refazer tudo).
+    """
+    snapshots = store['snapshots']
+    if len(snapshots) > len(dumps):
+        return 0
+    for snapshot, dump in zip(snapshots, dumps):
+        if snapshot['name'] != snapshot_name(dump) or not sql_cache.is_cache_valid(snapshot['dump'], dump):
+            return 0
+    return len(snapshots)
+
+
+def build_timeline(directory: str, output_file: str, workers: int = 1, use_cache: bool = True,
+                   rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Converte os dumps do diretório e grava a linha do tempo em
+    `output_file`, continuando a gravada quando ela ainda vale.
+    """
+    dumps = list_dumps(directory)
+    if not dumps:
+        raise ValueError(f"Nenhum dump (.sql, .sql.gz, .sql.bz2, .sql.xz) em {directory}")
+
+    store = None if rebuild else load_timeline(output_file)
+    reused = _reusable_snapshots(store, dumps) if store is not None else 0
+    builder = TimelineBuilder(store if reused else None)
+
+    print(f"Dumps: {len(dumps)}  Já na linha do tempo: {reused}  A converter: {len(dumps) - reused}")
+    start = time.perf_counter()
+    for snapshot in iter_snapshots(dumps[reused:], workers, use_cache):
+        changes = builder.add_snapshot(snapshot)
+        print(f"  {snapshot['name']}: {len(snapshot['entries']):,} players, {changes:,} mudanças")
+    elapsed = time.perf_counter() - start
+
+    store = builder.to_store()
+    tmp_path = output_file + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(store, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, output_file)
+
+    print(f"Linha do tempo: {output_file} ({os.path.getsize(output_file) / 1024 / 1024:.2f} MB, "
+          f"{len(store['snapshots'])} snapshots, {builder.change_count:,} mudanças) em {elapsed:.2f}s")
+    return store
+
+
+def _replay(changes: List[list], snapshot: int) -> Any:
+    state = None
+    for index, value in changes:
+        if index > snapshot:
+            break
+        state = value
+    return state
+
+
+def state_at(store: Dict[str, Any], snapshot: int) -> Dict[str, Any]:
+    """
+    Documento aninhado (como o do conversor) em um snapshot. Games e
+    players saem na ordem em que apareceram pela primeira vez na linha do
+    tempo.
+    """
+    names = store['names']
+
+    def records(table: str) -> List[Optional[Dict[str, Any]]]:
+        # Campos de cada game/player no snapshot, com o id na frente (None = ausente)
+        result = []
+        for item in store[table]:
+            fields = _replay(item['changes'], snapshot)
+            result.append(None if fields is None else dict({'id': item['id']}, **fields))
+        return result
+
+    games = records('games')
+    players = records('players')
+
+    players_by_game: Dict[int, List[Dict[str, Any]]] = {}
+    for item in store['entries']:
+        settings = None
+        for index, delta in item['changes']:
+            if index > snapshot:
+                break
+            if delta is None:
+                settings = None
+                continue
+            settings = dict(settings or {})
+            for name, encoded in delta:
+                if encoded is None:
+                    settings.pop(names[name], None)
+                else:
+                    settings[names[name]] = _decode_value(encoded, names)
+        player = players[item['player']]
+        if settings is not None and player is not None and games[item['game']] is not None:
+            players_by_game.setdefault(item['game'], []).append(dict(player, settings=settings))
+
+    return {'games': [dict(game, players=players_by_game.get(index, []))
+                      for index, game in enumerate(games) if game is not None]}
+
+
+def player_history(store: Dict[str, Any], player: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Mudanças de settings de um player (por id, com ou sem a extensão, ou
+    nome): lista de (snapshot, game, {setting: valor novo ou None}).
+    """
+    names = store['names']
+    wanted = {index for index, item in enumerate(store['players'])
+              if player in (item['id'], item['id'].rsplit('.', 1)[0])
+              or any(fields and str(fields.get('name', '')).casefold() == player.casefold()
+                     for _, fields in item['changes'])}
+
+    history = []
+    for item in store['entries']:
+        if item['player'] not in wanted:
+            continue
+        game_fields = _replay(store['games'][item['game']]['changes'], len(store['snapshots']))
+        game_name = (game_fields or {}).get('name', store['games'][item['game']]['id'])
+        for index, delta in item['changes']:
+            if delta is None:
+                changes = {'(saiu do game)': None}
+            else:
+                changes = {names[name]: None if encoded is None else _decode_value(encoded, names)
+                           for name, encoded in delta}
+            history.append((index, game_name, changes))
+
+    history.sort(key=lambda change: change[0])
+    return [(store['snapshots'][index]['name'], game_name, changes) for index, game_name, changes in history]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converte um diretório de dumps datados em uma linha do tempo de settings.")
+    parser.add_argument('directory', help="diretório com os dumps (um snapshot por arquivo, em ordem de nome)")
+    parser.add_argument('-o', '--output', default="timeline.json", help="arquivo da linha do tempo (padrão: timeline.json)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="dumps convertidos em paralelo (padrão: número de CPUs)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="não lê nem grava o cache de registros parseados dos dumps")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="refaz a linha do tempo inteira em vez de continuar a gravada")
+    parser.add_argument('--player', help="mostra as mudanças de settings de um player (id ou nome)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"diretório não encontrado: {args.directory}")
+    if not list_dumps(args.directory):
+        parser.error(f"nenhum dump (.sql, .sql.gz, .sql.bz2, .sql.xz) em {args.directory}")
+
+    print("=" * 70)
+    print("LINHA DO TEMPO DE SETTINGS")
+    print("=" * 70)
+    store = build_timeline(args.directory, args.output, args.workers, not args.no_cache, args.rebuild)
+
+    if args.player:
+        print(f"\n📈 {args.player}")
+        print("-" * 70)
+        for snapshot, game, changes in player_history(store, args.player):
+            print(f"{snapshot}  {game}")
+            for name, value in changes.items():
+                print(f"   {name}: {json.dumps(value, ensure_ascii=False)}")
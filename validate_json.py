@@ -6,6 +6,8 @@ Mostra quantidade de jogos e players por jogo.
 
 import json
 
+from compressed import open_text
+
 
 def count_from_json(json_file: str):
     """
@@ -16,7 +18,7 @@ def count_from_json(json_file: str):
     print(f"Lendo arquivo JSON: {json_file}")
     print("=" * 70)
 
-    with open(json_file, 'r', encoding='utf-8') as f:
+    with open_text(json_file) as f:
         data = json.load(f)
 
     games = data.get('games', [])
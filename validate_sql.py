@@ -2,108 +2,74 @@
 """
 Valida e conta dados diretamente do arquivo SQL.
 Mostra quantidade de jogos e players por jogo.
+
+Por padrão conta direto nos bytes do dump (sql_scan), sem parsear os
+valores; `--engine parse` usa o parser completo (e o cache de registros).
 """
 
-import re
 from collections import defaultdict
 
+from sql_scan import scan_dump
+from sql_to_json import iter_table_chunks
 
-def count_from_sql(sql_file: str):
-    """
-    Lê o arquivo SQL e conta:
-    - Quantidade de games
-    - Quantidade de players por game
-    """
-    print(f"Lendo arquivo SQL: {sql_file}")
-    print("=" * 70)
 
-    with open(sql_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+ENGINES = ('scan', 'parse')
 
-    # Extrai INSERT statements
-    insert_pattern = r"INSERT\s+INTO\s+`(\w+)`\s*\("
-    matches = list(re.finditer(insert_pattern, content, re.IGNORECASE))
 
-    # Processa cada INSERT
+def _parse_counts(sql_file: str, use_cache: bool):
+    # Parser completo: processa os registros em blocos, direto do cache quando possível
     tables_data = {}
+    game_player_counts = defaultdict(int)
+    game_names = {}
 
-    for i, match in enumerate(matches):
-        table_name = match.group(1)
-        start_pos = match.end()
-
-        # Extrai colunas
-        paren_count = 1
-        col_end = start_pos
-        while paren_count > 0 and col_end < len(content):
-            if content[col_end] == '(':
-                paren_count += 1
-            elif content[col_end] == ')':
-                paren_count -= 1
-            col_end += 1
-
-        columns_str = content[start_pos:col_end-1]
-        columns = [col.strip().strip('`') for col in columns_str.split(',')]
-
-        # Procura VALUES
-        values_match = re.search(r"\s*VALUES\s+", content[col_end:col_end+50], re.IGNORECASE)
-        if not values_match:
-            continue
-
-        values_start = col_end + values_match.end()
-
-        # Procura fim do INSERT (;)
-        values_end = values_start
-        in_string = False
-        escape_next = False
-
-        while values_end < len(content):
-            char = content[values_end]
-
-            if escape_next:
-                escape_next = False
-                values_end += 1
-                continue
-
-            if char == '\\':
-                escape_next = True
-                values_end += 1
-                continue
-
-            if char == "'" and not escape_next:
-                in_string = not in_string
-
-            if char == ';' and not in_string:
-                break
-
-            values_end += 1
-
-        values_section = content[values_start:values_end]
-
-        # Conta registros (cada registro começa com '(')
-        # Precisamos contar apenas parênteses que não estão dentro de strings
-        record_count = 0
-        in_str = False
-        esc = False
-
-        for char in values_section:
-            if esc:
-                esc = False
-                continue
-            if char == '\\':
-                esc = True
-                continue
-            if char == "'":
-                in_str = not in_str
-            if char == '(' and not in_str:
-                record_count += 1
-
+    # Os valores JSON dos settings não são usados: ficam sem decodificar
+    for _, table_name, columns, rows in iter_table_chunks(sql_file, use_cache=use_cache, lazy_json=True):
         if table_name not in tables_data:
             tables_data[table_name] = {
                 'columns': columns,
                 'count': 0
             }
 
-        tables_data[table_name]['count'] += record_count
+        tables_data[table_name]['count'] += len(rows)
+
+        if table_name == 'game_player':
+            game_id_idx = columns.index('game_id')
+            for row in rows:
+                game_player_counts[row[game_id_idx]] += 1
+        elif table_name == 'games':
+            id_idx = columns.index('id')
+            name_idx = columns.index('name')
+            for row in rows:
+                game_names[row[id_idx]] = row[name_idx]
+
+    return tables_data, game_player_counts, game_names
+
+
+def _scan_counts(sql_file: str):
+    # Varredura de bytes: contagens sem parsear os valores
+    result = scan_dump(sql_file)
+    tables_data = {table_name: {'count': count} for table_name, count in result['tables'].items()}
+    return tables_data, result['game_player_counts'], result['game_names']
+
+
+def count_from_sql(sql_file: str, use_cache: bool = True, engine: str = 'scan'):
+    """
+    Lê o arquivo SQL (ou o cache de registros parseados) e conta:
+    - Quantidade de games
+    - Quantidade de players por game
+
+    engine: 'scan' (contagem direto nos bytes) ou 'parse' (parser completo)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconhecido: {engine!r}")
+
+    print(f"Lendo arquivo SQL: {sql_file}")
+    print("=" * 70)
+
+    if engine == 'scan':
+        tables_data, game_player_counts, game_names = _scan_counts(sql_file)
+    else:
+        tables_data, game_player_counts, game_names = _parse_counts(sql_file, use_cache)
 
     # Mostra resultados
     print("\n📊 CONTAGEM DE REGISTROS NO SQL")
@@ -127,47 +93,12 @@ def count_from_sql(sql_file: str):
     print(f"Total de Relacionamentos game_player: {game_player_count:,}")
     print(f"Total de Settings: {settings_count:,}")
 
-    # Extrai dados específicos para contar players por game
-    # Precisamos parsear o conteúdo de game_player
+    # Conta players por game a partir dos registros de game_player
     print("\n" + "=" * 70)
     print("👥 PLAYERS POR GAME (via game_player)")
     print("=" * 70)
 
-    # Encontra o INSERT de game_player
-    game_player_pattern = r"INSERT\s+INTO\s+`game_player`.*?VALUES\s+(.*?);"
-    gp_match = re.search(game_player_pattern, content, re.IGNORECASE | re.DOTALL)
-
-    if gp_match:
-        gp_values = gp_match.group(1)
-
-        # Parse valores - formato: ('id', 'game_id', 'player_id', ...)
-        # Procura padrão de UUIDs
-        row_pattern = r"\('([a-f0-9\-]+)',\s*'([a-f0-9\-]+)',\s*'([a-f0-9\-]+)'"
-
-        game_player_counts = defaultdict(int)
-
-        for match in re.finditer(row_pattern, gp_values):
-            # match.group(1) = id (não usado)
-            game_id = match.group(2)  # game_id
-            # player_id = match.group(3)  # player_id (não usado aqui)
-
-            game_player_counts[game_id] += 1
-
-        # Extrai nomes dos games
-        games_pattern = r"INSERT\s+INTO\s+`games`.*?VALUES\s+(.*?);"
-        games_match = re.search(games_pattern, content, re.IGNORECASE | re.DOTALL)
-
-        game_names = {}
-        if games_match:
-            games_values = games_match.group(1)
-            # Parse: ('id', 'name', ...)
-            game_row_pattern = r"\('([a-f0-9\-]+)',\s*'([^']+)'"
-
-            for match in re.finditer(game_row_pattern, games_values):
-                game_id = match.group(1)
-                game_name = match.group(2)
-                game_names[game_id] = game_name
-
+    if game_player_counts:
         # Mostra contagem por game
         print(f"\n{'Game':<30} {'Players':<10}")
         print("-" * 45)
@@ -187,11 +118,16 @@ def count_from_sql(sql_file: str):
 
 
 if __name__ == "__main__":
-    import sys
-
-    sql_file = "bdprosettingscorreto.sql"
-
-    if len(sys.argv) > 1:
-        sql_file = sys.argv[1]
-
-    count_from_sql(sql_file)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Conta os registros de um dump SQL.")
+    parser.add_argument('sql_file', nargs='?', default="bdprosettingscorreto.sql",
+                        help="arquivo SQL de entrada (pode estar comprimido com gzip, bz2 ou xz)")
+    parser.add_argument('--engine', choices=ENGINES, default='scan',
+                        help="scan: conta direto nos bytes do dump (padrão); "
+                             "parse: parser completo, com cache de registros")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="não lê nem grava o cache de registros parseados (só com --engine parse)")
+    args = parser.parse_args()
+
+    count_from_sql(args.sql_file, use_cache=not args.no_cache, engine=args.engine)